@@ -31,16 +31,23 @@ from storage import protocol
 from storage.shared.ecc import hash_data
 from storage.shared.checks import check_environment, check_registration
 from storage.shared.utils import get_redis_password
-from storage.shared.subtensor import get_current_block
+from storage.shared.subtensor import BlockCache, get_current_block
 from storage.validator.config import config, check_config, add_args
 from storage.validator.state import should_checkpoint
-from storage.validator.encryption import encrypt_data, setup_encryption_wallet
-from storage.validator.store import store_broadband
-from storage.validator.retrieve import retrieve_broadband
-from storage.validator.database import retrieve_encryption_payload, get_ordered_metadata, delete_file_from_database
+from storage.validator.encryption import (
+    SegmentedDecryptor,
+    SegmentedEncryptor,
+    decrypt_with_aes_info,
+    deserialize_aes_info,
+    is_segmented,
+    setup_encryption_wallet,
+)
+from storage.validator.store import store_broadband_stream
+from storage.validator.retrieve import retrieve_broadband_stream
+from storage.validator.database import retrieve_encryption_payload, get_ordered_metadata, delete_file_from_database, ensure_database_indexes
 from storage.validator.cid import generate_cid_string
-from storage.validator.encryption import decrypt_data_with_private_key
 from storage.validator.dendrite import timed_dendrite
+from storage.validator.liveness import LatencyTracker, LivenessTable
 from storage.indexer import run_indexer_thread
 
 
@@ -192,17 +199,34 @@ class neuron:
             bt.logging.error(f"Failed to create Axon initialize: {e}")
             pass
 
+        # Recent miner responses, fed by the dendrite and consulted before pinging.
+        self.liveness = LivenessTable(
+            ttl=self.config.neuron.liveness_ttl,
+            failure_ttl=self.config.neuron.liveness_failure_ttl,
+        )
+
+        # Latencies of recent chunk retrievals, used to decide when to hedge.
+        self.retrieve_latency = LatencyTracker()
+
         # Dendrite pool for querying the network.
         bt.logging.debug("loading dendrite_pool")
         if self.config.neuron.mock:
             self.dendrite = MockDendrite()  # TODO: fix this import error
         else:
-            self.dendrite = timed_dendrite(wallet=self.wallet)
+            self.dendrite = timed_dendrite(
+                wallet=self.wallet,
+                liveness=self.liveness,
+            )
         bt.logging.debug(str(self.dendrite))
 
         # Init the event loop.
         self.loop = asyncio.get_event_loop()
 
+        # Backfill the database indexes if this database predates them
+        self.loop.run_until_complete(ensure_database_indexes(self.database))
+
+        # Current block and hash served locally, refreshed at most once per block
+        self.block_cache = BlockCache(self.subtensor)
         self.prev_step_block = get_current_block(self.subtensor)
 
         # Instantiate runners
@@ -229,7 +253,7 @@ class neuron:
 
         Note:
             - This method is part of a larger protocol for storing data in a distributed network.
-            - It relies on the 'store_broadband' method for actual storage and hash generation.
+            - It relies on the 'store_broadband_stream' method for actual storage and hash generation.
             - The method logs detailed information about the storage process for monitoring and debugging.
         """
         bt.logging.debug(f"store_user_data() {synapse.axon.dict()}")
@@ -242,7 +266,7 @@ class neuron:
         )
 
         # Hash the original data to avoid data confusion
-        content_id = generate_cid_string(decoded_data)
+        content_id = await asyncio.to_thread(generate_cid_string, decoded_data)
 
         # Check and see if hash already exists, reject if so.
         if await get_ordered_metadata(content_id, self.database):
@@ -250,21 +274,18 @@ class neuron:
             synapse.data_hash = content_id
             return synapse
 
-        validator_encrypted_data, validator_encryption_payload = encrypt_data(
-            decoded_data, self.encryption_wallet
-        )
-
-        if isinstance(validator_encryption_payload, dict):
-            validator_encryption_payload = json.dumps(validator_encryption_payload)
-
+        # The segmented payload does not depend on the data, so it is saved first and the
+        # data is encrypted segment by segment while its chunks are being stored
+        encryptor = SegmentedEncryptor(self.encryption_wallet)
+        validator_encryption_payload = await asyncio.to_thread(encryptor.payload)
         await self.database.set(
             f"payload:validator:{content_id}", validator_encryption_payload
         )
-
-        _ = await store_broadband(
+        _ = await store_broadband_stream(
             self,
-            encrypted_data=validator_encrypted_data,
+            encryptor.encrypt_stream([memoryview(decoded_data)]),
             encryption_payload=synapse.encryption_payload,
+            data_size=encryptor.ciphertext_size(len(decoded_data)),
             data_hash=content_id,
         )
         synapse.data_hash = content_id
@@ -326,12 +347,12 @@ class neuron:
 
         Note:
             - The function is part of a larger protocol for data retrieval in a distributed network.
-            - It utilizes the 'retrieve_broadband' method to perform the actual data retrieval and
+            - It utilizes the 'retrieve_broadband_stream' method to perform the actual data retrieval and
             verification based on the provided data hash.
             - The method logs the retrieval process and the resulting data for monitoring and debugging.
         """
-        validator_encrypted_data, user_encryption_payload = await retrieve_broadband(
-            self, synapse.data_hash
+        user_encryption_payload = await retrieve_encryption_payload(
+            synapse.data_hash, self.database
         )
 
         validator_encryption_payload = await retrieve_encryption_payload(
@@ -341,11 +362,28 @@ class neuron:
         bt.logging.debug(
             f"validator_encryption_payload: {validator_encryption_payload}"
         )
-        decrypted_data = decrypt_data_with_private_key(
-            validator_encrypted_data,
+        aes_info = await asyncio.to_thread(
+            deserialize_aes_info,
             bytes(json.dumps(validator_encryption_payload), "utf-8"),
             bytes(self.encryption_wallet.coldkey.private_key.hex(), "utf-8"),
         )
+
+        # Chunks arrive in order and are appended straight away, rather than being
+        # buffered until every chunk is in and then joined into a second copy
+        chunks = retrieve_broadband_stream(self, synapse.data_hash)
+        if is_segmented(aes_info):
+            # Segments are decrypted while the following chunks are being retrieved
+            decrypted_data = bytearray()
+            async for segment in SegmentedDecryptor(aes_info).decrypt_stream(chunks):
+                decrypted_data += segment
+        else:
+            validator_encrypted_data = bytearray()
+            async for chunk in chunks:
+                validator_encrypted_data += chunk
+            decrypted_data = await asyncio.to_thread(
+                decrypt_with_aes_info, validator_encrypted_data, aes_info
+            )
+            del validator_encrypted_data
         bt.logging.debug(f"decrypted_data: {decrypted_data[:100]}")
 
         bt.logging.debug(f"returning user data: {decrypted_data[:100]}")
@@ -43,12 +43,12 @@ from storage.shared.ecc import (
 
 from storage.shared.utils import (
     b64_encode,
-    chunk_data,
     safe_key_search,
     get_redis_password,
 )
 
 from storage.shared.checks import check_environment, check_registration
+from storage.shared.transport import enable_binary_payloads, get_payload, set_payload
 
 from storage.miner import (
     run,
@@ -56,9 +56,9 @@ from storage.miner import (
 
 from storage.miner.utils import (
     compute_subsequent_commitment,
+    challenge_from_filesystem,
     save_data_to_filesystem,
     load_from_filesystem,
-    commit_data_with_seed,
     init_wandb,
     update_storage_stats,
     load_request_log,
@@ -204,6 +204,9 @@ class miner:
         self.axon = bt.axon(wallet=self.wallet, config=self.config)
         bt.logging.info(f"Axon {self.axon}")
 
+        # Exchange payloads as raw bytes with the validators that support it.
+        enable_binary_payloads(self.axon)
+
         # Attach determiners which functions are called when servicing a request.
         bt.logging.info("Attaching forward functions to axon.")
         self.axon.attach(
@@ -593,7 +596,7 @@ class miner:
 
         Args:
             synapse (storage.protocol.Store): An object containing the data to be stored,
-            encoded in base64 format, along with associated metadata like the cryptographic
+            as raw bytes or encoded in base64 format, along with associated metadata like the cryptographic
             curve parameters, a seed for the commitment, and the expected commitment group elements.
 
         Returns:
@@ -602,7 +605,7 @@ class miner:
             from this storage server's hotkey, and a commitment hash that can be used for chained proofs.
 
         The method performs the following operations:
-        1. Decodes the base64-encoded data into raw bytes.
+        1. Gets the data as raw bytes, decoding it from base64 for older validators.
         2. Commits to the data using the provided elliptic curve parameters and the seed to generate a commitment point.
         3. Stores the raw byte data in the filesystem using a hash of the data as the filename.
         4. Records metadata about the stored data in the Redis database, including the file path, previous seed, and data size.
@@ -615,12 +618,11 @@ class miner:
             Assuming an initialized 'committer' object and 'synapse' with necessary data:
             >>> updated_synapse = self.store(synapse)
         """
-        bt.logging.info(f"received store request: {synapse.encrypted_data[:24]}")
         self.request_count += 1
 
-        # Decode the data from base64 to raw bytes
-        encrypted_byte_data = base64.b64decode(synapse.encrypted_data)
-        bt.logging.trace(f"store b64decrypted data: {encrypted_byte_data[:24]}")
+        # Get the raw bytes of the data, sent as such or base64 encoded
+        encrypted_byte_data = get_payload(synapse)
+        bt.logging.info(f"received store request: {encrypted_byte_data[:24]}")
 
         # Store the data with the hash as the key in the filesystem
         bt.logging.trace("entering hash_data()")
@@ -709,7 +711,7 @@ class miner:
         2. Splits the data into chunks based on the specified chunk size.
         3. Computes a new commitment hash to provide a time-bound proof of possession.
         4. Generates a Merkle tree from the committed data chunks and extracts a proof for the requested chunk.
-        5. Encodes the requested chunk and Merkle proof in base64 for transmission.
+        5. Encodes the Merkle proof in base64, and the requested chunk too for older validators.
         6. Updates the challenge synapse with the commitment, data chunk, randomness, and Merkle proof.
         7. Records the updated commitment hash in storage for future challenges.
 
@@ -769,15 +771,6 @@ class miner:
                         f"challenge() File found for {synapse.challenge_hash} in {filepath}."
                     )
 
-        bt.logging.trace("entering load_from_filesystem()")
-        try:
-            encrypted_data_bytes = load_from_filesystem(filepath)
-        except Exception as e:
-            bt.logging.error(f"Error loading file {filepath}: {e}")
-            synapse.axon.status_code = 404
-            synapse.axon.status_message = "File not found"
-            return synapse
-
         # Construct the next commitment hash using previous commitment and hash
         # of the data to prove storage over time
         prev_seed = data.get("seed", "").encode()
@@ -788,11 +781,47 @@ class miner:
             synapse.axon.status_message = "Previous seed not found"
             return synapse
 
-        bt.logging.trace("entering comput_subsequent_commitment()...")
         new_seed = synapse.seed.encode()
-        next_commitment, proof = compute_subsequent_commitment(
-            encrypted_data_bytes, prev_seed, new_seed, verbose=self.config.miner.verbose
+
+        # Extract setup params
+        g = hex_to_ecc_point(synapse.g, synapse.curve)
+        h = hex_to_ecc_point(synapse.h, synapse.curve)
+        bt.logging.trace("entering ECCcommitment()")
+        # Fixed-base tables only pay off when every chunk is committed.
+        committer = ECCommitment(
+            g, h, precompute=self.config.miner.eager_commitments, curve=synapse.curve
         )
+
+        # Memory-map the stored file and stream it through the hasher and the
+        # committer so that memory use depends on the chunk size, not the file.
+        # This is CPU bound, so keep it off the event loop.
+        bt.logging.trace("entering challenge_from_filesystem()")
+        try:
+            (
+                next_commitment,
+                proof,
+                randomness,
+                chunk,
+                commitment,
+                merkle_tree,
+            ) = await asyncio.to_thread(
+                challenge_from_filesystem,
+                filepath,
+                committer,
+                chunk_size=synapse.chunk_size,
+                index=synapse.challenge_index,
+                previous_seed=prev_seed,
+                new_seed=new_seed,
+                seed=synapse.seed,
+                lazy=not self.config.miner.eager_commitments,
+                verbose=self.config.miner.verbose,
+            )
+        except OSError as e:
+            bt.logging.error(f"Error loading file {filepath}: {e}")
+            synapse.axon.status_code = 404
+            synapse.axon.status_message = "File not found"
+            return synapse
+
         if self.config.miner.verbose:
             bt.logging.debug(f"prev seed : {prev_seed}")
             bt.logging.debug(f"new seed  : {new_seed}")
@@ -810,30 +839,19 @@ class miner:
             seed=new_seed.decode("utf-8"),
         )
 
-        # Chunk the data according to the provided chunk_size
-        bt.logging.trace("entering chunk_data()")
-        data_chunks = chunk_data(encrypted_data_bytes, synapse.chunk_size)
-
-        # Extract setup params
-        g = hex_to_ecc_point(synapse.g, synapse.curve)
-        h = hex_to_ecc_point(synapse.h, synapse.curve)
-
-        # Commit the data chunks based on the provided curve points
-        bt.logging.trace("entering ECCcommitment()")
-        committer = ECCommitment(g, h)
-        bt.logging.trace("entering commit_data_with_seed()")
-        randomness, chunks, commitments, merkle_tree = commit_data_with_seed(
-            committer,
-            data_chunks=data_chunks,
-            n_chunks=sys.getsizeof(encrypted_data_bytes) // synapse.chunk_size + 1,
-            seed=synapse.seed,
-        )
+        if chunk is None:
+            bt.logging.error(
+                f"Challenge index {synapse.challenge_index} out of range for {synapse.challenge_hash}"
+            )
+            synapse.axon.status_code = 400
+            synapse.axon.status_message = "Challenge index out of range"
+            return synapse
 
         # Prepare return values to validator
         bt.logging.trace("entering b64_encode()")
-        synapse.commitment = commitments[synapse.challenge_index]
-        synapse.data_chunk = base64.b64encode(chunks[synapse.challenge_index])
-        synapse.randomness = randomness[synapse.challenge_index]
+        synapse.commitment = commitment
+        set_payload(synapse, chunk)
+        synapse.randomness = randomness
         synapse.merkle_proof = b64_encode(
             merkle_tree.get_proof(synapse.challenge_index)
         )
@@ -847,7 +865,7 @@ class miner:
             bt.logging.debug(f"merkle_proof: {str(synapse.merkle_proof[:24])}")
             bt.logging.debug(f"merkle_root: {str(synapse.merkle_root)[:24]}")
 
-        bt.logging.info(f"returning challenge data {synapse.data_chunk[:24]}...")
+        bt.logging.info(f"returning challenge data {chunk[:24]}...")
         return synapse
 
     async def retrieve(
@@ -865,7 +883,7 @@ class miner:
 
         Returns:
             storage.protocol.Retrieve: The synapse object is updated with the retrieved encrypted data
-            encoded in base64 and a commitment hash that serves as a proof of retrieval.
+            (raw bytes, or base64 for older validators) and a commitment hash that serves as a proof of retrieval.
 
         The method executes the following operations:
         1. Retrieves the metadata associated with the data hash from the Redis database.
@@ -873,7 +891,7 @@ class miner:
         3. Computes a new commitment using the previous seed from the metadata and the new seed from
         the synapse, which serves as a proof for the continuous possession of the data.
         4. Updates the metadata with the new seed and re-stores it in the database to prepare for future retrievals.
-        5. Encodes the encrypted data in base64 and attaches it to the synapse for return.
+        5. Attaches the encrypted data to the synapse for return, base64 encoded for older validators.
 
         This retrieval process is vital for data validation in decentralized storage systems, as it
         demonstrates not only possession but also the ability to return the data upon request, which
@@ -956,10 +974,9 @@ class miner:
         )
         bt.logging.debug(f"updated retrieve miner storage: {pformat(data)}")
 
-        # Return base64 data
-        bt.logging.trace("entering b64_encode()")
-        synapse.data = base64.b64encode(encrypted_data_bytes)
-        bt.logging.info(f"returning retrieved data {synapse.data[:24]}...")
+        # Return the data, as raw bytes or base64 encoded depending on the validator
+        set_payload(synapse, encrypted_data_bytes)
+        bt.logging.info(f"returning retrieved data {encrypted_data_bytes[:24]}...")
         return synapse
 
     def run(self):
@@ -33,7 +33,7 @@ from substrateinterface.base import SubstrateInterface
 from dotenv import load_dotenv
 
 from storage.shared.utils import get_redis_password
-from storage.shared.subtensor import get_current_block
+from storage.shared.subtensor import BlockCache, get_current_block
 from storage.shared.weights import should_set_weights
 from storage.validator.utils import (
     get_current_validtor_uid_round_robin,
@@ -55,8 +55,13 @@ from storage.validator.weights import (
     set_weights_for_validator,
 )
 from storage.validator.forward import forward
+from storage.validator.challenge import challenge_window_from_config
+from storage.validator.reward import verify_executor_from_config
 from storage.validator.encryption import setup_encryption_wallet
 from storage.validator.dendrite import timed_dendrite
+from storage.validator.liveness import LivenessTable
+from storage.validator.database import ensure_database_indexes
+from storage.validator.bonding import tier_cache
 
 load_dotenv()
 
@@ -160,6 +165,9 @@ class neuron:
         # Get initial block
         self.current_block = self.subtensor.get_current_block()
 
+        # Current block and hash served locally, refreshed by the subscription handler
+        self.block_cache = BlockCache(self.subtensor)
+
         # Setup database
         bt.logging.info("loading database")
         self.database = aioredis.StrictRedis(
@@ -180,18 +188,30 @@ class neuron:
         )
         bt.logging.info(f"Running validator on uid: {self.my_subnet_uid}")
 
+        # Recent miner responses, fed by the dendrite and consulted before pinging.
+        self.liveness = LivenessTable(
+            ttl=self.config.neuron.liveness_ttl,
+            failure_ttl=self.config.neuron.liveness_failure_ttl,
+        )
+
         # Dendrite pool for querying the network.
         bt.logging.debug("loading dendrite_pool")
         if self.config.neuron.mock_dendrite_pool:
             self.dendrite = MockDendrite()
         else:
-            self.dendrite = timed_dendrite(wallet=self.wallet)
+            self.dendrite = timed_dendrite(
+                wallet=self.wallet,
+                liveness=self.liveness,
+            )
 
         bt.logging.debug(str(self.dendrite))
 
         # Init the event loop.
         self.loop = asyncio.get_event_loop()
 
+        # Backfill the database indexes if this database predates them
+        self.loop.run_until_complete(ensure_database_indexes(self.database))
+
         self.wandb = None
 
         self.prev_step_block = get_current_block(self.subtensor)
@@ -212,6 +232,10 @@ class neuron:
         )
         self.last_purged_epoch = 0
 
+        # Rolling window of in-flight challenges carried across forward steps
+        self.challenge_window = challenge_window_from_config(self.config)
+        self.verify_executor = verify_executor_from_config(self.config)
+
     def run(self):
         bt.logging.info("run()")
 
@@ -357,6 +381,7 @@ class neuron:
             block_no = obj["header"]["number"]
             block_hash = substrate.get_block_hash(block_id=block_no)
             bt.logging.debug(f"subscription block hash: {block_hash}")
+            self.block_cache.update(block_no, block_hash)
             events = substrate.get_events(block_hash)
 
             for event in events:
@@ -369,6 +394,8 @@ class neuron:
                             f"{pformat(event_dict)}\n"
                         )
                         replaced_hotkey = self.metagraph.hotkeys[uid]
+                        tier_cache.invalidate(replaced_hotkey)
+                        tier_cache.invalidate(new_hotkey)
                         self.last_registered_block = block_no
                         self.rebalance_queue.append(replaced_hotkey)
                         self.metagraph.hotkeys[uid] = new_hotkey
@@ -422,10 +449,12 @@ class neuron:
 
     def __del__(self):
         """
-        Stops the subscription handler thread.
+        Stops the subscription handler thread and the verification pool.
         """
         if hasattr(self, "subscription_is_running"):
             self.stop_subscription_thread()
+        if hasattr(self, "verify_executor"):
+            self.verify_executor.shutdown(wait=False, cancel_futures=True)
 
 
 def run_validator():
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+
+import asyncio
+from redis import asyncio as aioredis
+import argparse
+import bittensor as bt
+
+from storage.shared.utils import get_redis_password
+from storage.shared.checks import check_environment
+from storage.validator.bonding import migrate_legacy_statistics
+
+
+async def main(args):
+    redis_password = get_redis_password(args.redis_password)
+    try:
+        await check_environment(
+            args.redis_conf_path, args.database_host, args.database_port, redis_password
+        )
+    except AssertionError as e:
+        bt.logging.warning(
+            f"Something is missing in your environment: {e}. Please check your configuration, use the README for help, and try again."
+        )
+        exit(1)
+
+    bt.logging.info(f"Loading database from {args.database_host}:{args.database_port}")
+    database = aioredis.StrictRedis(
+        host=args.database_host,
+        port=args.database_port,
+        db=args.database_index,
+        password=redis_password,
+    )
+
+    bt.logging.info("Migrating legacy retrieval_* statistics to retrieve_*...")
+    migrated = await migrate_legacy_statistics(database)
+    bt.logging.success(f"Migrated legacy statistics for {migrated} miners.")
+
+
+if __name__ == "__main__":
+    try:
+        parser = argparse.ArgumentParser()
+        parser.add_argument("--database_index", type=int, default=1)
+        parser.add_argument("--database_host", type=str, default="localhost")
+        parser.add_argument("--database_port", type=int, default=6379)
+        parser.add_argument(
+            "--redis_password",
+            type=str,
+            default=None,
+            help="password for the redis database",
+        )
+        parser.add_argument(
+            "--redis_conf_path",
+            type=str,
+            default="/etc/redis/redis.conf",
+            help="path to the redis configuration file",
+        )
+        args = parser.parse_args()
+
+        asyncio.run(main(args))
+    except KeyboardInterrupt:
+        print("KeyboardInterrupt")
+    except ValueError as e:
+        print(f"ValueError: {e}")
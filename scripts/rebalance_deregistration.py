@@ -8,6 +8,7 @@ import bittensor as bt
 from storage.shared.utils import get_redis_password
 from storage.shared.checks import check_environment
 from storage.validator.rebalance import rebalance_data
+from storage.validator.database import ensure_database_indexes
 
 
 async def main(args):
@@ -43,6 +44,7 @@ async def main(args):
             db=args.database_index,
             password=redis_password,
         )
+        await ensure_database_indexes(database)
 
         hotkeys = args.hotkeys.split(",")
         bt.logging.info(
@@ -28,7 +28,6 @@ import bittensor as bt
 from abc import ABC, abstractmethod
 from typing import Any, List, Union
 from storage.protocol import StoreUser
-from storage.validator.cid import generate_cid_string
 from storage.validator.encryption import encrypt_data
 from storage.api.base import Subnet21API
 from storage.api.utils import get_query_api_axons
@@ -48,7 +47,6 @@ class StoreUserAPI(Subnet21API):
         encrypted_data, encryption_payload = (
             encrypt_data(data, self.wallet) if encrypt else (data, "{}")
         )
-        expected_cid = generate_cid_string(encrypted_data)
         encoded_data = base64.b64encode(encrypted_data)
 
         synapse = StoreUser(
@@ -27,7 +27,7 @@ import argparse
 import storage
 from storage.validator.encryption import decrypt_data_with_private_key
 from storage.api.retrieve_api import retrieve
-from storage.shared.utils import list_all_hashes
+from storage.shared.utils import chunk_data, list_all_hashes, write_chunks
 
 import bittensor
 
@@ -40,6 +40,8 @@ from .default_values import defaults
 # Create a console instance for CLI display.
 console = bittensor.__console__
 
+# Retrieved data is written to disk in blocks of this size (bytes).
+WRITE_CHUNK_SIZE = 8 * 1024**2
 
 
 class RetrieveData:
@@ -146,9 +148,13 @@ class RetrieveData:
             success = True
 
         if success:
-            # Save the data
-            with open(outpath, "wb") as f:
-                f.write(data)
+            # Save the data, replacing any previous copy only once it is complete
+            partial_path = outpath + ".part"
+            with open(partial_path, "wb") as f:
+                await write_chunks(
+                    chunk_data(memoryview(data), WRITE_CHUNK_SIZE), f
+                )
+            os.replace(partial_path, outpath)
 
             bittensor.logging.info("Saved retrieved data to: {}".format(outpath))
         else:
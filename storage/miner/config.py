@@ -281,6 +281,12 @@ def add_args(cls, parser):
         help="If True, the miner doesnt start the axon.",
         default=False,
     )
+    parser.add_argument(
+        "--miner.eager_commitments",
+        action="store_true",
+        help="If True, the miner commits every chunk on the curve when challenged instead of only the challenged one.",
+        default=False,
+    )
 
     # Mocks.
     parser.add_argument(
@@ -20,8 +20,10 @@
 
 import os
 import json
+import mmap
 import time
 import shutil
+import hashlib
 import storage
 import wandb
 import copy
@@ -29,6 +31,7 @@ import asyncio
 import multiprocessing
 import bittensor as bt
 from collections import deque
+from contextlib import contextmanager
 
 from ..shared.ecc import (
     ecc_point_to_hex,
@@ -37,6 +40,13 @@ from ..shared.ecc import (
 from ..shared.merkle import (
     MerkleTree,
 )
+from ..shared.utils import (
+    chunk_data,
+)
+
+
+# Block size used when streaming a stored file through a hash function.
+STREAM_READ_BLOCK_SIZE = 1024 * 1024  # 1 MB
 
 
 def commit_data_with_seed(committer, data_chunks, n_chunks, seed):
@@ -77,6 +87,81 @@ def commit_data_with_seed(committer, data_chunks, n_chunks, seed):
     return randomness, chunks, points, merkle_tree
 
 
+def commit_data_with_seed_streaming(committer, data_chunks, seed, index):
+    """
+    Streaming counterpart of `commit_data_with_seed` that only retains the challenged chunk.
+    Every chunk is still committed and added to the Merkle tree so the root is identical to
+    the one produced by `commit_data_with_seed`, but chunk bytes are dropped as soon as their
+    commitment has been computed. Peak memory therefore depends on the chunk size rather than
+    on the size of the underlying file.
+
+    Parameters:
+    - committer: The committing object, which should have a commit method.
+    - data_chunks (iterable): An iterable (e.g. generator) of data chunks to be committed.
+    - seed: A seed value that is combined with data chunks before commitment.
+    - index (int): The index of the chunk whose values should be returned.
+
+    Returns:
+    - randomness (int): The randomness used for the commitment of the chunk at `index`.
+    - chunk (bytes): The data chunk at `index`.
+    - point (str): The commitment point of the chunk at `index` in hex format.
+    - merkle_tree (MerkleTree): A Merkle tree constructed from all commitment points.
+
+    If `index` is beyond the number of chunks, randomness, chunk and point are None.
+    """
+    merkle_tree = MerkleTree()
+    seed = str(seed).encode()
+
+    randomness, chunk, point = None, None, None
+    for i, data_chunk in enumerate(data_chunks):
+        c, m_val, r = committer.commit(data_chunk + seed)
+        c_hex = ecc_point_to_hex(c)
+        if i == index:
+            randomness, chunk, point = r, data_chunk, c_hex
+        merkle_tree.add_leaf(c_hex)
+
+    merkle_tree.make_tree()
+    return randomness, chunk, point, merkle_tree
+
+
+def commit_challenged_chunk_with_seed(committer, data_chunks, seed, index):
+    """
+    Lazily commits chunks of data so that only the challenged chunk is committed on the curve.
+    The validator only opens the commitment of the challenged chunk and checks its Merkle path,
+    so every other leaf is the SHA3-256 hash of its chunk and the seed instead of an elliptic
+    curve commitment. The Merkle root still binds every chunk of the data, but a challenge costs a
+    single commitment (two scalar multiplications) instead of one per chunk.
+
+    Parameters:
+    - committer: The committing object, which should have a commit method.
+    - data_chunks (iterable): An iterable (e.g. generator) of data chunks to be committed.
+    - seed: A seed value that is combined with data chunks before commitment.
+    - index (int): The index of the challenged chunk.
+
+    Returns:
+    - randomness (int): The randomness used for the commitment of the chunk at `index`.
+    - chunk (bytes): The data chunk at `index`.
+    - point (str): The commitment point of the chunk at `index` in hex format.
+    - merkle_tree (MerkleTree): A Merkle tree constructed from the leaves.
+
+    If `index` is beyond the number of chunks, randomness, chunk and point are None.
+    """
+    merkle_tree = MerkleTree()
+    seed = str(seed).encode()
+
+    randomness, chunk, point = None, None, None
+    for i, data_chunk in enumerate(data_chunks):
+        if i == index:
+            c, m_val, r = committer.commit(data_chunk + seed)
+            randomness, chunk, point = r, data_chunk, ecc_point_to_hex(c)
+            merkle_tree.add_leaf(point)
+        else:
+            merkle_tree.add_leaf(hashlib.sha3_256(data_chunk + seed).hexdigest())
+
+    merkle_tree.make_tree()
+    return randomness, chunk, point, merkle_tree
+
+
 def save_data_to_filesystem(data, directory, hotkey, filename):
     """
     Saves data to the filesystem at the specified directory and filename. If the directory does
@@ -119,6 +204,37 @@ def load_from_filesystem(filepath):
     return data
 
 
+@contextmanager
+def mmap_from_filesystem(filepath):
+    """
+    Memory-maps a file in the filesystem for read-only access.
+
+    Parameters:
+    - filepath (str): The path to the file that is to be mapped.
+
+    Yields:
+    - data (mmap.mmap | bytes): A read-only mapping of the file. Slicing it returns bytes and
+      only the touched pages are loaded into memory. Empty files, which cannot be mapped,
+      yield an empty bytes object instead.
+
+    The mapping is closed when the context exits, so slices must be copied out (slicing
+    already does this) before leaving the block.
+    """
+    with open(os.path.expanduser(filepath), "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            yield b""
+            return
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            mapped.madvise(mmap.MADV_SEQUENTIAL)
+        except (AttributeError, OSError):
+            pass  # madvise is not available on every platform.
+        try:
+            yield mapped
+        finally:
+            mapped.close()
+
+
 def compute_subsequent_commitment(data, previous_seed, new_seed, verbose=False):
     """
     Computes a new commitment based on provided data and a change from an old seed to a new seed.
@@ -146,6 +262,91 @@ def compute_subsequent_commitment(data, previous_seed, new_seed, verbose=False):
     return hash_data(str(proof).encode("utf-8") + new_seed), proof
 
 
+def compute_subsequent_commitment_streaming(
+    data, previous_seed, new_seed, verbose=False
+):
+    """
+    Streaming counterpart of `compute_subsequent_commitment`. Instead of concatenating the data
+    with the previous seed (which copies the whole buffer), the data is fed block by block into
+    an incremental SHA3-256 hasher. This makes it suitable for memory-mapped files.
+
+    Parameters:
+    - data (bytes | mmap.mmap): The original data, or a mapping of it, for which the commitment is being updated.
+    - previous_seed (bytes): The seed used in the previous commitment.
+    - new_seed (bytes): The seed to be used for the new commitment.
+    - verbose (bool): If True, additional debug information will be printed. Defaults to False.
+
+    Returns:
+    - A tuple containing the new commitment and the proof of the old commitment, identical to
+      the output of `compute_subsequent_commitment`.
+    """
+    if verbose:
+        bt.logging.debug("IN COMPUTE SUBESEQUENT COMMITMENT STREAMING")
+        bt.logging.debug("type of data     :", type(data))
+        bt.logging.debug("type of prev_seed:", type(previous_seed))
+        bt.logging.debug("type of new_seed :", type(new_seed))
+    hasher = hashlib.sha3_256()
+    for block in chunk_data(data, STREAM_READ_BLOCK_SIZE):
+        hasher.update(block)
+    hasher.update(previous_seed)
+    proof = int(hasher.hexdigest(), 16)
+    return hash_data(str(proof).encode("utf-8") + new_seed), proof
+
+
+def challenge_from_filesystem(
+    filepath,
+    committer,
+    chunk_size,
+    index,
+    previous_seed,
+    new_seed,
+    seed,
+    lazy=True,
+    verbose=False,
+):
+    """
+    Answers a storage challenge directly from a file on disk without loading it into memory.
+    The file is memory-mapped, hashed incrementally to produce the next commitment hash, and
+    then streamed chunk by chunk through the committer. Only the challenged chunk is kept.
+    When `lazy` is set, only the challenged chunk is committed on the curve (see
+    `commit_challenged_chunk_with_seed`), otherwise every chunk is.
+
+    Parameters:
+    - filepath (str): The path to the stored (encrypted) data.
+    - committer: The committing object, which should have a commit method.
+    - chunk_size (int): The size of the chunks the data is split into.
+    - index (int): The index of the challenged chunk.
+    - previous_seed (bytes): The seed used in the previous commitment.
+    - new_seed (bytes): The seed to be used for the new commitment.
+    - seed: The seed combined with each data chunk before commitment.
+    - lazy (bool): If True, only the challenged chunk is committed. Defaults to True.
+    - verbose (bool): If True, additional debug information will be printed. Defaults to False.
+
+    Returns:
+    - A tuple (next_commitment, proof, randomness, chunk, point, merkle_tree), see
+      `compute_subsequent_commitment` and `commit_data_with_seed_streaming`.
+
+    Raises:
+    - OSError: If the file cannot be opened or mapped.
+    """
+    with mmap_from_filesystem(filepath) as data:
+        next_commitment, proof = compute_subsequent_commitment_streaming(
+            data, previous_seed, new_seed, verbose=verbose
+        )
+        commit_fn = (
+            commit_challenged_chunk_with_seed
+            if lazy
+            else commit_data_with_seed_streaming
+        )
+        randomness, chunk, point, merkle_tree = commit_fn(
+            committer,
+            data_chunks=chunk_data(data, chunk_size),
+            seed=seed,
+            index=index,
+        )
+    return next_commitment, proof, randomness, chunk, point, merkle_tree
+
+
 def init_wandb(self, reinit=False):
     """Starts a new wandb run."""
     tags = [
@@ -42,6 +42,9 @@ class Store(bt.Synapse):
     commitment_hash: typing.Optional[str] = None  # includes seed
     ttl: typing.Optional[int] = None  # time to live (in seconds)
 
+    # Raw payload, kept out of the JSON (see storage.shared.transport)
+    _payload: typing.Optional[bytes] = pydantic.PrivateAttr(default=None)
+
     required_hash_fields: typing.List[str] = pydantic.Field(
         [
             "curve",
@@ -118,6 +121,9 @@ class Challenge(bt.Synapse):
     ] = None
     merkle_root: typing.Optional[str] = None
 
+    # Raw payload, kept out of the JSON (see storage.shared.transport)
+    _payload: typing.Optional[bytes] = pydantic.PrivateAttr(default=None)
+
     required_hash_fields: typing.List[str] = pydantic.Field(
         [  # TODO: can this be done? I want to verify that these values haven't changed, but
             # they are None intially...
@@ -165,6 +171,9 @@ class Retrieve(bt.Synapse):
     commitment_hash: typing.Optional[str] = None
     commitment_proof: typing.Optional[str] = None
 
+    # Raw payload, kept out of the JSON (see storage.shared.transport)
+    _payload: typing.Optional[bytes] = pydantic.PrivateAttr(default=None)
+
     required_hash_fields: typing.List[str] = pydantic.Field(
         ["data", "data_hash", "seed", "commtiment_proof", "commitment_hash"],
         title="Required Hash Fields",
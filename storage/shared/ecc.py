@@ -32,7 +32,7 @@ def hash_data(data):
     strings and then encoding to bytes before hashing.
 
     Parameters:
-    - data (bytes | bytearray | object): Data to be hashed.
+    - data (bytes | bytearray | memoryview | object): Data to be hashed.
 
     Returns:
     - int: Integer representation of the SHA3-256 hash of the input data.
@@ -40,11 +40,40 @@ def hash_data(data):
     Raises:
     - TypeError: If the hashing operation encounters an incompatible data type.
     """
-    if not isinstance(data, (bytes, bytearray)):
+    if not isinstance(data, (bytes, bytearray, memoryview)):
         data_str = str(data)
         data = data_str.encode()
-    h = hashlib.sha3_256(data).hexdigest()
-    return int(h, 16)
+    return int.from_bytes(hashlib.sha3_256(data).digest(), "big")
+
+
+class DataHasher:
+    """
+    Incremental version of `hash_data`, for data that arrives in pieces.
+
+    Example:
+        hasher = DataHasher()
+        for piece in pieces:
+            hasher.update(piece)
+        hasher.value() == hash_data(b"".join(pieces))
+    """
+
+    def __init__(self, data=b""):
+        self._hash = hashlib.sha3_256(data)
+
+    def update(self, data):
+        """
+        Feed the next piece of data.
+
+        Parameters:
+        - data (bytes | bytearray | memoryview): Piece of the data to be hashed.
+        """
+        self._hash.update(data)
+
+    def value(self):
+        """
+        Return the integer representation of the hash of the data fed so far, as `hash_data` does.
+        """
+        return int.from_bytes(self._hash.digest(), "big")
 
 
 def setup_CRS(curve="P-256"):
@@ -110,6 +139,166 @@ def hex_to_ecc_point(hex_str, curve):
     return ECC.EccPoint(x, y, curve=curve)
 
 
+# Field modulus and group order of the short Weierstrass curves supported by the
+# fixed-base tables. The doubling formula below relies on a = -3 (true for all NIST curves).
+FIXED_BASE_CURVES = {
+    "P-256": (
+        0xFFFFFFFF00000001000000000000000000000000FFFFFFFFFFFFFFFFFFFFFFFF,
+        0xFFFFFFFF00000000FFFFFFFFFFFFFFFFBCE6FAADA7179E84F3B9CAC2FC632551,
+    ),
+}
+
+
+def _jacobian_double(P, p):
+    """Doubles a point in Jacobian coordinates (a = -3). None is the point at infinity."""
+    if P is None:
+        return None
+    X, Y, Z = P
+    if Y == 0:
+        return None
+    delta = Z * Z % p
+    gamma = Y * Y % p
+    beta = X * gamma % p
+    alpha = 3 * (X - delta) * (X + delta) % p
+    X3 = (alpha * alpha - 8 * beta) % p
+    Z3 = ((Y + Z) * (Y + Z) - gamma - delta) % p
+    Y3 = (alpha * (4 * beta - X3) - 8 * gamma * gamma) % p
+    return X3, Y3, Z3
+
+
+def _jacobian_add_affine(P, Q, p):
+    """Adds an affine point Q = (x, y) to a Jacobian point P. None is the point at infinity."""
+    if P is None:
+        return Q[0], Q[1], 1
+    X1, Y1, Z1 = P
+    x2, y2 = Q
+    Z1Z1 = Z1 * Z1 % p
+    H = (x2 * Z1Z1 - X1) % p
+    r = (y2 * Z1 * Z1Z1 - Y1) % p
+    if H == 0:
+        return _jacobian_double(P, p) if r == 0 else None
+    HH = H * H % p
+    HHH = H * HH % p
+    V = X1 * HH % p
+    X3 = (r * r - HHH - 2 * V) % p
+    Y3 = (r * (V - X3) - Y1 * HHH) % p
+    Z3 = Z1 * H % p
+    return X3, Y3, Z3
+
+
+def _jacobian_to_affine(P, p):
+    """Converts a Jacobian point to affine (x, y). The point at infinity maps to (0, 0)."""
+    if P is None:
+        return 0, 0
+    X, Y, Z = P
+    z_inv = pow(Z, -1, p)
+    z_inv2 = z_inv * z_inv % p
+    return X * z_inv2 % p, Y * z_inv2 * z_inv % p
+
+
+def _batch_to_affine(points, p):
+    """Converts many finite Jacobian points to affine with a single field inversion."""
+    prefix = [1] * (len(points) + 1)
+    for i, (_, _, Z) in enumerate(points):
+        prefix[i + 1] = prefix[i] * Z % p
+    inv = pow(prefix[-1], -1, p)
+    affine = [None] * len(points)
+    for i in range(len(points) - 1, -1, -1):
+        X, Y, Z = points[i]
+        z_inv = inv * prefix[i] % p
+        inv = inv * Z % p
+        z_inv2 = z_inv * z_inv % p
+        affine[i] = (X * z_inv2 % p, Y * z_inv2 * z_inv % p)
+    return affine
+
+
+def _multi_scalar_multiply(points, scalars, p, order, window=4):
+    """
+    Computes sum(k_i * P_i) over affine points with Straus' interleaved method, so all terms share
+    one chain of doublings. Returns a Jacobian point, or None for the point at infinity.
+    """
+    digits = (1 << window) - 1
+    mask = digits
+    scalars = [k % order for k in scalars]
+
+    # Small multiples 1..2^w - 1 of every point, normalized together.
+    multiples = []
+    for point in points:
+        row = [(point[0], point[1], 1)]
+        for _ in range(digits - 1):
+            row.append(_jacobian_add_affine(row[-1], point, p))
+        multiples.extend(row)
+    multiples = _batch_to_affine(multiples, p) if multiples else []
+
+    n_windows = -(-max([k.bit_length() for k in scalars] or [0]) // window)
+    acc = None
+    for i in range(n_windows - 1, -1, -1):
+        for _ in range(window):
+            acc = _jacobian_double(acc, p)
+        shift = i * window
+        for j, k in enumerate(scalars):
+            digit = (k >> shift) & mask
+            if digit:
+                acc = _jacobian_add_affine(acc, multiples[j * digits + digit - 1], p)
+    return acc
+
+
+class FixedBaseTable:
+    """
+    Windowed fixed-base precomputation table for scalar multiplication of a single point.
+
+    For a window size `w`, the table holds the affine points j * 2^(w*i) * P for every window i
+    and every digit j in [1, 2^w). A scalar multiplication then needs one mixed addition per
+    non-zero window and no doublings. Building the table costs roughly ceil(256 / w) * 2^w
+    additions, so it pays off when the same base is multiplied several times (e.g. every chunk
+    of one challenge).
+
+    Attributes:
+        window (int): The window size in bits.
+        p (int): The field modulus of the curve.
+        order (int): The order of the curve group.
+        table (list of lists): The precomputed affine points, indexed by [window][digit - 1].
+    """
+
+    def __init__(self, point, curve="P-256", window=4):
+        if curve not in FIXED_BASE_CURVES:
+            raise ValueError(f"Fixed-base tables are not supported for curve {curve}")
+        self.p, self.order = FIXED_BASE_CURVES[curve]
+        self.window = window
+
+        n_windows = -(-self.order.bit_length() // window)
+        digits = (1 << window) - 1
+        base = (int(point.x), int(point.y))
+        self.table = []
+        for _ in range(n_windows):
+            row = [(base[0], base[1], 1)]
+            for _ in range(digits - 1):
+                row.append(_jacobian_add_affine(row[-1], base, self.p))
+            row = _batch_to_affine(row, self.p)
+            self.table.append(row)
+            # Next window base: 2^w * base = 2 * (2^(w-1) * base)
+            base = _jacobian_to_affine(
+                _jacobian_double((*row[(1 << (window - 1)) - 1], 1), self.p), self.p
+            )
+
+    def multiply(self, k):
+        """
+        Computes k * P in Jacobian coordinates, or None for the point at infinity.
+        """
+        k %= self.order
+        mask = (1 << self.window) - 1
+        p = self.p
+        acc = None
+        for row in self.table:
+            if not k:
+                break
+            digit = k & mask
+            if digit:
+                acc = _jacobian_add_affine(acc, row[digit - 1], p)
+            k >>= self.window
+        return acc
+
+
 class ECCommitment:
     """
     Elliptic Curve based commitment scheme allowing one to commit to a chosen value while keeping it hidden to others.
@@ -117,18 +306,57 @@ class ECCommitment:
     Attributes:
         g (ECC.EccPoint): The base point of the elliptic curve used as part of the commitment.
         h (ECC.EccPoint): Another random point on the elliptic curve used as part of the commitment.
+        precompute (bool): If True, fixed-base tables for g and h are built on first use and reused
+                           for every subsequent commit/open. Worth it when committing or opening many
+                           values under the same CRS.
+        window (int): The window size in bits of the fixed-base tables.
+        curve (str): The name of the curve g and h belong to.
 
     Methods:
         commit(m): Accepts a message, hashes it, and produces a commitment to the hashed message.
         open(c, m_val, r): Accepts a commitment, a hashed message, and a random value to verify the commitment.
+        commit_many(messages): Commits to a list of messages.
+        open_many(commitments, m_vals, rs): Verifies a list of commitments.
+        batch_open(commitments, m_vals, rs): Verifies a list of commitments all at once.
 
     The `commit` method will print the commitment process, and the `open` method will print the verification process.
+    Both modes produce identical points.
     """
 
-    def __init__(self, g, h, verbose=False):
+    def __init__(self, g, h, verbose=False, precompute=False, window=4, curve="P-256"):
         self.g = g  # Base point of the curve
         self.h = h  # Another random point on the curve
         self.verbose = verbose
+        self.precompute = precompute
+        self.window = window
+        self.curve = curve
+        self._tables = None
+
+    def _get_tables(self):
+        if self._tables is None:
+            self._tables = (
+                FixedBaseTable(self.g, curve=self.curve, window=self.window),
+                FixedBaseTable(self.h, curve=self.curve, window=self.window),
+            )
+        return self._tables
+
+    def _compute(self, m_val, r):
+        """
+        Computes g * m_val + h * r, using the fixed-base tables when precompute is enabled.
+        """
+        if not self.precompute:
+            c1 = self.g.__mul__(m_val)
+            c2 = self.h.__mul__(r)
+            return c1.__add__(c2)
+
+        g_table, h_table = self._get_tables()
+        p = g_table.p
+        c1 = g_table.multiply(m_val)
+        c2 = h_table.multiply(r)
+        if c2 is not None:
+            c1 = _jacobian_add_affine(c1, _jacobian_to_affine(c2, p), p)
+        x, y = _jacobian_to_affine(c1, p)
+        return ECC.EccPoint(x, y, curve=self.curve)
 
     def commit(self, m):  # AKA Seal.
         """
@@ -151,9 +379,7 @@ class ECCommitment:
         """
         m_val = hash_data(m)  # Compute hash of the data
         r = random.randint(1, 2**256)
-        c1 = self.g.__mul__(m_val)
-        c2 = self.h.__mul__(r)
-        c = c1.__add__(c2)
+        c = self._compute(m_val, r)
         if self.verbose:
             print(
                 f"Committing: Data = {m}\nHashed Value = {m_val}\nRandom Value = {r}\nComputed Commitment = {c}\n"
@@ -181,11 +407,80 @@ class ECCommitment:
         Raises:
         - Exception: If the verification calculation fails.
         """
-        c1 = self.g.__mul__(m_val)
-        c2 = self.h.__mul__(r)
-        computed_c = c1.__add__(c2)
+        computed_c = self._compute(m_val, r)
         if self.verbose:
             print(
                 f"\nOpening: Hashed Value = {m_val}\nRandom Value = {r}\nRecomputed Commitment = {computed_c}\nOriginal Commitment = {c}"
             )
         return computed_c == c
+
+    def commit_many(self, messages):
+        """
+        Create commitments to a list of messages under the same public parameters.
+
+        Parameters:
+        - messages (list): The messages to commit to.
+
+        Returns:
+        - list: A list of (commitment, hashed message value, random number) tuples, one per message.
+        """
+        return [self.commit(m) for m in messages]
+
+    def open_many(self, commitments, m_vals, rs):
+        """
+        Verify a list of commitments under the same public parameters.
+
+        Parameters:
+        - commitments (list of ECC.EccPoint): The commitment points to verify.
+        - m_vals (list of int): The hashed message values, one per commitment.
+        - rs (list of int): The random numbers, one per commitment.
+
+        Returns:
+        - list of bool: The verification result of each commitment.
+        """
+        return [self.open(c, m_val, r) for c, m_val, r in zip(commitments, m_vals, rs)]
+
+    def batch_open(self, commitments, m_vals, rs):
+        """
+        Verify a list of commitments at once with a random linear combination.
+
+        Instead of checking c_i == g * m_i + h * r_i for every i, random 128-bit weights a_i are
+        drawn and the single equation
+
+            sum(a_i * c_i) - g * sum(a_i * m_i) - h * sum(a_i * r_i) == 0
+
+        is checked with one multi-scalar multiplication. If every commitment is valid this always
+        holds; if any is invalid it holds with probability at most 2^-128. A failed batch does not
+        say which commitment is invalid, use `open_many` for that.
+
+        Parameters:
+        - commitments (list of ECC.EccPoint): The commitment points to verify.
+        - m_vals (list of int): The hashed message values, one per commitment.
+        - rs (list of int): The random numbers, one per commitment.
+
+        Returns:
+        - bool: True if all commitments are valid, False otherwise.
+        """
+        if self.curve not in FIXED_BASE_CURVES or len(commitments) < 2:
+            # A single commitment is cheaper to open directly.
+            return all(self.open_many(commitments, m_vals, rs))
+
+        p, order = FIXED_BASE_CURVES[self.curve]
+        weights = [random.randint(1, 2**128) for _ in commitments]
+        m_sum = sum(a * m_val for a, m_val in zip(weights, m_vals))
+        r_sum = sum(a * r for a, r in zip(weights, rs))
+
+        points, scalars = [], []
+        for a, c in zip(weights, commitments):
+            if not c.is_point_at_infinity():
+                points.append((int(c.x), int(c.y)))
+                scalars.append(a)
+        for base, k in ((self.g, -m_sum), (self.h, -r_sum)):
+            if not base.is_point_at_infinity():
+                points.append((int(base.x), int(base.y)))
+                scalars.append(k)
+
+        result = _multi_scalar_multiply(points, scalars, p, order)
+        if self.verbose:
+            print(f"\nBatch opening {len(commitments)} commitments: {result is None}")
+        return result is None
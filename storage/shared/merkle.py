@@ -18,23 +18,52 @@
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 
+import sys
 import json
+import struct
 import hashlib
 import binascii
+from array import array
+from itertools import accumulate
+
+
+# Binary serialization: magic, format version, flags, hash digest size, leaf count, leaf data size
+SERIALIZATION_MAGIC = b"MRKL"
+SERIALIZATION_VERSION = 1
+_HEADER = struct.Struct("<4sBBHQQ")
+_FLAG_READY = 1
+_FLAG_UNIFORM_LEAVES = 2
+
+# Number of leaves or nodes processed at once when building a tree
+_BATCH_SIZE = 4096
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
 
 
 class MerkleTree(object):
     """
     Represents a Merkle Tree, a data structure used for efficiently summarizing and verifying the
     integrity of large sets of data. The Merkle Tree is a binary tree where each leaf node is the hash
-    of a data block and every non-leaf node is the hash of its children nodes.
+    of a data block and every non-leaf node is the hash of its children nodes. At each level, a node
+    without a sibling is promoted to the next level unchanged.
+
+    The tree is stored compactly: the leaves are concatenated in one buffer indexed by an array of
+    offsets, and the hashed nodes of every level above them are stored in a second contiguous buffer,
+    level after level from the bottom up. Parents and siblings are found with index arithmetic, and
+    promoted nodes are not stored again but resolved to the node they were promoted from.
 
     Attributes:
         hash_function (callable): The hash function used for generating hashes of the blocks
                                   and non-leaf nodes in the Merkle Tree.
         leaves (list): A list where each element is a bytearray representing the hashed value of a leaf.
+                       Built on access, from the leaf buffer.
         levels (list of lists): A list of lists where each sublist represents a level of the tree, starting
-                                from the leaves up to the root.
+                                from the root down to the leaves. Built on access, from the node buffers.
         is_ready (bool): Indicates whether the tree has been fully constructed and is ready to provide
                          the Merkle root and proofs.
 
@@ -52,9 +81,10 @@ class MerkleTree(object):
                           can reproduce the Merkle root.
         update_leaf(index, new_value): Updates the value of the leaf at the given index with `new_value`
                                       and recalculates the hashes up the tree to reflect this change.
-        serialize(): Converts the Merkle Tree into a JSON-formatted string for storage or transmission.
-        deserialize(json_data, hash_type="sha3_256"): Reconstructs the Merkle Tree from a JSON string,
-                                                      using the specified hash function.
+        serialize(): Converts the Merkle Tree into a compact binary format for storage or transmission.
+        deserialize(data, hash_type="sha3_256"): Reconstructs the Merkle Tree from its binary format (or
+                                                 the JSON format of earlier versions), using the specified
+                                                 hash function.
 
     Raises:
         Exception: If the `hash_type` provided during initialization is not supported or recognized.
@@ -75,9 +105,8 @@ class MerkleTree(object):
         # Get proof of inclusion for the first data block
         proof = merkle_tree.get_proof(0)
 
-        # Update the value of the first leaf and reconstruct the tree
+        # Update the value of the first leaf, which also updates the root
         merkle_tree.update_leaf(0, 'new_block1_hashed_value')
-        merkle_tree.make_tree()
 
         # Serialize the tree for storage
         serialized_tree = merkle_tree.serialize()
@@ -97,13 +126,19 @@ class MerkleTree(object):
             self.hash_function = getattr(hashlib, hash_type)
         else:
             raise Exception("`hash_type` {} nor supported".format(hash_type))
+        self.digest_size = self.hash_function().digest_size
 
         self.reset_tree()
 
     def __eq__(self, other):
         if not isinstance(other, MerkleTree):
             return False
-        return self.serialize() == other.serialize()
+        return (
+            self.is_ready == other.is_ready
+            and self._leaf_offsets == other._leaf_offsets
+            and self._leaf_data == other._leaf_data
+            and (not self.is_ready or self._nodes == other._nodes)
+        )
 
     def _to_hex(self, x):
         try:  # python3
@@ -112,46 +147,115 @@ class MerkleTree(object):
             return binascii.hexlify(x)
 
     def reset_tree(self):
-        self.leaves = list()
-        self.levels = None
+        self._leaf_data = bytearray()
+        self._leaf_offsets = array("Q", [0])
+        self._leaf_size = 0
+        self._nodes = bytearray()
+        # Number of nodes of each level, from the leaves up, and the position of the first hashed
+        # node of each level above the leaves in `_nodes`
+        self._level_sizes = []
+        self._level_starts = []
         self.is_ready = False
 
+    @property
+    def leaves(self):
+        return [bytearray(self._leaf(index)) for index in range(self.get_leaf_count())]
+
+    @property
+    def levels(self):
+        if not self.is_ready or not self._level_sizes:
+            return None
+        return [
+            [bytearray(self._node(level, index)) for index in range(size)]
+            for level, size in reversed(list(enumerate(self._level_sizes)))
+        ]
+
     def add_leaf(self, values, do_hash=False):
         self.is_ready = False
         # check if single leaf
         if not isinstance(values, tuple) and not isinstance(values, list):
             values = [values]
-        for v in values:
+        # Leaves are appended in batches, which bounds the temporary objects
+        for first in range(0, len(values), _BATCH_SIZE):
+            batch = values[first : first + _BATCH_SIZE]
             if do_hash:
-                v = v.encode("utf-8")
-                v = self.hash_function(v).hexdigest()
-            v = bytearray.fromhex(v)
-            self.leaves.append(v)
+                batch = [self.hash_function(v.encode("utf-8")).digest() for v in batch]
+            else:
+                batch = [bytes.fromhex(v) for v in batch]
+            for size in {len(v) for v in batch}:
+                self._note_leaf_size(size)
+            ends = accumulate((len(v) for v in batch), initial=len(self._leaf_data))
+            next(ends)
+            self._leaf_offsets.extend(ends)
+            self._leaf_data += b"".join(batch)
+
+    def _note_leaf_size(self, size):
+        # `_leaf_size` is the size shared by every leaf, or None once leaves of different sizes were added
+        if self._leaf_size == 0 and self.get_leaf_count() == 0:
+            self._leaf_size = size
+        elif self._leaf_size != size:
+            self._leaf_size = None
+
+    def _leaf(self, index):
+        return self._leaf_data[
+            self._leaf_offsets[index] : self._leaf_offsets[index + 1]
+        ]
+
+    def _hashed(self, level, index):
+        start = (self._level_starts[level - 1] + index) * self.digest_size
+        return self._nodes[start : start + self.digest_size]
+
+    def _resolve(self, level, index):
+        # A node without a sibling is the last node of its level, and was promoted
+        # unchanged from the level below
+        while level > 0 and index == self._level_sizes[level - 1] // 2:
+            level, index = level - 1, index * 2
+        return level, index
+
+    def _node(self, level, index):
+        level, index = self._resolve(level, index)
+        return self._hashed(level, index) if level else self._leaf(index)
 
     def get_leaf(self, index):
-        return self._to_hex(self.leaves[index])
+        return self._to_hex(self._leaf(index))
 
     def get_leaf_count(self):
-        return len(self.leaves)
+        return len(self._leaf_offsets) - 1
 
     def get_tree_ready_state(self):
         return self.is_ready
 
-    def _calculate_next_level(self):
-        solo_leave = None
-        N = len(self.levels[0])  # number of leaves on the level
-        if N % 2 == 1:  # if odd number of leaves on the level
-            solo_leave = self.levels[0][-1]
-            N -= 1
-
-        new_level = []
-        for l, r in zip(self.levels[0][0:N:2], self.levels[0][1:N:2]):
-            new_level.append(self.hash_function(l + r).digest())
-        if solo_leave is not None:
-            new_level.append(solo_leave)
-        self.levels = [
-            new_level,
-        ] + self.levels  # prepend new level
+    def _make_levels(self):
+        count = self.get_leaf_count()
+        self._level_sizes = [count] if count > 0 else []
+        self._level_starts = []
+        while count > 1:
+            self._level_starts.append(
+                self._level_starts[-1] + self._level_sizes[-2] // 2
+                if self._level_starts
+                else 0
+            )
+            count = (count + 1) // 2
+            self._level_sizes.append(count)
+
+    def _hash_pair(self, level, index):
+        """Returns the hash of the children of the hashed node at `index` of `level`."""
+        below = level - 1
+        left = self._resolve(below, 2 * index)
+        right = self._resolve(below, 2 * index + 1)
+        if left[0] == right[0]:
+            # Both children are stored next to each other, so they are hashed in place
+            if below:
+                start = (self._level_starts[below - 1] + left[1]) * self.digest_size
+                pair = memoryview(self._nodes)[start : start + 2 * self.digest_size]
+            else:
+                pair = memoryview(self._leaf_data)[
+                    self._leaf_offsets[left[1]] : self._leaf_offsets[left[1] + 2]
+                ]
+            return self.hash_function(pair).digest()
+        hasher = self.hash_function(self._node(*left))
+        hasher.update(self._node(*right))
+        return hasher.digest()
 
     def make_tree(self):
         """
@@ -161,22 +265,56 @@ class MerkleTree(object):
         get_merkle_root or get_proof to ensure the tree is constructed.
         """
         self.is_ready = False
-        if self.get_leaf_count() > 0:
-            self.levels = [
-                self.leaves,
-            ]
-            while len(self.levels[0]) > 1:
-                self._calculate_next_level()
+        self._make_levels()
+
+        # A tree of n leaves has n - 1 hashed nodes, written in a single pass from the bottom up
+        size = self.digest_size
+        hash_function = self.hash_function
+        self._nodes = bytearray(max(self.get_leaf_count() - 1, 0) * size)
+        leaves, offsets = self._leaf_data, self._leaf_offsets
+        leaf_size = self._leaf_size
+        nodes = self._nodes
+        for level in range(1, len(self._level_sizes)):
+            pairs = self._level_sizes[level - 1] // 2
+            # Only the last pair of a level can have a promoted child, stored elsewhere
+            plain = pairs - (
+                level > 1 and self._resolve(level - 1, 2 * pairs - 1)[0] != level - 1
+            )
+            start = self._level_starts[level - 1] * size
+            # Children of a fixed size are hashed straight from the buffer below
+            if level == 1:
+                below, base, width = leaves, 0, 2 * (leaf_size or 0)
+            else:
+                below, base, width = (
+                    nodes,
+                    self._level_starts[level - 2] * size,
+                    2 * size,
+                )
+            for first in range(0, plain, _BATCH_SIZE):
+                last = min(first + _BATCH_SIZE, plain)
+                if width:
+                    hashes = [
+                        hash_function(below[i : i + width]).digest()
+                        for i in range(base + first * width, base + last * width, width)
+                    ]
+                else:
+                    hashes = [
+                        hash_function(
+                            leaves[offsets[2 * i] : offsets[2 * i + 2]]
+                        ).digest()
+                        for i in range(first, last)
+                    ]
+                nodes[start + first * size : start + last * size] = b"".join(hashes)
+            if plain < pairs:
+                nodes[start + plain * size : start + pairs * size] = self._hash_pair(
+                    level, plain
+                )
         self.is_ready = True
 
     def get_merkle_root(self):
-        if self.is_ready:
-            if self.levels is not None:
-                return self._to_hex(self.levels[0][0])
-            else:
-                return None
-        else:
-            return None
+        if self.is_ready and self._level_sizes:
+            return self._to_hex(self._node(len(self._level_sizes) - 1, 0))
+        return None
 
     def get_proof(self, index):
         """
@@ -198,11 +336,6 @@ class MerkleTree(object):
                            string representing the hexadecimal hash value of the sibling. If the tree is not
                            ready or the index is out of bounds, None is returned.
 
-        Raises:
-            IndexError: If the index provided is not within the range of the leaves in the tree.
-            ValueError: If the tree has not been constructed by calling `make_tree` method, or the index
-                        is not an integer.
-
         Example:
             # Assuming `merkle_tree` is an instance of `MerkleTree` and has been populated with leaves and made ready
             proof = merkle_tree.get_proof(2)
@@ -213,26 +346,32 @@ class MerkleTree(object):
             which occurs after the `make_tree` method has been called. If the tree is not ready or the index
             is not valid, the method will return None.
         """
-        if self.levels is None:
+        if not self.is_ready or not self._level_sizes:
             return None
-        elif not self.is_ready or index > len(self.leaves) - 1 or index < 0:
+        elif index > self.get_leaf_count() - 1 or index < 0:
             return None
-        else:
-            proof = []
-            for x in range(len(self.levels) - 1, 0, -1):
-                level_len = len(self.levels[x])
-                if (index == level_len - 1) and (
-                    level_len % 2 == 1
-                ):  # skip if this is an odd end node
-                    index = int(index / 2.0)
-                    continue
-                is_right_node = index % 2
-                sibling_index = index - 1 if is_right_node else index + 1
-                sibling_pos = "left" if is_right_node else "right"
-                sibling_value = self._to_hex(self.levels[x][sibling_index])
-                proof.append({sibling_pos: sibling_value})
-                index = int(index / 2.0)
-            return proof
+        proof = []
+        size = self.digest_size
+        for level, level_len in enumerate(self._level_sizes[:-1]):
+            if (index == level_len - 1) and (
+                level_len % 2 == 1
+            ):  # skip if this is an odd end node
+                index //= 2
+                continue
+            is_right_node = index % 2
+            sibling_index = index - 1 if is_right_node else index + 1
+            sibling_pos = "left" if is_right_node else "right"
+            if level and sibling_index != self._level_sizes[level - 1] // 2:
+                start = (self._level_starts[level - 1] + sibling_index) * size
+                sibling = self._nodes[start : start + size]
+            elif level == 0 and self._leaf_size:
+                start = sibling_index * self._leaf_size
+                sibling = self._leaf_data[start : start + self._leaf_size]
+            else:
+                sibling = self._node(level, sibling_index)
+            proof.append({sibling_pos: sibling.hex()})
+            index //= 2
+        return proof
 
     def update_leaf(self, index, new_value):
         """
@@ -241,7 +380,7 @@ class MerkleTree(object):
 
         This method allows the Merkle Tree to maintain integrity by ensuring that any updates to the leaf
         nodes are propagated upwards, resulting in a new Merkle root that represents the current state of
-        the leaves.
+        the leaves, the same as rebuilding the tree with `make_tree`.
 
         Parameters:
             index (int): The index of the leaf to update. The index is zero-based and must be less than
@@ -254,9 +393,7 @@ class MerkleTree(object):
             None
 
         Raises:
-            ValueError: If the tree is not ready for updates (i.e., `is_ready` is False), if the index is
-                        not an integer, if the new_value is not a hexadecimal string, or if the index is
-                        out of bounds (less than 0 or greater than or equal to the number of leaves).
+            ValueError: If the new_value is not a hexadecimal string.
             IndexError: If the index is out of the range of current leaves.
 
         Example:
@@ -266,66 +403,110 @@ class MerkleTree(object):
 
         Note:
             The tree must have been constructed and be in a ready state before calling this method. If the
-            tree has not been made by calling the `make_tree` method, or the index is invalid, this method
-            will not perform an update and will return None.
+            tree has not been made by calling the `make_tree` method, this method will not perform an
+            update and will return None.
         """
         if not self.is_ready:
             return None
-        new_value = bytearray.fromhex(new_value)
-        self.levels[-1][index] = new_value
-        for x in range(len(self.levels) - 1, 0, -1):
-            parent_index = index // 2
-            left_child = self.levels[x][parent_index * 2]
-            try:
-                right_child = self.levels[x][parent_index * 2 + 1]
-            except IndexError:
-                right_child = bytearray()
-            self.levels[x - 1][parent_index] = self.hash_function(
-                left_child + right_child
-            ).digest()
-            index = parent_index
+        if not 0 <= index < self.get_leaf_count():
+            raise IndexError("Leaf index out of range")
+        new_value = bytes.fromhex(new_value)
+        start, end = self._leaf_offsets[index], self._leaf_offsets[index + 1]
+        self._leaf_data[start:end] = new_value
+        shift = len(new_value) - (end - start)
+        if shift:
+            self._leaf_size = len(new_value) if self.get_leaf_count() == 1 else None
+            for i in range(index + 1, len(self._leaf_offsets)):
+                self._leaf_offsets[i] += shift
+
+        for level in range(1, len(self._level_sizes)):
+            index //= 2
+            if index == self._level_sizes[level - 1] // 2:
+                continue  # promoted, so it is the updated node itself
+            position = (self._level_starts[level - 1] + index) * self.digest_size
+            self._nodes[position : position + self.digest_size] = self._hash_pair(
+                level, index
+            )
 
     def serialize(self):
         """
-        Serializes the MerkleTree object into a JSON string.
+        Serializes the MerkleTree object into a compact binary format: a header, the leaf offsets (unless
+        all leaves have the same size), the leaves, and the hashed nodes if the tree is ready.
         """
-        # Convert the bytearray leaves and levels to hex strings for serialization
-        leaves = [self._to_hex(leaf) for leaf in self.leaves]
-        levels = None
-        if self.levels is not None:
-            levels = []
-            for level in self.levels:
-                levels.append([self._to_hex(item) for item in level])
-
-        # Construct a dictionary with the MerkleTree properties
-        merkle_tree_data = {
-            "leaves": leaves,
-            "levels": levels,
-            "is_ready": self.is_ready,
-        }
-
-        # Convert the dictionary to a JSON string
-        return json.dumps(merkle_tree_data)
+        count = self.get_leaf_count()
+        flags = (_FLAG_READY if self.is_ready else 0) | (
+            _FLAG_UNIFORM_LEAVES if self._leaf_size is not None else 0
+        )
+        parts = [
+            _HEADER.pack(
+                SERIALIZATION_MAGIC,
+                SERIALIZATION_VERSION,
+                flags,
+                self.digest_size,
+                count,
+                len(self._leaf_data),
+            )
+        ]
+        if not flags & _FLAG_UNIFORM_LEAVES:
+            parts.append(_little_endian(self._leaf_offsets))
+        parts.append(self._leaf_data)
+        if self.is_ready:
+            parts.append(self._nodes)
+        return b"".join(parts)
 
     @classmethod
-    def deserialize(cls, json_data, hash_type="sha3_256"):
+    def deserialize(cls, data, hash_type="sha3_256"):
         """
-        Deserializes the JSON string into a MerkleTree object.
+        Deserializes a MerkleTree object from its binary format, or from the JSON string of earlier versions.
+        """
+        if isinstance(data, str) or data[:1] == b"{":
+            return cls._deserialize_json(data, hash_type)
+
+        m_tree = cls(hash_type)
+        magic, version, flags, digest_size, count, data_size = _HEADER.unpack_from(data)
+        if magic != SERIALIZATION_MAGIC or version != SERIALIZATION_VERSION:
+            raise ValueError("Not a serialized MerkleTree")
+        if digest_size != m_tree.digest_size:
+            raise ValueError("Serialized MerkleTree uses another hash function")
+
+        position = _HEADER.size
+        if flags & _FLAG_UNIFORM_LEAVES:
+            m_tree._leaf_size = data_size // count if count else 0
+            m_tree._leaf_offsets = array(
+                "Q", (i * m_tree._leaf_size for i in range(count + 1))
+            )
+        else:
+            m_tree._leaf_offsets = array("Q")
+            m_tree._leaf_offsets.frombytes(data[position : position + 8 * (count + 1)])
+            if sys.byteorder == "big":
+                m_tree._leaf_offsets.byteswap()
+            position += 8 * (count + 1)
+            m_tree._leaf_size = None
+        m_tree._leaf_data = bytearray(data[position : position + data_size])
+        position += data_size
+
+        if flags & _FLAG_READY:
+            # The hashed nodes are restored rather than computed again
+            m_tree._nodes = bytearray(data[position:])
+            if len(m_tree._nodes) != max(count - 1, 0) * m_tree.digest_size:
+                raise ValueError("Serialized MerkleTree is truncated")
+            m_tree._make_levels()
+            m_tree.is_ready = True
+        return m_tree
+
+    @classmethod
+    def _deserialize_json(cls, json_data, hash_type="sha3_256"):
+        """
+        Deserializes the JSON string of earlier versions into a MerkleTree object.
         """
         # Convert the JSON string back to a dictionary
         merkle_tree_data = json.loads(json_data)
 
         # Create a new MerkleTree object
         m_tree = cls(hash_type)
-
-        # Convert the hex strings back to bytearrays and set the leaves and levels
-        m_tree.leaves = [bytearray.fromhex(leaf) for leaf in merkle_tree_data["leaves"]]
-        if merkle_tree_data["levels"] is not None:
-            m_tree.levels = []
-            for level in merkle_tree_data["levels"]:
-                m_tree.levels.append([bytearray.fromhex(item) for item in level])
-        m_tree.is_ready = merkle_tree_data["is_ready"]
-
+        m_tree.add_leaf(merkle_tree_data["leaves"])
+        if merkle_tree_data["is_ready"]:
+            m_tree.make_tree()
         return m_tree
 
 
@@ -383,3 +564,52 @@ def validate_merkle_proof(proof, target_hash, merkle_root, hash_type="sha3_256")
                 sibling = bytearray.fromhex(p["right"])
                 proof_hash = hash_func(proof_hash + sibling).digest()
         return proof_hash == merkle_root
+
+
+def validate_merkle_proofs(pairs, merkle_root, hash_type="sha3_256"):
+    """
+    Validates several Merkle proofs against the same root in one pass, e.g. the proofs of several leaves
+    of one tree. Proofs of the same tree share the nodes near the root, so every node computed is memoized
+    by its children and only hashed once for the whole batch.
+
+    Parameters:
+        pairs (iterable of tuples): (proof, target_hash) pairs, each as the `proof` and `target_hash`
+            parameters of `validate_merkle_proof`.
+        merkle_root (str): The hexadecimal string representation of the Merkle root all proofs are
+            validated against.
+        hash_type (str, optional): The type of hash function used to construct the Merkle tree. Defaults
+            to "sha3_256".
+
+    Returns:
+        list of bool: For each pair, whether its proof is valid, as `validate_merkle_proof` would return.
+            A malformed proof (missing keys or invalid hexadecimal strings) is not valid, rather than
+            raising an exception for the whole batch.
+
+    Example:
+        proofs = [merkle_tree.get_proof(index) for index in indices]
+        leaves = [merkle_tree.get_leaf(index) for index in indices]
+        validate_merkle_proofs(zip(proofs, leaves), merkle_tree.get_merkle_root())  # [True, True, ...]
+    """
+    hash_func = getattr(hashlib, hash_type)
+    merkle_root = bytes.fromhex(merkle_root)
+    parents = {}  # parent hashes, by the concatenation of their children
+    results = []
+    for proof, target_hash in pairs:
+        try:
+            proof_hash = bytes.fromhex(target_hash)
+            for p in proof:
+                if "left" in p:
+                    # the sibling is a left node
+                    children = bytes.fromhex(p["left"]) + proof_hash
+                else:
+                    # the sibling is a right node
+                    children = proof_hash + bytes.fromhex(p["right"])
+                parent = parents.get(children)
+                if parent is None:
+                    parent = parents[children] = hash_func(children).digest()
+                proof_hash = parent
+        except (KeyError, TypeError, ValueError):
+            results.append(False)
+            continue
+        results.append(proof_hash == merkle_root)
+    return results
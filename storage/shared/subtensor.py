@@ -1,7 +1,7 @@
 import time
 from math import floor
 from functools import lru_cache, update_wrapper
-from typing import Callable, Any
+from typing import Callable, Any, Optional, Tuple
 
 
 def _ttl_hash_gen(seconds: int):
@@ -34,3 +34,50 @@ def ttl_cache(maxsize: int = 128, typed: bool = False, ttl: int = -1):
 @ttl_cache(maxsize=1, ttl=12)
 def get_current_block(subtensor) -> int:
     return subtensor.get_current_block()
+
+
+class BlockCache:
+    """
+    Serves the current block number and hash locally, so that seed derivation and event
+    logging do not each cost two subtensor round trips.
+
+    The cache is pushed to once per block by a block header subscription (see `update`).
+    Without one, or if it stalls, the values are fetched from the subtensor lazily once
+    they are older than `max_age` seconds (one block).
+    """
+
+    def __init__(self, subtensor, max_age: float = 12):
+        self.subtensor = subtensor
+        self.max_age = max_age
+        # (block, block_hash, monotonic update time), replaced atomically
+        self._state: Optional[Tuple[int, Optional[str], float]] = None
+
+    def update(self, block: int, block_hash: Optional[str]):
+        """Records a new block, e.g. from a block header subscription thread."""
+        self._state = (int(block), block_hash, time.monotonic())
+
+    def refresh(self) -> Tuple[int, Optional[str], float]:
+        """Fetches the current block and its hash from the subtensor."""
+        block = self.subtensor.get_current_block()
+        self.update(block, self.subtensor.get_block_hash(block))
+        return self._state
+
+    def _current(self) -> Tuple[int, Optional[str], float]:
+        state = self._state
+        if state is None or time.monotonic() - state[2] > self.max_age:
+            state = self.refresh()
+        return state
+
+    @property
+    def block(self) -> int:
+        """The current block number."""
+        return self._current()[0]
+
+    @property
+    def block_hash(self) -> Optional[str]:
+        """The hash of the current block."""
+        state = self._current()
+        if state[1] is None:
+            # The hash lookup failed last time, try again
+            state = self.refresh()
+        return state[1]
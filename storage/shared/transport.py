@@ -0,0 +1,286 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+# Copyright © 2023 philanthrope
+# Copyright © 2024 Synapse Labs Corp.
+
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import sys
+import base64
+import struct
+import typing
+import contextvars
+import bittensor as bt
+from starlette.datastructures import Headers, MutableHeaders
+
+
+# Version of the transport protocol, sent in the PROTOCOL_HEADER of every request and
+# response. Peers that do not send it are at version 0.
+PROTOCOL_VERSION = 1
+PROTOCOL_HEADER = "x-storage-protocol"
+
+# First protocol version that exchanges synapse payloads as raw bytes.
+BINARY_PAYLOAD_VERSION = 1
+
+# Content type of a body made of the synapse JSON followed by its raw payload.
+BINARY_CONTENT_TYPE = "application/x-storage-payload"
+
+# The field of each synapse that can travel as raw bytes instead of base64 in the JSON.
+PAYLOAD_FIELDS = {
+    "Store": "encrypted_data",
+    "Retrieve": "data",
+    "Challenge": "data_chunk",
+}
+
+# Length of the synapse JSON, in front of it in a binary body.
+_HEADER_LENGTH = struct.Struct(">Q")
+
+
+def protocol_version(headers) -> int:
+    """
+    Returns the transport protocol version advertised in the headers of a request or
+    response, 0 for peers that predate it.
+    """
+    try:
+        return int(headers.get(PROTOCOL_HEADER, 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+def pack_payload(header: bytes, payload: bytes) -> typing.List[bytes]:
+    """
+    Builds a binary body from the synapse JSON and its raw payload.
+
+    Args:
+        header (bytes): The JSON serialized synapse, without the payload.
+        payload (bytes): The raw payload.
+
+    Returns:
+        List[bytes]: The pieces of the body, to be sent one after the other so that the
+            payload is never copied into a larger buffer.
+    """
+    return [_HEADER_LENGTH.pack(len(header)) + header, payload]
+
+
+def unpack_payload(body: bytes) -> typing.Tuple[bytes, bytes]:
+    """
+    Splits a binary body into the synapse JSON and its raw payload.
+
+    Raises:
+        ValueError: If the body is truncated.
+    """
+    if len(body) < _HEADER_LENGTH.size:
+        raise ValueError("Binary body is missing its header length")
+    (length,) = _HEADER_LENGTH.unpack_from(body)
+    end = _HEADER_LENGTH.size + length
+    if end > len(body):
+        raise ValueError(f"Binary body is shorter than its {length} bytes header")
+    return body[_HEADER_LENGTH.size : end], body[end:]
+
+
+class _Exchange:
+    """The raw payloads of the request an axon is serving."""
+
+    def __init__(self, request_payload: typing.Optional[bytes], binary_response: bool):
+        self.request_payload = request_payload
+        self.binary_response = binary_response
+        self.response_payload = None
+
+
+# Set by BinaryPayloadMiddleware for the duration of each request.
+_exchange = contextvars.ContextVar("storage_payload_exchange", default=None)
+
+
+def _empty_payload(synapse: bt.Synapse, field: str):
+    # Store.encrypted_data is required, the other payload fields are optional
+    return None if synapse.__fields__[field].allow_none else ""
+
+
+def get_payload(synapse: bt.Synapse) -> typing.Optional[bytes]:
+    """
+    Returns the payload of a synapse as raw bytes, whether it travelled as raw bytes or
+    base64 encoded in the synapse JSON.
+
+    Args:
+        synapse (bt.Synapse): A Store, Retrieve or Challenge synapse.
+
+    Returns:
+        bytes: The payload, or None if the synapse has none.
+
+    Raises:
+        binascii.Error: If a base64 encoded payload is invalid.
+    """
+    if synapse._payload is not None:
+        return synapse._payload
+    exchange = _exchange.get()
+    if exchange is not None and exchange.request_payload is not None:
+        return exchange.request_payload
+    value = getattr(synapse, PAYLOAD_FIELDS[synapse.__class__.__name__])
+    return None if value is None else base64.b64decode(value)
+
+
+def set_payload(synapse: bt.Synapse, data: bytes):
+    """
+    Sets the payload of a synapse to the raw bytes `data`.
+
+    While an axon set up with `enable_binary_payloads` serves a request, the payload is sent
+    after the response JSON if the dendrite accepts raw bytes, and base64 encoded in it
+    otherwise. Anywhere else it is kept with the synapse, and `timed_dendrite` picks the
+    encoding for each axon it is sent to.
+
+    Args:
+        synapse (bt.Synapse): A Store, Retrieve or Challenge synapse.
+        data (bytes): The payload.
+    """
+    field = PAYLOAD_FIELDS[synapse.__class__.__name__]
+    exchange = _exchange.get()
+    if exchange is None:
+        synapse._payload = data
+        setattr(synapse, field, _empty_payload(synapse, field))
+    elif exchange.binary_response:
+        exchange.response_payload = data
+        setattr(synapse, field, _empty_payload(synapse, field))
+    else:
+        setattr(synapse, field, base64.b64encode(data))
+
+
+def payload_size(synapse: bt.Synapse) -> int:
+    """
+    Returns the size of the payload of a synapse as it was transported (bytes), without
+    decoding it.
+    """
+    if synapse._payload is not None:
+        return sys.getsizeof(synapse._payload)
+    return sys.getsizeof(getattr(synapse, PAYLOAD_FIELDS[synapse.__class__.__name__]))
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    more_body = True
+    while more_body:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        more_body = message.get("more_body", False)
+    return b"".join(chunks)
+
+
+class BinaryPayloadMiddleware:
+    """
+    ASGI middleware that lets an axon exchange synapse payloads as raw bytes with dendrites
+    at `BINARY_PAYLOAD_VERSION` or later, and advertises the protocol version of the axon in
+    every response.
+
+    It must wrap the axon middleware. A binary request reaches the axon as its synapse JSON
+    alone, so the signature and body hash are verified as usual, and its payload is read by
+    the forward function with `get_payload`. Dendrites that do not advertise a protocol version
+    keep sending and receiving base64 encoded payloads.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        version_header = (PROTOCOL_HEADER.encode(), str(PROTOCOL_VERSION).encode())
+        request_payload = None
+        if headers.get("content-type") == BINARY_CONTENT_TYPE:
+            try:
+                header, request_payload = unpack_payload(await _read_body(receive))
+            except ValueError as e:
+                bt.logging.warning(f"Rejecting binary request: {e}")
+                await send(
+                    {
+                        "type": "http.response.start",
+                        "status": 400,
+                        "headers": [(b"content-type", b"text/plain"), version_header],
+                    }
+                )
+                await send({"type": "http.response.body", "body": str(e).encode()})
+                return
+
+            scope = dict(scope)
+            scope["headers"] = list(scope["headers"])
+            request_headers = MutableHeaders(scope=scope)
+            request_headers["content-type"] = "application/json"
+            request_headers["content-length"] = str(len(header))
+            header_sent = False
+
+            async def receive_header():
+                nonlocal header_sent
+                if not header_sent:
+                    header_sent = True
+                    return {"type": "http.request", "body": header, "more_body": False}
+                return await receive()
+
+            receive = receive_header
+
+        exchange = _Exchange(
+            request_payload,
+            scope["path"].strip("/") in PAYLOAD_FIELDS
+            and protocol_version(headers) >= BINARY_PAYLOAD_VERSION,
+        )
+        start = None
+        response_header = []
+
+        async def send_with_payload(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [version_header]
+                # The forward function has returned, so the payload (if any) is known
+                if exchange.response_payload is None:
+                    await send(message)
+                else:
+                    start = message
+                return
+            if start is None:
+                await send(message)
+                return
+
+            response_header.append(message.get("body", b""))
+            if message.get("more_body", False):
+                return
+            prefix, payload = pack_payload(
+                b"".join(response_header), exchange.response_payload
+            )
+            response_headers = MutableHeaders(raw=start["headers"])
+            response_headers["content-type"] = BINARY_CONTENT_TYPE
+            response_headers["content-length"] = str(len(prefix) + len(payload))
+            await send(start)
+            await send(
+                {"type": "http.response.body", "body": prefix, "more_body": True}
+            )
+            await send({"type": "http.response.body", "body": payload})
+
+        token = _exchange.set(exchange)
+        try:
+            await self.app(scope, receive, send_with_payload)
+        finally:
+            _exchange.reset(token)
+
+
+def enable_binary_payloads(axon: "bt.axon"):
+    """
+    Lets an axon exchange synapse payloads as raw bytes with the dendrites that support it.
+    Must be called before the axon is started.
+    """
+    # Middlewares added last wrap the ones added before, so this one runs outside the
+    # axon middleware and it only ever sees plain JSON bodies.
+    axon.app.add_middleware(BinaryPayloadMiddleware)
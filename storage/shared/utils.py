@@ -22,9 +22,10 @@ import os
 import re
 import json
 import base64
+import asyncio
 import subprocess
 import bittensor as bt
-from typing import List, Union
+from typing import AsyncIterable, AsyncIterator, BinaryIO, Iterable, List, Union
 from redis import asyncio as aioredis
 
 
@@ -118,6 +119,88 @@ def chunk_data(data: bytes, chunksize: int) -> List[bytes]:
         yield data[i : i + chunksize]
 
 
+async def read_chunks(
+    source: Union[str, os.PathLike, AsyncIterable[bytes], Iterable[bytes]],
+    chunksize: int,
+) -> AsyncIterator[bytes]:
+    """
+    Reads data from a file or an iterator of byte strings of any size and yields it in chunks of a
+    specified size, holding no more than one chunk in memory.
+
+    Args:
+        source (str | os.PathLike | AsyncIterable[bytes] | Iterable[bytes]): A file path, read from a
+            worker thread, or the data as consecutive pieces.
+        chunksize (int): The size of each chunk in bytes.
+
+    Yields:
+        bytes: A chunk of the data with the size equal to 'chunksize' or the remaining size of data.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            while True:
+                chunk = await asyncio.to_thread(f.read, chunksize)
+                if not chunk:
+                    return
+                yield chunk
+
+    if not hasattr(source, "__aiter__"):
+        source = _aiter(source)
+
+    buffer = bytearray()
+    async for piece in source:
+        view = memoryview(piece)
+        if buffer:
+            # Complete the chunk started by the previous pieces
+            missing = chunksize - len(buffer)
+            buffer += view[:missing]
+            view = view[missing:]
+            if len(buffer) < chunksize:
+                continue
+            yield bytes(buffer)
+            buffer = bytearray()
+        # Pieces larger than a chunk are sliced without being copied as a whole
+        while len(view) >= chunksize:
+            yield bytes(view[:chunksize])
+            view = view[chunksize:]
+        buffer += view
+    if buffer:
+        yield bytes(buffer)
+
+
+async def write_chunks(
+    chunks: Union[AsyncIterable[bytes], Iterable[bytes]],
+    sink: Union[BinaryIO, asyncio.StreamWriter],
+) -> int:
+    """
+    Writes chunks to a file or socket as they arrive, so data never has to be assembled in memory.
+
+    Args:
+        chunks (AsyncIterable[bytes] | Iterable[bytes]): The chunks to write, in order.
+        sink (BinaryIO | asyncio.StreamWriter): A binary file object, written from a worker thread,
+            or a stream writer, drained after every chunk to respect flow control.
+
+    Returns:
+        int: The number of bytes written.
+    """
+    if not hasattr(chunks, "__aiter__"):
+        chunks = _aiter(chunks)
+
+    written = 0
+    async for chunk in chunks:
+        if isinstance(sink, asyncio.StreamWriter):
+            sink.write(chunk)
+            await sink.drain()
+        else:
+            await asyncio.to_thread(sink.write, chunk)
+        written += len(chunk)
+    return written
+
+
+async def _aiter(iterable: Iterable[bytes]):
+    for item in iterable:
+        yield item
+
+
 def get_redis_port():
     """
     Gets the port number of the Redis server.
@@ -19,12 +19,65 @@
 # DEALINGS IN THE SOFTWARE.
 
 import math
+import time
 import asyncio
+import numpy as np
 from redis import asyncio as aioredis
 import bittensor as bt
+from typing import Dict, List, Optional, Tuple
 from storage.constants import *
 
 
+# Seconds a cached tier and storage limit are trusted for. Tiers only change when
+# `compute_all_tiers` runs, which refreshes the cache of the process that runs it;
+# the expiry bounds how long other processes sharing the database (e.g. the API)
+# keep using a tier that was recomputed elsewhere.
+TIER_CACHE_TTL = 60 * 10
+
+
+class TierCache:
+    """
+    In-memory cache of miner tiers and storage limits, so that the reward and capacity
+    checks do not need to read them from the "stats:<ss58>" hashes every time.
+    """
+
+    def __init__(self, ttl: float = TIER_CACHE_TTL):
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[bytes, int, float]] = {}
+
+    def get(self, ss58_address: str) -> Optional[Tuple[bytes, int]]:
+        """
+        Returns the cached (tier, storage_limit) of a miner, or None if it is unknown or expired.
+        """
+        entry = self._entries.get(ss58_address)
+        if entry is None or time.monotonic() - entry[2] > self.ttl:
+            return None
+        return entry[0], entry[1]
+
+    def set(self, ss58_address: str, tier: bytes, storage_limit: int):
+        """Caches the tier and storage limit of a miner as read from the database."""
+        self._entries[ss58_address] = (tier, int(storage_limit), time.monotonic())
+
+    def update(self, tiers: Dict[str, Tuple[bytes, int]]):
+        """Replaces the whole cache with freshly computed (tier, storage_limit) pairs."""
+        now = time.monotonic()
+        self._entries = {
+            ss58_address: (tier, int(storage_limit), now)
+            for ss58_address, (tier, storage_limit) in tiers.items()
+        }
+
+    def invalidate(self, ss58_address: Optional[str] = None):
+        """Drops a miner from the cache, or every miner if no address is given."""
+        if ss58_address is None:
+            self._entries = {}
+        else:
+            self._entries.pop(ss58_address, None)
+
+
+# Process-wide tier cache, shared by the reward path and the database capacity checks.
+tier_cache = TierCache()
+
+
 def wilson_score_interval(successes, total):
     if total == 0:
         return 0.5  # chance
@@ -53,6 +106,39 @@ def wilson_score_interval(successes, total):
     return wilson_score
 
 
+def wilson_score_intervals(successes: np.ndarray, totals: np.ndarray) -> np.ndarray:
+    """
+    Vectorized version of `wilson_score_interval` over arrays of miner statistics.
+    Args:
+        successes (np.ndarray): The number of successes of each miner.
+        totals (np.ndarray): The number of attempts of each miner.
+    Returns:
+        np.ndarray: The Wilson score of each miner, 0.5 (chance) for miners without attempts.
+    """
+    successes = np.asarray(successes, dtype=np.float64)
+    totals = np.asarray(totals, dtype=np.float64)
+
+    z = 0.6744897501960817
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p = successes / totals
+        denominator = 1 + z**2 / totals
+        centre_adjusted_probability = p + z**2 / (2 * totals)
+        adjusted_standard_deviation = np.sqrt(
+            (p * (1 - p) + z**2 / (4 * totals)) / totals
+        )
+
+        lower_bound = (
+            centre_adjusted_probability - z * adjusted_standard_deviation
+        ) / denominator
+        upper_bound = (
+            centre_adjusted_probability + z * adjusted_standard_deviation
+        ) / denominator
+
+    wilson_scores = (np.maximum(0, lower_bound) + np.minimum(upper_bound, 1)) / 2
+    return np.where(totals == 0, 0.5, wilson_scores)
+
+
 async def reset_storage_stats(stats_key: str, database: aioredis.Redis):
     """
     Asynchronously resets the storage statistics for a miner.
@@ -127,6 +213,95 @@ async def register_miner(ss58_address: str, database: aioredis.Redis):
             "storage_limit": STORAGE_LIMIT_BRONZE,
         },
     )
+    tier_cache.set(ss58_address, b"Bronze", STORAGE_LIMIT_BRONZE)
+
+
+# Applies a round of statistics updates in a single round trip. KEYS are the
+# "stats:<ss58>" hashes to update and ARGV holds the Bronze storage limit followed
+# by a (task_type, success) pair per key. Unregistered miners are registered on the
+# fly and the tier and storage limit of every miner are returned, flattened, so that
+# rewards need no extra reads and the tier cache is refreshed for free.
+UPDATE_STATISTICS_SCRIPT = """
+local tiers = {}
+for i, stats_key in ipairs(KEYS) do
+    local task_type = ARGV[2 * i]
+    local success = ARGV[2 * i + 1] == '1'
+
+    if redis.call('EXISTS', stats_key) == 0 then
+        redis.call('HSET', stats_key,
+            'store_attempts', 0, 'store_successes', 0,
+            'challenge_successes', 0, 'challenge_attempts', 0,
+            'retrieve_successes', 0, 'retrieve_attempts', 0,
+            'total_successes', 0, 'tier', 'Bronze', 'storage_limit', ARGV[1])
+    end
+
+    if task_type == 'store' or task_type == 'challenge' or task_type == 'retrieve' then
+        redis.call('HINCRBY', stats_key, task_type .. '_attempts', 1)
+        if success then
+            redis.call('HINCRBY', stats_key, task_type .. '_successes', 1)
+        end
+    end
+
+    -- Backfill the total successes that we rollover every epoch
+    if redis.call('HEXISTS', stats_key, 'total_successes') == 0 then
+        local total = 0
+        for _, field in ipairs({'store_successes', 'challenge_successes', 'retrieve_successes'}) do
+            total = total + (tonumber(redis.call('HGET', stats_key, field)) or 0)
+        end
+        redis.call('HSET', stats_key, 'total_successes', total)
+    end
+
+    if success then
+        redis.call('HINCRBY', stats_key, 'total_successes', 1)
+    end
+
+    local tier = redis.call('HMGET', stats_key, 'tier', 'storage_limit')
+    tiers[2 * i - 1] = tier[1]
+    tiers[2 * i] = tier[2]
+end
+return tiers
+"""
+
+
+async def update_statistics_batch(
+    ss58_addresses: List[str],
+    successes: List[bool],
+    task_type: str,
+    database: aioredis.Redis,
+    in_top_2: Optional[List[bool]] = None,
+) -> List[float]:
+    """
+    Updates the statistics of several miners for one round of tasks in a single round trip.
+    Miners that are not registered yet are registered first. A miner may appear more than
+    once, in which case each of its results is counted.
+    Args:
+        ss58_addresses (List[str]): The unique addresses (hotkeys) of the miners.
+        successes (List[bool]): Whether the task was successful, for each miner.
+        task_type (str): The type of task performed ('store', 'challenge', 'retrieve', 'monitor').
+        database (redis.Redis): The Redis client instance for database operations.
+        in_top_2 (List[bool], optional): Whether each miner was among the 2 fastest responders.
+    Returns:
+        List[float]: The reward factor of each miner's tier, as returned by `get_tier_factor`.
+    """
+    if not ss58_addresses:
+        return []
+
+    args = [STORAGE_LIMIT_BRONZE]
+    for success in successes:
+        args.extend([task_type, int(bool(success))])
+
+    update = database.register_script(UPDATE_STATISTICS_SCRIPT)
+    results = await update(
+        keys=[f"stats:{ss58_address}" for ss58_address in ss58_addresses], args=args
+    )
+
+    tiers = results[0::2]
+    for ss58_address, tier, storage_limit in zip(ss58_addresses, tiers, results[1::2]):
+        if tier is not None and storage_limit is not None:
+            tier_cache.set(ss58_address, tier, storage_limit)
+
+    in_top_2 = in_top_2 or [False] * len(ss58_addresses)
+    return [tier_to_factor(tier, top_2) for tier, top_2 in zip(tiers, in_top_2)]
 
 
 async def update_statistics(
@@ -143,63 +318,42 @@ async def update_statistics(
         task_type (str): The type of task performed ('store', 'challenge', 'retrieve').
         database (redis.Redis): The Redis client instance for database operations.
     """
-    # Check and see if this miner is registered.
-    if not await miner_is_registered(ss58_address, database):
-        bt.logging.debug(f"Registering new miner {ss58_address}...")
-        await register_miner(ss58_address, database)
-
-    # Update statistics in the stats hash
-    stats_key = f"stats:{ss58_address}"
-
-    if task_type in ["store", "challenge", "retrieve"]:
-        await database.hincrby(stats_key, f"{task_type}_attempts", 1)
-        if success:
-            await database.hincrby(stats_key, f"{task_type}_successes", 1)
-
-    # Transition retireval -> retrieve successes (legacy)
-    legacy_retrieve_successes = await database.hget(stats_key, "retrieval_successes")
-    if legacy_retrieve_successes is not None:
-        await database.hset(
-            stats_key, "retrieve_successes", int(legacy_retrieve_successes)
-        )
-        await database.hdel(stats_key, "retrieval_successes")
-
-    # Transition retireval -> retrieve attempts (legacy)
-    legacy_retrieve_attempts = await database.hget(stats_key, "retrieval_attempts")
-    if legacy_retrieve_attempts is not None:
-        await database.hset(
-            stats_key, "retrieve_attempts", int(legacy_retrieve_attempts)
-        )
-        await database.hdel(stats_key, "retrieval_attempts")
-
-    # Update the total successes that we rollover every epoch
-    if await database.hget(stats_key, "total_successes") is None:
-        store_successes = await database.hget(stats_key, "store_successes")
-        if store_successes is None:
-            store_successes = 0
-            database.hset(stats_key, "store_successes", 0) # ensure field exists
-        else:
-            store_successes = int(store_successes)
-
-        challenge_successes = await database.hget(stats_key, "challenge_successes")
-        if challenge_successes is None:
-            challenge_successes = 0
-            database.hset(stats_key, "challenge_successes", 0) # ensure field exists
-        else:
-            challenge_successes = int(challenge_successes)
-
-        retrieval_successes = await database.hget(stats_key, "retrieve_successes")
-        if retrieval_successes is None:
-            retrieval_successes = 0
-            database.hset(stats_key, "retrieve_successes", 0) # ensure field exists
-        else:
-            retrieval_successes = int(retrieval_successes)
+    await update_statistics_batch([ss58_address], [success], task_type, database)
 
-        total_successes = store_successes + retrieval_successes + challenge_successes
-        await database.hset(stats_key, "total_successes", total_successes)
 
-    if success:
-        await database.hincrby(stats_key, "total_successes", 1)
+async def migrate_legacy_statistics(database: aioredis.Redis) -> int:
+    """
+    Renames the legacy retrieval_* statistics fields of every miner to retrieve_*.
+    This is a one-time offline migration, see scripts/migrate_legacy_statistics.py.
+    Args:
+        database (redis.Redis): The Redis client instance for database operations.
+    Returns:
+        int: The number of miners that had legacy fields.
+    """
+    legacy_fields = ["retrieval_successes", "retrieval_attempts"]
+    stats_keys = [key async for key in database.scan_iter("stats:*")]
+
+    pipe = database.pipeline(transaction=False)
+    for stats_key in stats_keys:
+        pipe.hmget(stats_key, legacy_fields)
+    legacy_values = await pipe.execute()
+
+    migrated = 0
+    pipe = database.pipeline(transaction=True)
+    for stats_key, values in zip(stats_keys, legacy_values):
+        mapping = {
+            field.replace("retrieval_", "retrieve_"): int(value)
+            for field, value in zip(legacy_fields, values)
+            if value is not None
+        }
+        if not mapping:
+            continue
+        pipe.hset(stats_key, mapping=mapping)
+        pipe.hdel(stats_key, *legacy_fields)
+        migrated += 1
+    await pipe.execute()
+
+    return migrated
 
 
 async def compute_tier(stats_key: str, database: aioredis.Redis, confidence=0.95):
@@ -313,39 +467,127 @@ async def compute_tier(stats_key: str, database: aioredis.Redis, confidence=0.95
             f"Storage limit for {stats_key} set from {current_limit} -> {storage_limit} bytes."
         )
 
+    ss58_address = (
+        stats_key.decode("utf-8") if isinstance(stats_key, bytes) else stats_key
+    ).split(":", 1)[1]
+    tier_cache.set(ss58_address, tier.encode("utf-8"), storage_limit)
+
+
+# Tiers from best to worst with the minimum Wilson score and total successes required
+# to reach them, and the storage limit they grant.
+TIERS = [
+    (b"Super Saiyan", SUPER_SAIYAN_WILSON_SCORE, SUPER_SAIYAN_TIER_TOTAL_SUCCESSES, STORAGE_LIMIT_SUPER_SAIYAN),
+    (b"Ruby", RUBY_WILSON_SCORE, RUBY_TIER_TOTAL_SUCCESSES, STORAGE_LIMIT_RUBY),
+    (b"Emerald", EMERALD_WILSON_SCORE, EMERALD_TIER_TOTAL_SUCCESSES, STORAGE_LIMIT_EMERALD),
+    (b"Diamond", DIAMOND_WILSON_SCORE, DIAMOND_TIER_TOTAL_SUCCESSES, STORAGE_LIMIT_DIAMOND),
+    (b"Platinum", PLATINUM_WILSON_SCORE, PLATINUM_TIER_TOTAL_SUCCESSES, STORAGE_LIMIT_PLATINUM),
+    (b"Gold", GOLD_WILSON_SCORE, GOLD_TIER_TOTAL_SUCCESSES, STORAGE_LIMIT_GOLD),
+    (b"Silver", SILVER_WILSON_SCORE, SILVER_TIER_TOTAL_SUCCESSES, STORAGE_LIMIT_SILVER),
+    (b"Bronze", -np.inf, -np.inf, STORAGE_LIMIT_BRONZE),
+]
+
+# Statistics fields loaded for every miner by `compute_all_tiers`, in column order.
+TIER_STATS_FIELDS = [
+    "challenge_successes",
+    "challenge_attempts",
+    "retrieve_successes",
+    "retrieve_attempts",
+    "store_successes",
+    "store_attempts",
+    "total_successes",
+]
+
+
+def assign_tiers(wilson_scores: np.ndarray, total_successes: np.ndarray) -> np.ndarray:
+    """
+    Assigns every miner the best tier whose thresholds it meets, as in `compute_tier`.
+    Args:
+        wilson_scores (np.ndarray): The current Wilson score of each miner.
+        total_successes (np.ndarray): The rolled over total successes of each miner.
+    Returns:
+        np.ndarray: The index into `TIERS` of each miner's tier.
+    """
+    wilson_thresholds = np.array([tier[1] for tier in TIERS])
+    success_thresholds = np.array([tier[2] for tier in TIERS])
+    # shape: [ miners, tiers ], the Bronze column is always True
+    eligible = (wilson_scores[:, None] >= wilson_thresholds) & (
+        total_successes[:, None] >= success_thresholds
+    )
+    return np.argmax(eligible, axis=1)
+
 
-async def compute_all_tiers(database: aioredis.Redis):
-    # Iterate over all miners
+async def compute_all_tiers(database: aioredis.Redis) -> Dict[str, bytes]:
     """
     Asynchronously computes and updates the tiers for all miners in the decentralized storage system.
     This function should be called periodically to ensure miners' tiers are up-to-date based on
-    their performance. It iterates over all miners and calls `compute_tier` for each one.
+    their performance. The statistics of all miners are loaded in one pipelined pass, scored
+    as arrays and the resulting tiers and storage limits are written back in a single pipeline.
     Args:
         database (redis.Redis): The Redis client instance for database operations.
+    Returns:
+        Dict[str, bytes]: The tier table, mapping each miner hotkey to its new tier.
     """
-    miners = [miner async for miner in database.scan_iter("stats:*")]
-    tasks = [compute_tier(miner, database) for miner in miners]
-    await asyncio.gather(*tasks)
+    stats_keys = [key async for key in database.scan_iter("stats:*", count=1000)]
+
+    pipe = database.pipeline(transaction=False)
+    for stats_key in stats_keys:
+        pipe.hmget(stats_key, TIER_STATS_FIELDS)
+    stats = np.array(
+        [[int(value or 0) for value in values] for values in await pipe.execute()],
+        dtype=np.int64,
+    ).reshape(-1, len(TIER_STATS_FIELDS))
+
+    total_current_successes = stats[:, 0] + stats[:, 2] + stats[:, 4]
+    total_current_attempts = stats[:, 1] + stats[:, 3] + stats[:, 5]
+    wilson_scores = wilson_score_intervals(
+        total_current_successes, total_current_attempts
+    )
+    tier_indices = assign_tiers(wilson_scores, stats[:, 6])
 
-    # Reset the statistics for the next epoch
+    # Write the tiers and reset the statistics for the next epoch in one pipeline
     bt.logging.info("Resetting statistics for all hotkeys...")
-    await rollover_storage_stats(database)
+    tier_table = {}
+    tier_limits = {}
+    pipe = database.pipeline(transaction=True)
+    for stats_key, tier_index in zip(stats_keys, tier_indices):
+        tier, _, _, storage_limit = TIERS[tier_index]
+        pipe.hset(
+            stats_key,
+            mapping={
+                "store_attempts": 0,
+                "store_successes": 0,
+                "challenge_successes": 0,
+                "challenge_attempts": 0,
+                "retrieve_successes": 0,
+                "retrieve_attempts": 0,
+                "tier": tier,
+                "storage_limit": storage_limit,
+            },
+        )
+        ss58_address = stats_key.decode("utf-8").split(":", 1)[1]
+        tier_table[ss58_address] = tier
+        tier_limits[ss58_address] = (tier, storage_limit)
+    await pipe.execute()
+    tier_cache.update(tier_limits)
+
+    tier_counts = np.bincount(tier_indices, minlength=len(TIERS))
+    bt.logging.debug(
+        f"Computed tiers for {len(tier_table)} miners: "
+        f"{[(tier.decode(), int(count)) for (tier, _, _, _), count in zip(TIERS, tier_counts)]}"
+    )
 
+    return tier_table
 
-async def get_tier_factor(ss58_address: str, database: aioredis.Redis, in_top_2: bool = False) -> float:
+
+def tier_to_factor(tier: Optional[bytes], in_top_2: bool = False) -> float:
     """
-    Retrieves the reward factor based on the tier of a given miner.
-    This function returns a factor that represents the proportion of rewards a miner
-    is eligible to receive based on their tier.
+    Maps a tier, as stored in the database, to its reward factor.
     Args:
-        ss58_address (str): The unique address (hotkey) of the miner.
-        database (redis.Redis): The Redis client instance for database operations.
-        in_top_3 (bool): Whether the miner is in the top 3 tiers. Defaults to False.
+        tier (bytes): The tier of the miner, or None if it has none yet.
+        in_top_2 (bool): Whether the miner is in the top 2 responders. Defaults to False.
     Returns:
-        float: The reward factor corresponding to the miner's tier.
+        float: The reward factor corresponding to the tier.
     """
-    tier = await database.hget(f"stats:{ss58_address}", "tier")
-
     if tier is None:
         return BRONZE_TIER_REWARD_FACTOR
 
@@ -370,4 +612,28 @@ async def get_tier_factor(ss58_address: str, database: aioredis.Redis, in_top_2:
     if in_top_2:
         factor *= TIER_BOOSTS[tier]
 
-    return factor
\ No newline at end of file
+    return factor
+
+
+async def get_tier_factor(ss58_address: str, database: aioredis.Redis, in_top_2: bool = False) -> float:
+    """
+    Retrieves the reward factor based on the tier of a given miner.
+    This function returns a factor that represents the proportion of rewards a miner
+    is eligible to receive based on their tier.
+    Args:
+        ss58_address (str): The unique address (hotkey) of the miner.
+        database (redis.Redis): The Redis client instance for database operations.
+        in_top_3 (bool): Whether the miner is in the top 3 tiers. Defaults to False.
+    Returns:
+        float: The reward factor corresponding to the miner's tier.
+    """
+    cached = tier_cache.get(ss58_address)
+    if cached is not None:
+        return tier_to_factor(cached[0], in_top_2)
+
+    tier, storage_limit = await database.hmget(
+        f"stats:{ss58_address}", ["tier", "storage_limit"]
+    )
+    if tier is not None and storage_limit is not None:
+        tier_cache.set(ss58_address, tier, storage_limit)
+    return tier_to_factor(tier, in_top_2)
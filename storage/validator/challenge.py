@@ -18,7 +18,7 @@
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 
-import sys
+import os
 import time
 import torch
 import typing
@@ -32,18 +32,141 @@ from storage import protocol
 from storage.constants import CHALLENGE_FAILURE_REWARD
 from storage.validator.event import EventSchema
 from storage.shared.ecc import setup_CRS, ecc_point_to_hex
-from storage.validator.utils import get_random_chunksize, get_available_query_miners
+from storage.shared.transport import payload_size
+from storage.validator.utils import (
+    current_block,
+    get_random_chunksize,
+    get_available_query_miners,
+)
 from storage.validator.verify import verify_challenge_with_seed
-from storage.validator.reward import apply_reward_scores
+from storage.validator.reward import apply_reward_scores, run_verification
 from storage.validator.database import (
     get_metadata_for_hotkey_and_hash,
     update_metadata_for_data_hash,
 )
 
-from storage.validator.bonding import (
-    update_statistics,
-    get_tier_factor,
-)
+from storage.validator.bonding import update_statistics_batch
+
+
+def challenge_timeout(
+    data_size: int,
+    min_timeout: float = 10.0,
+    max_timeout: float = 45.0,
+    throughput: float = 4 * 1024**2,
+) -> float:
+    """
+    Computes the deadline for a challenge from the size of the challenged data, which
+    the miner has to read in full to produce the commitment and merkle proof.
+
+    Parameters:
+    - data_size (int): Size of the challenged data in bytes.
+    - min_timeout (float): Timeout for the smallest data.
+    - max_timeout (float): Upper bound on the timeout.
+    - throughput (float): Bytes per second a miner is expected to process.
+
+    Returns:
+    - float: The challenge timeout in seconds.
+    """
+    return min(max_timeout, min_timeout + max(data_size, 0) / throughput)
+
+
+class ChallengeWindow:
+    """
+    Rolling window of in-flight challenges that is carried across forward steps.
+
+    The number of new challenges issued per step (k) grows additively while the
+    validator process has spare CPU and is halved when it exceeds its CPU target.
+    The number in flight is bounded by a concurrency limit and by the expected size
+    of the outstanding responses.
+    """
+
+    def __init__(
+        self,
+        min_k: int = 10,
+        max_concurrency: typing.Optional[int] = None,
+        max_inflight_bytes: int = 512 * 1024**2,
+        target_cpu: float = 0.75,
+    ):
+        self.min_k = min_k
+        self.max_concurrency = max(
+            min_k, max_concurrency or 16 * (os.cpu_count() or 1)
+        )
+        self.max_inflight_bytes = max_inflight_bytes
+        self.target_cpu = target_cpu
+        self.k = min_k
+        self.tasks: typing.Dict[asyncio.Task, int] = {}
+        self.avg_response_bytes: typing.Optional[float] = None
+        self._wall = time.monotonic()
+        self._cpu = time.process_time()
+
+    @property
+    def in_flight_uids(self) -> typing.List[int]:
+        return list(self.tasks.values())
+
+    def capacity(self) -> int:
+        """Number of new challenges that may be issued now."""
+        limit = self.max_concurrency
+        if self.avg_response_bytes:
+            limit = min(
+                limit, max(1, int(self.max_inflight_bytes // self.avg_response_bytes))
+            )
+        return max(0, min(self.k, limit - len(self.tasks)))
+
+    def launch(self, uid: int, coroutine: typing.Coroutine):
+        self.tasks[asyncio.create_task(coroutine)] = uid
+
+    async def harvest(self, timeout: float) -> typing.List[typing.Tuple[int, typing.Any]]:
+        """
+        Waits up to `timeout` seconds for in-flight challenges and returns the (uid, result)
+        of every challenge that has completed, leaving the rest in flight for later steps.
+        """
+        if self.tasks:
+            await asyncio.wait(self.tasks, timeout=timeout)
+
+        completed = []
+        for task in [task for task in self.tasks if task.done()]:
+            uid = self.tasks.pop(task)
+            try:
+                completed.append((uid, task.result()))
+            except Exception as e:
+                bt.logging.warning(f"Challenge for uid {uid} failed: {e}")
+        return completed
+
+    def record_response(self, num_bytes: int, alpha: float = 0.2):
+        """Tracks the average response size used to bound the bytes in flight."""
+        if self.avg_response_bytes is None:
+            self.avg_response_bytes = float(num_bytes)
+        else:
+            self.avg_response_bytes += alpha * (num_bytes - self.avg_response_bytes)
+
+    def adapt(self) -> float:
+        """
+        Adjusts k from the CPU utilisation of the process since the last call.
+
+        Returns:
+        - float: The measured CPU utilisation (1.0 is every core busy).
+        """
+        wall, cpu = time.monotonic(), time.process_time()
+        elapsed = wall - self._wall
+        utilisation = (
+            (cpu - self._cpu) / (elapsed * (os.cpu_count() or 1)) if elapsed > 0 else 0.0
+        )
+        self._wall, self._cpu = wall, cpu
+
+        if utilisation > self.target_cpu:
+            self.k = max(self.min_k, self.k // 2)
+        else:
+            self.k = min(self.max_concurrency, self.k + 1)
+        return utilisation
+
+
+def challenge_window_from_config(config: "bt.Config") -> ChallengeWindow:
+    return ChallengeWindow(
+        min_k=config.neuron.challenge_min_k,
+        max_concurrency=config.neuron.challenge_max_concurrency,
+        max_inflight_bytes=config.neuron.challenge_max_inflight_mb * 1024**2,
+        target_cpu=config.neuron.challenge_target_cpu,
+    )
 
 
 async def handle_challenge(self, uid: int) -> typing.Tuple[bool, protocol.Challenge]:
@@ -124,9 +247,16 @@ async def handle_challenge(self, uid: int) -> typing.Tuple[bool, protocol.Challe
         [axon],
         synapse,
         deserialize=True,
-        timeout=45,
+        timeout=challenge_timeout(
+            data["size"],
+            min_timeout=self.config.neuron.challenge_min_timeout,
+            max_timeout=self.config.neuron.challenge_max_timeout,
+            throughput=self.config.neuron.challenge_throughput_mb * 1024**2,
+        ),
+    )
+    verified = await run_verification(
+        self, verify_challenge_with_seed, response[0], synapse.seed
     )
-    verified = verify_challenge_with_seed(response[0], synapse.seed)
 
     if verified:
         data["prev_seed"] = synapse.seed
@@ -140,7 +270,9 @@ async def challenge_data(self):
     """
     Initiates a series of challenges to miners, verifying their data storage through the network's consensus mechanism.
 
-    Asynchronously challenge and see who returns the data fastest (passes verification), and rank them highest
+    Asynchronously challenge and see who returns the data fastest (passes verification), and rank them highest.
+    Challenges are kept in a rolling window across steps: each step tops the window up with new
+    miners and applies rewards for the challenges that have completed so far.
     """
 
     def remove_indices_from_tensor(tensor, indices_to_remove):
@@ -156,7 +288,7 @@ async def challenge_data(self):
         completion_times=[],
         task_status_messages=[],
         task_status_codes=[],
-        block=self.subtensor.get_current_block(),
+        block=current_block(self),
         uids=[],
         step_length=0.0,
         best_uid=-1,
@@ -165,13 +297,24 @@ async def challenge_data(self):
     )
 
     start_time = time.time()
-    tasks = []
-    uids = await get_available_query_miners(self, k=10)
-    bt.logging.debug(f"challenge uids {uids}")
-    responses = []
-    for uid in uids:
-        tasks.append(asyncio.create_task(handle_challenge(self, uid)))
-    responses = await asyncio.gather(*tasks)
+    window = self.challenge_window
+
+    # Top up the window with miners that are not already being challenged
+    k = window.capacity()
+    if k > 0:
+        new_uids = await get_available_query_miners(
+            self, k=k, exclude=window.in_flight_uids
+        )
+        bt.logging.debug(f"challenge uids {new_uids}")
+        for uid in new_uids:
+            window.launch(uid, handle_challenge(self, uid))
+
+    completed = await window.harvest(timeout=self.config.neuron.challenge_step_wait)
+    uids = [uid for uid, _ in completed]
+    responses = [result for _, result in completed]
+    bt.logging.debug(
+        f"challenge completed uids {uids} | in flight {len(window.tasks)} | k {window.k}"
+    )
 
     # Compute the rewards for the responses given the prompt.
     rewards: torch.FloatTensor = torch.zeros(len(responses), dtype=torch.float32).to(
@@ -194,6 +337,7 @@ async def challenge_data(self):
 
     remove_reward_idxs = []
     data_sizes = []
+    verified_idxs = []
     for idx, (uid, (verified, response)) in enumerate(zip(uids, responses)):
         response_dict = response[0].axon.dict() if response[0] is not None else None
         bt.logging.trace(
@@ -201,8 +345,9 @@ async def challenge_data(self):
         )
 
         # Calculate the size of the response and add it to the total batch size
-        data_size = sys.getsizeof(response[0].data_chunk)
+        data_size = payload_size(response[0])
         data_sizes.append(data_size)
+        window.record_response(data_size)
 
         hotkey = self.metagraph.hotkeys[uid]
 
@@ -214,16 +359,22 @@ async def challenge_data(self):
             remove_reward_idxs.append(idx)
             continue  # We don't have any data for this hotkey, skip it.
 
-        # Update the challenge statistics
-        await update_statistics(
-            ss58_address=hotkey,
-            success=verified,
-            task_type="challenge",
-            database=self.database,
-        )
+        verified_idxs.append(idx)
+
+    # Update the challenge statistics of the whole round and fetch the tier factors
+    tier_factors = await update_statistics_batch(
+        ss58_addresses=[self.metagraph.hotkeys[uids[idx]] for idx in verified_idxs],
+        successes=[responses[idx][0] for idx in verified_idxs],
+        task_type="challenge",
+        database=self.database,
+        in_top_2=[in_top_2_dict.get(uids[idx], False) for idx in verified_idxs],
+    )
+
+    for idx, tier_factor in zip(verified_idxs, tier_factors):
+        uid = uids[idx]
+        verified, response = responses[idx]
 
         # Apply reward for this challenge
-        tier_factor = await get_tier_factor(hotkey, self.database, in_top_2=in_top_2_dict.get(uid, False))
         rewards[idx] = 1.0 * tier_factor if verified else CHALLENGE_FAILURE_REWARD
 
         # Log the event data for this specific challenge
@@ -241,6 +392,9 @@ async def challenge_data(self):
     # Calculate the total step length for all challenges
     event.step_length = time.time() - start_time
 
+    utilisation = window.adapt()
+    bt.logging.debug(f"challenge window cpu {utilisation:.2f} | next k {window.k}")
+
     if len(responses) == 0:
         bt.logging.debug("Received zero hashes from miners, returning event early.")
         return event
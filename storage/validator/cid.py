@@ -5,7 +5,7 @@ import multibase
 import multihash
 import multicodec
 
-from ipfs_cid import cid_sha256_hash as compute_cidv1
+from ipfs_cid import cid_sha256_hash as compute_cidv1, cid_sha256_wrap_digest
 from morphys import ensure_bytes, ensure_unicode
 
 
@@ -196,3 +196,43 @@ def generate_cid_string(data: typing.Union[str, bytes]) -> str:
     data_bytes = ensure_bytes(data)
 
     return compute_cidv1(data_bytes)
+
+
+class CIDHasher(object):
+    """
+    Computes the CID string of data fed in pieces, without holding the whole data in memory.
+    ``CIDHasher(data).cid()`` equals ``generate_cid_string(data)``.
+    """
+
+    def __init__(self, data: typing.Union[str, bytes] = b""):
+        self._hash = hashlib.sha256(ensure_bytes(data))
+
+    def update(self, data: typing.Union[bytes, bytearray, memoryview]):
+        """
+        Feeds the next piece of data.
+
+        :param data: Piece of the data to hash.
+        """
+        self._hash.update(data)
+
+    def digest(self) -> bytes:
+        """SHA-256 digest of the data fed so far."""
+        return self._hash.digest()
+
+    def cid(self) -> str:
+        """
+        CID string of the data fed so far.
+
+        :return: A CID string.
+        """
+        return generate_cid_string_from_digest(self.digest())
+
+
+def generate_cid_string_from_digest(digest: bytes) -> str:
+    """
+    Generates the CID string of data from its SHA-256 digest, for data hashed incrementally.
+
+    :param digest: SHA-256 digest of the data.
+    :return: A CID string, equal to `generate_cid_string(data)`.
+    """
+    return cid_sha256_wrap_digest(digest)
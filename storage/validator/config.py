@@ -170,6 +170,103 @@ def add_args(cls, parser):
         help="The chunk factor to divide data.",
         default=4,
     )
+    parser.add_argument(
+        "--neuron.challenge_min_k",
+        type=int,
+        help="Minimum number of new challenges issued per step.",
+        default=10,
+    )
+    parser.add_argument(
+        "--neuron.challenge_max_concurrency",
+        type=int,
+        help="Maximum number of challenges in flight. Defaults to 16 per CPU core.",
+        default=None,
+    )
+    parser.add_argument(
+        "--neuron.challenge_max_inflight_mb",
+        type=int,
+        help="Maximum expected size of all outstanding challenge responses (MB).",
+        default=512,
+    )
+    parser.add_argument(
+        "--neuron.challenge_target_cpu",
+        type=float,
+        help="Fraction of CPU time the challenge window may use before it backs off.",
+        default=0.75,
+    )
+    parser.add_argument(
+        "--neuron.challenge_min_timeout",
+        type=float,
+        help="Challenge timeout for the smallest stored data (seconds).",
+        default=10.0,
+    )
+    parser.add_argument(
+        "--neuron.challenge_max_timeout",
+        type=float,
+        help="Challenge timeout upper bound (seconds).",
+        default=45.0,
+    )
+    parser.add_argument(
+        "--neuron.challenge_throughput_mb",
+        type=float,
+        help="Throughput assumed for a miner to read and commit challenged data (MB/s).",
+        default=4.0,
+    )
+    parser.add_argument(
+        "--neuron.challenge_step_wait",
+        type=float,
+        help="How long a step waits for in-flight challenges before applying rewards (seconds).",
+        default=12.0,
+    )
+    parser.add_argument(
+        "--neuron.liveness_ttl",
+        type=float,
+        help="How long a successful response spares a miner from being pinged (seconds).",
+        default=120.0,
+    )
+    parser.add_argument(
+        "--neuron.liveness_failure_ttl",
+        type=float,
+        help="How long a failed request rules a miner out before it is pinged again (seconds).",
+        default=60.0,
+    )
+    parser.add_argument(
+        "--neuron.retrieve_hedge_percentile",
+        type=float,
+        help="Percentile of recent chunk retrieval latencies after which the next replica holder is also queried.",
+        default=90.0,
+    )
+    parser.add_argument(
+        "--neuron.retrieve_hedge_delay",
+        type=float,
+        help="Hedging delay used until enough retrieval latencies have been observed (seconds).",
+        default=5.0,
+    )
+    parser.add_argument(
+        "--neuron.retrieve_window",
+        type=int,
+        help="Maximum number of chunks of a file being retrieved or buffered for in-order delivery at once.",
+        default=4,
+    )
+    parser.add_argument(
+        "--neuron.store_window",
+        type=int,
+        help="Maximum number of chunks of a file being stored at once.",
+        default=4,
+    )
+    parser.add_argument(
+        "--neuron.verify_pool",
+        type=str,
+        choices=["thread", "process"],
+        help="Worker pool that verifies miner responses off the event loop.",
+        default="thread",
+    )
+    parser.add_argument(
+        "--neuron.verify_workers",
+        type=int,
+        help="Number of verification workers. Defaults to the executor's default for the pool type.",
+        default=None,
+    )
     parser.add_argument(
         "--neuron.num_concurrent_forwards",
         type=int,
@@ -230,6 +327,12 @@ def add_args(cls, parser):
         help="The number of blocks before data expires (seconds).",
         default=60 * 60 * 24 * 30,  # 30 days
     )
+    parser.add_argument(
+        "--neuron.ttl_purge_batch_size",
+        type=int,
+        help="Maximum number of expired data hashes to purge per forward step.",
+        default=1000,
+    )
     parser.add_argument(
         "--neuron.profile",
         action="store_true",
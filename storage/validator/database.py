@@ -20,10 +20,313 @@
 
 import json
 import time
+import inspect
 from redis import asyncio as aioredis
 import asyncio
 import bittensor as bt
-from typing import Dict, List, Any, Union, Optional, Tuple
+from typing import Dict, List, Any, Union, Optional, Tuple, Callable, Iterable
+
+from storage.validator.bonding import tier_cache
+
+
+# Number of commands queued per pipeline before it is flushed to the server.
+PIPELINE_BATCH_SIZE = 1000
+
+# COUNT hint passed to SCAN so keyspace walks take fewer round trips.
+SCAN_COUNT = 1000
+
+# Secondary indexes maintained alongside the data so that helpers never need to
+# SCAN the whole keyspace. Databases that predate them are backfilled once by
+# `ensure_database_indexes`.
+HOTKEYS_INDEX = "index:hotkeys"  # set of ss58 addresses with a hotkey:<ss58> hash
+FILES_INDEX = "index:files"  # set of full file hashes with a file:<hash> zset
+CHUNKS_INDEX = "index:chunks"  # set of chunk hashes with a chunk:<hash> hash
+TTL_INDEX = "index:ttl"  # zset of "<ss58>:<data_hash>" scored by expiry time
+INDEX_VERSION_KEY = "index:version"
+INDEX_VERSION = 1
+
+# Per-hotkey usage counters live in a "usage:<ss58>" hash with "bytes" and "hashes"
+# fields. They are maintained by the scripts below, which all start by rebuilding
+# the counters from "hotkey:<ss58>" if they do not exist yet (e.g. on a database
+# that predates them), so every update is applied atomically on top of a correct base.
+_USAGE_COUNTERS_LUA = """
+local function metadata_size(metadata_json)
+    local ok, metadata = pcall(cjson.decode, metadata_json)
+    if ok and type(metadata) == 'table' and tonumber(metadata['size']) then
+        return tonumber(metadata['size'])
+    end
+    return 0
+end
+
+local function rebuild_usage(hotkey_key, usage_key)
+    local total, count = 0, 0
+    local fields = redis.call('HGETALL', hotkey_key)
+    for i = 1, #fields, 2 do
+        if string.sub(fields[i], 1, 4) ~= 'ttl:' then
+            total = total + metadata_size(fields[i + 1])
+            count = count + 1
+        end
+    end
+    redis.call('HSET', usage_key, 'bytes', string.format('%d', total), 'hashes', count)
+    return total
+end
+
+local function ensure_usage(hotkey_key, usage_key)
+    if redis.call('EXISTS', usage_key) == 0 then
+        rebuild_usage(hotkey_key, usage_key)
+    end
+end
+
+local function ttl_member(hotkey_key, data_hash)
+    return string.sub(hotkey_key, 8) .. ':' .. data_hash
+end
+
+local function remove_data_hash(hotkey_key, usage_key, ttl_index, data_hash)
+    local metadata = redis.call('HGET', hotkey_key, data_hash)
+    redis.call('HDEL', hotkey_key, data_hash, 'ttl:' .. data_hash)
+    redis.call('ZREM', ttl_index, ttl_member(hotkey_key, data_hash))
+    if metadata and string.sub(data_hash, 1, 4) ~= 'ttl:' then
+        redis.call('HINCRBY', usage_key, 'bytes', string.format('%d', -metadata_size(metadata)))
+        redis.call('HINCRBY', usage_key, 'hashes', -1)
+        return 1
+    end
+    return 0
+end
+
+local function unindex_if_empty(hotkey_key, hotkeys_index)
+    if redis.call('EXISTS', hotkey_key) == 0 then
+        redis.call('SREM', hotkeys_index, string.sub(hotkey_key, 8))
+    end
+end
+"""
+
+# The scripts below take KEYS = hotkey_keys(ss58):
+# hotkey:<ss58>, usage:<ss58>, HOTKEYS_INDEX, TTL_INDEX
+
+# Returns the bytes stored by the hotkey.
+TOTAL_HOTKEY_STORAGE_SCRIPT = _USAGE_COUNTERS_LUA + """
+ensure_usage(KEYS[1], KEYS[2])
+return tonumber(redis.call('HGET', KEYS[2], 'bytes'))
+"""
+
+# Recomputes the counters from scratch, returning {previous bytes or -1, bytes}.
+REBUILD_USAGE_SCRIPT = _USAGE_COUNTERS_LUA + """
+local previous = tonumber(redis.call('HGET', KEYS[2], 'bytes')) or -1
+return {previous, rebuild_usage(KEYS[1], KEYS[2])}
+"""
+
+# ARGV: data hash, metadata JSON
+# Inserts or replaces the metadata of a data hash, adjusting the counters by the size delta.
+SET_METADATA_SCRIPT = _USAGE_COUNTERS_LUA + """
+ensure_usage(KEYS[1], KEYS[2])
+local previous = redis.call('HGET', KEYS[1], ARGV[1])
+if previous then
+    redis.call('HINCRBY', KEYS[2], 'bytes', string.format('%d', -metadata_size(previous)))
+else
+    redis.call('HINCRBY', KEYS[2], 'hashes', 1)
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+redis.call('HINCRBY', KEYS[2], 'bytes', string.format('%d', metadata_size(ARGV[2])))
+redis.call('SADD', KEYS[3], string.sub(KEYS[1], 8))
+return 1
+"""
+
+# ARGV: data hashes
+# Removes data hashes and their ttl: fields, returning the number of data hashes removed.
+REMOVE_METADATA_SCRIPT = _USAGE_COUNTERS_LUA + """
+ensure_usage(KEYS[1], KEYS[2])
+local removed = 0
+for _, data_hash in ipairs(ARGV) do
+    removed = removed + remove_data_hash(KEYS[1], KEYS[2], KEYS[4], data_hash)
+end
+unindex_if_empty(KEYS[1], KEYS[3])
+return removed
+"""
+
+# ARGV: current unix time, candidate data hashes
+# Removes the candidates that are still expired according to the TTL index (their TTL
+# may have been renewed since they were looked up), returning the removed data hashes.
+PURGE_EXPIRED_TTL_SCRIPT = _USAGE_COUNTERS_LUA + """
+ensure_usage(KEYS[1], KEYS[2])
+local now = tonumber(ARGV[1])
+local expired = {}
+for i = 2, #ARGV do
+    local expiry = tonumber(redis.call('ZSCORE', KEYS[4], ttl_member(KEYS[1], ARGV[i])))
+    if expiry and expiry < now then
+        remove_data_hash(KEYS[1], KEYS[2], KEYS[4], ARGV[i])
+        table.insert(expired, ARGV[i])
+    end
+end
+unindex_if_empty(KEYS[1], KEYS[3])
+return expired
+"""
+
+
+def hotkey_keys(ss58_address: str) -> List[str]:
+    """Returns the keys the hotkey metadata scripts operate on."""
+    return [f"hotkey:{ss58_address}", f"usage:{ss58_address}", HOTKEYS_INDEX, TTL_INDEX]
+
+
+async def scan_keys(database: aioredis.Redis, match: str) -> List[bytes]:
+    """
+    Collects all keys matching a pattern using SCAN with a large COUNT hint.
+
+    Parameters:
+        database (aioredis.Redis): The Redis client instance.
+        match (str): The glob-style pattern to match, e.g. "hotkey:*".
+
+    Returns:
+        A list of matching keys.
+    """
+    return [key async for key in database.scan_iter(match=match, count=SCAN_COUNT)]
+
+
+async def pipelined(
+    database: aioredis.Redis,
+    items: Iterable[Any],
+    queue: Callable[[Any, Any], Any],
+    batch_size: int = PIPELINE_BATCH_SIZE,
+) -> List[Any]:
+    """
+    Queues one or more commands per item on a non-transactional pipeline and executes
+    them in batches, so that N lookups cost N / batch_size round trips instead of N.
+
+    Parameters:
+        database (aioredis.Redis): The Redis client instance.
+        items (Iterable[Any]): The items to queue commands for.
+        queue (Callable): Called as queue(pipeline, item) to queue the commands for an item.
+            May be a coroutine function (e.g. when it calls a registered script).
+        batch_size (int): Number of items queued per pipeline execution.
+
+    Returns:
+        The flattened list of command results, in the order they were queued.
+    """
+    items = list(items)
+    results = []
+    for start in range(0, len(items), batch_size):
+        pipe = database.pipeline(transaction=False)
+        for item in items[start : start + batch_size]:
+            queued = queue(pipe, item)
+            if inspect.isawaitable(queued):
+                await queued
+        results.extend(await pipe.execute())
+    return results
+
+
+async def rebuild_database_indexes(database: aioredis.Redis):
+    """
+    Rebuilds the hotkey, file, chunk and TTL indexes from a single scan of the keyspace.
+    The new indexes are built under temporary keys and swapped in atomically.
+
+    Parameters:
+        database (aioredis.Redis): The Redis client instance.
+    """
+    indexes = [HOTKEYS_INDEX, FILES_INDEX, CHUNKS_INDEX, TTL_INDEX]
+    # Drop leftovers of an interrupted rebuild
+    await database.delete(*[f"{index}:rebuild" for index in indexes])
+
+    hotkeys, files, chunks = [], [], []
+    async for key in database.scan_iter(count=SCAN_COUNT):
+        prefix, _, name = key.partition(b":")
+        if prefix == b"hotkey":
+            hotkeys.append(name)
+        elif prefix == b"file":
+            files.append(name)
+        elif prefix == b"chunk":
+            chunks.append(name)
+
+    sizes = {
+        HOTKEYS_INDEX: len(hotkeys),
+        FILES_INDEX: len(files),
+        CHUNKS_INDEX: len(chunks),
+        TTL_INDEX: 0,
+    }
+    for index, members in zip(indexes, [hotkeys, files, chunks]):
+        for start in range(0, len(members), PIPELINE_BATCH_SIZE):
+            await database.sadd(
+                f"{index}:rebuild", *members[start : start + PIPELINE_BATCH_SIZE]
+            )
+
+    # Hotkey hashes can be large, so fetch them a few at a time
+    for start in range(0, len(hotkeys), 16):
+        batch = hotkeys[start : start + 16]
+        for hotkey, fields in zip(
+            batch,
+            await pipelined(
+                database, batch, lambda pipe, hotkey: pipe.hgetall(b"hotkey:" + hotkey)
+            ),
+        ):
+            expiries = {}
+            for field, value in fields.items():
+                if not field.startswith(b"ttl:"):
+                    continue
+                try:
+                    ttl_metadata = json.loads(value)
+                    expiry = float(ttl_metadata["generated"]) + int(ttl_metadata["ttl"])
+                except Exception:
+                    continue
+                expiries[hotkey + b":" + field[4:]] = expiry
+            if expiries:
+                await database.zadd(f"{TTL_INDEX}:rebuild", expiries)
+                sizes[TTL_INDEX] += len(expiries)
+
+    pipe = database.pipeline(transaction=True)
+    for index in indexes:
+        pipe.delete(index)
+        # Empty indexes were never created, and RENAME fails on a missing key
+        if sizes[index]:
+            pipe.rename(f"{index}:rebuild", index)
+    pipe.set(INDEX_VERSION_KEY, INDEX_VERSION)
+    await pipe.execute()
+
+    bt.logging.info(
+        f"Rebuilt database indexes: {len(hotkeys)} hotkeys, {len(files)} files, {len(chunks)} chunks."
+    )
+
+
+async def ensure_database_indexes(database: aioredis.Redis):
+    """
+    Backfills the secondary indexes if the database predates them (or an older index version).
+    This walks the whole keyspace once, so it should be called at startup rather than per step.
+
+    Parameters:
+        database (aioredis.Redis): The Redis client instance.
+    """
+    version = await database.get(INDEX_VERSION_KEY)
+    if version is not None and int(version) >= INDEX_VERSION:
+        return
+    bt.logging.info("Building database indexes, this may take a while...")
+    await rebuild_database_indexes(database)
+
+
+async def _queue_hotkey_capacity(
+    pipe, hotkey: str, total_storage_script, cached: Optional[Tuple[bytes, int]]
+):
+    """
+    Queues the total storage lookup for a hotkey, and its tier and storage limit
+    lookup unless they were found in the tier cache.
+    """
+    await total_storage_script(keys=hotkey_keys(hotkey), client=pipe)
+    if cached is None:
+        pipe.hmget(f"stats:{hotkey}", ["tier", "storage_limit"])
+
+
+def _pop_storage_limit(
+    hotkey: str, cached: Optional[Tuple[bytes, int]], results: Iterable[Any]
+) -> Optional[Union[bytes, int]]:
+    """
+    Returns the cached storage limit of a hotkey, or else consumes the lookup queued
+    by `_queue_hotkey_capacity` from the results and caches it.
+    """
+    if cached is not None:
+        return cached[1]
+    tier, byte_limit = next(results)
+    if tier is not None and byte_limit is not None:
+        try:
+            tier_cache.set(hotkey, tier, byte_limit)
+        except ValueError:
+            pass  # Unparseable limit, reported by the caller
+    return byte_limit
 
 
 async def set_ttl_for_hash_and_hotkey(
@@ -46,7 +349,15 @@ async def set_ttl_for_hash_and_hotkey(
         "ttl": ttl,
     }
     ttl_metadata_json = json.dumps(ttl_metadata)
-    await database.hset(key, f"ttl:{data_hash}", ttl_metadata_json)
+    # Keep the expiry index in step with the TTL metadata
+    pipe = database.pipeline(transaction=True)
+    pipe.hset(key, f"ttl:{data_hash}", ttl_metadata_json)
+    pipe.zadd(
+        TTL_INDEX,
+        {f"{ss58_address}:{data_hash}": ttl_metadata["generated"] + ttl},
+    )
+    pipe.sadd(HOTKEYS_INDEX, ss58_address)
+    await pipe.execute()
     bt.logging.trace(f"Set TTL for {data_hash} to {ttl} seconds.")
 
 
@@ -120,25 +431,63 @@ async def is_ttl_expired_for_hash_and_hotkey(
         return False
 
 
-async def purge_expired_ttl_keys(database: aioredis.Redis):
+async def count_expired_ttl_keys(database: aioredis.Redis) -> int:
     """
-    Purges all expired TTL keys from the database.
+    Counts the data hashes whose TTL has expired but that have not been purged yet.
 
     Parameters:
         database (aioredis.Redis): The Redis client instance.
+
+    Returns:
+        The number of expired data hashes.
     """
-    # Iterate over all hotkeys
-    async for hotkey in database.scan_iter("*"):
-        if not hotkey.startswith(b"hotkey:"):
-            continue
-        data_hashes = await database.hgetall(hotkey)
-        for data_hash in data_hashes:
-            data_hash = data_hash.decode("utf-8")
-            if data_hash.startswith("ttl:"):
-                hk = hotkey.decode("utf-8")[7:]
-                hs = data_hash[4:]
-                if await is_ttl_expired_for_hash_and_hotkey(hs, hk, database):
-                    await remove_metadata_from_hotkey(hk, hs, database)
+    return await database.zcount(TTL_INDEX, "-inf", f"({time.time()}")
+
+
+async def purge_expired_ttl_keys(
+    database: aioredis.Redis, limit: Optional[int] = None
+) -> int:
+    """
+    Purges expired TTL keys from the database, oldest expiry first.
+
+    The cost is proportional to the number of entries purged, so calling this every
+    step with a `limit` keeps up with expiries in small, bounded increments.
+
+    Parameters:
+        database (aioredis.Redis): The Redis client instance.
+        limit (int): Maximum number of expired data hashes to purge. Defaults to all of them.
+
+    Returns:
+        The number of data hashes purged.
+    """
+    # Expired entries are exactly those scored before now in the expiry index
+    now = time.time()
+    if limit is None:
+        members = await database.zrangebyscore(TTL_INDEX, "-inf", f"({now}")
+    else:
+        members = await database.zrangebyscore(
+            TTL_INDEX, "-inf", f"({now}", start=0, num=limit
+        )
+
+    expired = {}
+    for member in members:
+        hotkey, data_hash = member.decode("utf-8").split(":", 1)
+        expired.setdefault(hotkey, []).append(data_hash)
+
+    purge = database.register_script(PURGE_EXPIRED_TTL_SCRIPT)
+    removed = await pipelined(
+        database,
+        expired.items(),
+        lambda pipe, item: purge(
+            keys=hotkey_keys(item[0]), args=[now, *item[1]], client=pipe
+        ),
+    )
+    for hotkey, data_hashes in zip(expired, removed):
+        if data_hashes:
+            bt.logging.trace(
+                f"Purged {len(data_hashes)} expired hashes from hotkey {hotkey}."
+            )
+    return sum(len(data_hashes) for data_hashes in removed)
 
 
 async def add_metadata_to_hotkey(
@@ -160,9 +509,9 @@ async def add_metadata_to_hotkey(
     """
     # Serialize the metadata as a JSON string
     metadata_json = json.dumps(metadata)
-    # Use HSET to associate the data hash with the hotkey
-    key = f"hotkey:{ss58_address}"
-    await database.hset(key, data_hash, metadata_json)
+    # Associate the data hash with the hotkey and update its usage counters atomically
+    set_metadata = database.register_script(SET_METADATA_SCRIPT)
+    await set_metadata(keys=hotkey_keys(ss58_address), args=[data_hash, metadata_json])
     bt.logging.trace(f"Associated data hash {data_hash} with hotkey {ss58_address}.")
 
     if ttl:
@@ -180,10 +529,9 @@ async def remove_metadata_from_hotkey(
         data_hash (str): The subkey representing the data hash.
         database (aioredis.Redis): The Redis client instance.
     """
-    # Use HDEL to remove the data hash from the hotkey
-    key = f"hotkey:{ss58_address}"
-    await database.hdel(key, data_hash)
-    await database.hdel(key, f"ttl:{data_hash}")  # delete the TTL as well
+    # Remove the data hash and its TTL, updating the usage counters atomically
+    remove_metadata = database.register_script(REMOVE_METADATA_SCRIPT)
+    await remove_metadata(keys=hotkey_keys(ss58_address), args=[data_hash])
     bt.logging.trace(f"Removed data hash {data_hash} from hotkey {ss58_address}.")
 
 
@@ -255,8 +603,11 @@ async def remove_hashes_for_hotkey(
     bt.logging.trace(
         f"remove_hashes_for_hotkey() removing {len(hashes)} hashes from hotkey {ss58_address}"
     )
-    for _hash in hashes:
-        await remove_metadata_from_hotkey(ss58_address, _hash, database)
+    if not hashes:
+        return
+    # Drop every hash and its TTL field in a single script call
+    remove_metadata = database.register_script(REMOVE_METADATA_SCRIPT)
+    await remove_metadata(keys=hotkey_keys(ss58_address), args=list(hashes))
 
 
 async def update_metadata_for_data_hash(
@@ -273,8 +624,11 @@ async def update_metadata_for_data_hash(
     """
     # Serialize the new metadata as a JSON string
     new_metadata_json = json.dumps(new_metadata)
-    # Update the field in the hash with the new metadata
-    await database.hset(f"hotkey:{ss58_address}", data_hash, new_metadata_json)
+    # Update the field in the hash with the new metadata, keeping the usage counters in sync
+    set_metadata = database.register_script(SET_METADATA_SCRIPT)
+    await set_metadata(
+        keys=hotkey_keys(ss58_address), args=[data_hash, new_metadata_json]
+    )
     bt.logging.trace(
         f"Updated metadata for data hash {data_hash} under hotkey {ss58_address}."
     )
@@ -322,18 +676,19 @@ async def get_all_chunk_hashes(database: aioredis.Redis) -> Dict[str, List[str]]
     # Initialize an empty dictionary to store the inverse map
     chunk_hash_hotkeys = {}
 
-    # Retrieve all hotkeys (assuming keys are named with a 'hotkey:' prefix)
-    async for hotkey in database.scan_iter("*"):
-        if not hotkey.startswith(b"hotkey:"):
-            continue
-        # Fetch all fields (data hashes) for the current hotkey
-        data_hashes = await database.hkeys(hotkey)
+    # Retrieve all hotkeys from the hotkey index
+    hotkeys = await active_hotkeys(database)
+    # Fetch all fields (data hashes) for every hotkey over pipelines
+    all_data_hashes = await pipelined(
+        database, hotkeys, lambda pipe, hotkey: pipe.hkeys(f"hotkey:{hotkey}")
+    )
+    for hotkey, data_hashes in zip(hotkeys, all_data_hashes):
         # Iterate over each data hash and append the hotkey to the corresponding list
         for data_hash in data_hashes:
             data_hash = data_hash.decode("utf-8")
             if data_hash not in chunk_hash_hotkeys:
                 chunk_hash_hotkeys[data_hash] = []
-            chunk_hash_hotkeys[data_hash].append(hotkey.decode("utf-8").split(":")[1])
+            chunk_hash_hotkeys[data_hash].append(hotkey)
 
     return chunk_hash_hotkeys
 
@@ -348,13 +703,9 @@ async def get_all_full_hashes(database: aioredis.Redis) -> List[str]:
     Returns:
         A dictionary where keys are data hashes and values are lists of hotkeys associated with each data hash.
     """
-    data_hashes = []
-    async for key in database.scan_iter("*"):
-        if not key.startswith(b"file:"):
-            continue
-        data_hashes.append(key.decode("utf-8").split(":")[1])
-
-    return data_hashes
+    return [
+        full_hash.decode("utf-8") for full_hash in await database.smembers(FILES_INDEX)
+    ]
 
 
 async def get_all_hotkeys_for_data_hash(
@@ -398,6 +749,7 @@ async def total_hotkey_storage(
 ) -> int:
     """
     Calculates the total storage used by a hotkey in the database.
+    This is a single read of the hotkey's maintained usage counter.
 
     Parameters:
         database (aioredis.Redis): The Redis client instance.
@@ -406,19 +758,58 @@ async def total_hotkey_storage(
     Returns:
         The total storage used by the hotkey in bytes.
     """
-    total_storage = 0
-    keys = await database.hkeys(f"hotkey:{hotkey}")
-    for data_hash in keys:
-        if data_hash.startswith(b"ttl:"):
-            continue
-        # Get the metadata for the current data hash
-        metadata = await get_metadata_for_hotkey_and_hash(
-            hotkey, data_hash, database, verbose
-        )
-        if metadata:
-            # Add the size of the data to the total storage
-            total_storage += metadata["size"]
-    return total_storage
+    total_storage = database.register_script(TOTAL_HOTKEY_STORAGE_SCRIPT)
+    return int(await total_storage(keys=hotkey_keys(hotkey)))
+
+
+async def total_hotkeys_storage(
+    hotkeys: List[str], database: aioredis.Redis
+) -> Dict[str, int]:
+    """
+    Calculates the total storage used by each of several hotkeys in pipelined round trips.
+
+    Parameters:
+        hotkeys (list): List of hotkey strings.
+        database (aioredis.Redis): The Redis client instance.
+
+    Returns:
+        A dictionary with hotkeys as keys and their total storage in bytes as values.
+    """
+    total_storage = database.register_script(TOTAL_HOTKEY_STORAGE_SCRIPT)
+    totals = await pipelined(
+        database,
+        hotkeys,
+        lambda pipe, hotkey: total_storage(keys=hotkey_keys(hotkey), client=pipe),
+    )
+    return {hotkey: int(total) for hotkey, total in zip(hotkeys, totals)}
+
+
+async def reconcile_hotkey_usage(
+    database: aioredis.Redis, hotkeys: Optional[List[str]] = None
+) -> Dict[str, Tuple[Optional[int], int]]:
+    """
+    Rebuilds the usage counters of hotkeys from their stored metadata.
+
+    Parameters:
+        database (aioredis.Redis): The Redis client instance.
+        hotkeys (list): The hotkeys to reconcile. Defaults to every hotkey in the database.
+
+    Returns:
+        A dictionary with hotkeys as keys and (previous_bytes, bytes) as values, where
+        previous_bytes is None if the hotkey had no counters yet.
+    """
+    if hotkeys is None:
+        hotkeys = await active_hotkeys(database)
+    rebuild = database.register_script(REBUILD_USAGE_SCRIPT)
+    results = await pipelined(
+        database,
+        hotkeys,
+        lambda pipe, hotkey: rebuild(keys=hotkey_keys(hotkey), client=pipe),
+    )
+    return {
+        hotkey: (None if previous == -1 else int(previous), int(current))
+        for hotkey, (previous, current) in zip(hotkeys, results)
+    }
 
 
 async def hotkey_at_capacity(
@@ -434,10 +825,22 @@ async def hotkey_at_capacity(
     Returns:
         True if the hotkey is at capacity, False otherwise.
     """
-    # Get the total storage used by the hotkey
-    total_storage = await total_hotkey_storage(hotkey, database, verbose)
+    # Get the total storage used by the hotkey and its limit in one round trip
+    # (the storage limit is served from the tier cache when possible)
+    cached = tier_cache.get(hotkey)
+    total_storage_script = database.register_script(TOTAL_HOTKEY_STORAGE_SCRIPT)
+    results = iter(
+        await pipelined(
+            database,
+            [hotkey],
+            lambda pipe, hotkey: _queue_hotkey_capacity(
+                pipe, hotkey, total_storage_script, cached
+            ),
+        )
+    )
+    total_storage = int(next(results))
+    byte_limit = _pop_storage_limit(hotkey, cached, results)
     # Check if the hotkey is at capacity
-    byte_limit = await database.hget(f"stats:{hotkey}", "storage_limit")
     if byte_limit is None:
         if verbose:
             bt.logging.trace(f"Could not find storage limit for {hotkey}.")
@@ -478,11 +881,23 @@ async def cache_hotkeys_capacity(
     """
     hotkeys_capacity = {}
 
+    # Queue (total_storage, storage_limit) for every hotkey on shared pipelines
+    # (storage limits are served from the tier cache when possible)
+    cached = {hotkey: tier_cache.get(hotkey) for hotkey in hotkeys}
+    total_storage_script = database.register_script(TOTAL_HOTKEY_STORAGE_SCRIPT)
+    results = iter(
+        await pipelined(
+            database,
+            hotkeys,
+            lambda pipe, hotkey: _queue_hotkey_capacity(
+                pipe, hotkey, total_storage_script, cached[hotkey]
+            ),
+        )
+    )
+
     for hotkey in hotkeys:
-        # Get the total storage used by the hotkey
-        total_storage = await total_hotkey_storage(hotkey, database, verbose)
-        # Get the byte limit for the hotkey
-        byte_limit = await database.hget(f"stats:{hotkey}", "storage_limit")
+        total_storage = int(next(results))
+        byte_limit = _pop_storage_limit(hotkey, cached[hotkey], results)
 
         if byte_limit is None:
             bt.logging.warning(f"Could not find storage limit for {hotkey}.")
@@ -540,16 +955,8 @@ async def total_validator_storage(database: aioredis.Redis) -> int:
     Returns:
         The total storage used by all hotkeys in the database in bytes.
     """
-    total_storage = 0
-    # Iterate over all hotkeys
-    async for hotkey in database.scan_iter("*"):
-        if not hotkey.startswith(b"hotkey:"):
-            continue
-        # Grab storage for that hotkey
-        total_storage += await total_hotkey_storage(
-            hotkey.decode().split(":")[1], database
-        )
-    return total_storage
+    hotkeys = await active_hotkeys(database)
+    return sum((await total_hotkeys_storage(hotkeys, database)).values())
 
 
 async def get_miner_statistics(database: aioredis.Redis) -> Dict[str, Dict[str, str]]:
@@ -561,9 +968,9 @@ async def get_miner_statistics(database: aioredis.Redis) -> Dict[str, Dict[str,
         A dictionary where keys are hotkeys and values are dictionaries containing the statistics for each hotkey.
     """
     stats = {}
-    async for key in database.scan_iter(b"stats:*"):
-        # Await the hgetall call and then process its result
-        key_stats = await database.hgetall(key)
+    keys = await scan_keys(database, "stats:*")
+    all_stats = await pipelined(database, keys, lambda pipe, key: pipe.hgetall(key))
+    for key, key_stats in zip(keys, all_stats):
         # Process the key_stats as required
         processed_stats = {
             k.decode("utf-8"): v.decode("utf-8") for k, v in key_stats.items()
@@ -595,12 +1002,9 @@ async def get_redis_db_size(database: aioredis.Redis) -> int:
     Returns:
         int: Total size of all keys in bytes
     """
-    total_size = 0
-    async for key in database.scan_iter("*"):
-        size = await database.execute_command("MEMORY USAGE", key)
-        if size:
-            total_size += size
-    return total_size
+    # The server already tracks the memory used by the dataset, no need to visit every key
+    memory = await database.info("memory")
+    return int(memory["used_memory_dataset"])
 
 
 async def store_file_chunk_mapping_ordered(
@@ -625,14 +1029,22 @@ async def store_file_chunk_mapping_ordered(
     - encryption_payload (Optional[Union[bytes, dict]]): The encryption payload to store with the file.
     """
     key = f"file:{full_hash}"
-    for chunk_index, chunk_hash in zip(chunk_indices, chunk_hashes):
-        await database.zadd(key, {chunk_hash: chunk_index})
+    pipe = database.pipeline(transaction=False)
+    mapping = {
+        chunk_hash: chunk_index
+        for chunk_index, chunk_hash in zip(chunk_indices, chunk_hashes)
+    }
+    if mapping:
+        pipe.zadd(key, mapping)
+        pipe.sadd(FILES_INDEX, full_hash)
 
     # Store the encryption payload if provided
     if encryption_payload:
         if isinstance(encryption_payload, dict):
             encryption_payload = json.dumps(encryption_payload)
-        await database.set(f"payload:{full_hash}", encryption_payload)
+        pipe.set(f"payload:{full_hash}", encryption_payload)
+
+    await pipe.execute()
 
 
 async def retrieve_encryption_payload(
@@ -688,10 +1100,17 @@ async def get_all_chunks_for_file(
     if not chunk_hashes_with_index:
         return None
 
+    all_chunk_metadata = await pipelined(
+        database,
+        chunk_hashes_with_index,
+        lambda pipe, item: pipe.hgetall(f"chunk:{item[0].decode()}"),
+    )
+
     chunks_info = {}
-    for chunk_hash_bytes, index in chunk_hashes_with_index:
+    for (chunk_hash_bytes, index), chunk_metadata in zip(
+        chunk_hashes_with_index, all_chunk_metadata
+    ):
         chunk_hash = chunk_hash_bytes.decode()
-        chunk_metadata = await database.hgetall(f"chunk:{chunk_hash}")
         if chunk_metadata:
             chunks_info[int(index)] = {
                 "chunk_hash": chunk_hash,
@@ -767,6 +1186,7 @@ async def add_hotkey_to_chunk(chunk_hash: str, hotkey: str, database: aioredis.R
     else:
         # If no UIDs are associated with this chunk, create a new entry
         await database.hmset(chunk_metadata_key, {"hotkeys": hotkey})
+        await database.sadd(CHUNKS_INDEX, chunk_hash)
         print(f"UID {hotkey} set for new chunk {chunk_hash}.")
 
 
@@ -833,7 +1253,10 @@ async def store_chunk_metadata(
         hotkeys = set(existing_hotkeys + hotkeys)
     metadata = {"hotkeys": ",".join(hotkeys), "size": chunk_size}
 
-    await database.hmset(chunk_metadata_key, metadata)
+    pipe = database.pipeline(transaction=True)
+    pipe.hmset(chunk_metadata_key, metadata)
+    pipe.sadd(CHUNKS_INDEX, chunk_hash)
+    await pipe.execute()
 
 
 async def get_ordered_metadata(
@@ -929,10 +1352,7 @@ async def is_file_chunk(chunk_hash: str, database: aioredis.Redis) -> str:
     Returns:
     - bool: True if the hash belongs to a full file, false otherwise (challenge data)
     """
-    async for key in database.scan_iter(match="chunk:*"):
-        if chunk_hash in key.decode():
-            return True
-    return False
+    return bool(await database.sismember(CHUNKS_INDEX, chunk_hash))
 
 
 async def get_all_hashes_in_database(database: aioredis.Redis) -> List[str]:
@@ -947,8 +1367,11 @@ async def get_all_hashes_in_database(database: aioredis.Redis) -> List[str]:
     """
     all_hashes = set()
 
-    async for hotkey_key in database.scan_iter(match="hotkey:*"):
-        all_hashes.update(list(await database.hgetall(hotkey_key)))
+    hotkeys = await active_hotkeys(database)
+    for data_hashes in await pipelined(
+        database, hotkeys, lambda pipe, hotkey: pipe.hkeys(f"hotkey:{hotkey}")
+    ):
+        all_hashes.update(data_hashes)
 
     return list(all_hashes)
 
@@ -1012,8 +1435,7 @@ async def purge_challenges_for_hotkey(ss58_address: str, database: aioredis.Redi
     """
     challenge_hashes = await get_challenges_for_hotkey(ss58_address, database)
     bt.logging.trace(f"purging challenges for {ss58_address}...")
-    for ch in challenge_hashes:
-        await database.hdel(f"hotkey:{ss58_address}", ch)
+    await remove_hashes_for_hotkey(ss58_address, challenge_hashes, database)
 
 
 async def purge_challenges_for_all_hotkeys(database: aioredis.Redis):
@@ -1030,8 +1452,7 @@ async def purge_challenges_for_all_hotkeys(database: aioredis.Redis):
     - database (aioredis.Redis): An instance of the Redis database used for data storage.
     """
     bt.logging.debug("purging challenges for ALL hotkeys...")
-    async for hotkey in database.scan_iter(match="hotkey:*"):
-        hotkey = hotkey.decode().split(":")[1]
+    for hotkey in await active_hotkeys(database):
         await purge_challenges_for_hotkey(hotkey, database)
 
 
@@ -1055,15 +1476,21 @@ async def delete_file_from_database(file_hash: str, database: aioredis.Redis):
         return
 
     # Delete all chunk hashes
-    for idx, chunk_dict in chunk_data.items():
-        chunk_hash = chunk_dict["chunk_hash"]
-        await database.delete(f"chunk:{chunk_hash}")
+    chunk_hashes = [chunk_dict["chunk_hash"] for chunk_dict in chunk_data.values()]
+    if chunk_hashes:
+        pipe = database.pipeline(transaction=True)
+        pipe.delete(*[f"chunk:{chunk_hash}" for chunk_hash in chunk_hashes])
+        pipe.srem(CHUNKS_INDEX, *chunk_hashes)
+        await pipe.execute()
 
     # Test getting the chunk hash back
     chunk_data = await get_all_chunks_for_file(file_hash, database)
     if chunk_data == {}:
         bt.logging.debug(f"all chunks deleted for file {file_hash}.")
-        await database.delete(f"file:{file_hash}")
+        pipe = database.pipeline(transaction=True)
+        pipe.delete(f"file:{file_hash}")
+        pipe.srem(FILES_INDEX, file_hash)
+        await pipe.execute()
 
     bt.logging.trace(f"File {file_hash} deleted!")
 
@@ -1081,9 +1508,7 @@ async def active_hotkeys(database: aioredis.Redis) -> List[str]:
     """
     Returns a list of all active hotkeys in the database.
     """
-    return [
-        x.decode().split(":")[-1] async for x in database.scan_iter("hotkey:*")
-    ]
+    return [x.decode() for x in await database.smembers(HOTKEYS_INDEX)]
 
 
 async def get_network_capacity(database) -> int:
@@ -1133,13 +1558,17 @@ async def tier_statistics(database: aioredis.Redis, by_tier: bool = False) -> Di
         "Bronze": 0,
     }
 
-    for k,v in (await get_miner_statistics(database)).items():
+    stats = await get_miner_statistics(database)
+    usage = await total_hotkeys_storage(
+        [k.split(":")[-1] for k, v in stats.items() if v.get('tier', None)], database
+    )
+    for k,v in stats.items():
         tier = v.get('tier', None)
         if tier:
             hotkey = k.split(":")[-1]
             tier_counts[tier] += 1
             tier_capacity[tier] += int(v.get('storage_limit', 0))
-            tier_usage[tier] += await total_hotkey_storage(hotkey, database, False)
+            tier_usage[tier] += usage[hotkey]
 
     tier_percent_usage = {
         k: 100 * (v / tier_capacity[k]) if tier_capacity[k] > 0 else 0
@@ -1,9 +1,46 @@
+import json
 import time
+import base64
+import asyncio
 import bittensor as bt
-from typing import Union, List
+from typing import Union, List, Optional
+
+from storage.shared.transport import (
+    BINARY_CONTENT_TYPE,
+    BINARY_PAYLOAD_VERSION,
+    PAYLOAD_FIELDS,
+    PROTOCOL_HEADER,
+    PROTOCOL_VERSION,
+    pack_payload,
+    protocol_version,
+    unpack_payload,
+)
+from storage.validator.liveness import LivenessTable
+
+
+async def _iterate(pieces):
+    for piece in pieces:
+        yield piece
+
 
 class timed_dendrite(bt.dendrite):
 
+    def __init__(
+        self,
+        wallet=None,
+        liveness: Optional[LivenessTable] = None,
+    ):
+        """
+        Args:
+            wallet (bt.wallet, optional): The wallet used to sign requests.
+            liveness (LivenessTable, optional): Records the outcome of every request, so that
+                miners that just answered do not need to be pinged. Defaults to ``None``.
+        """
+        super().__init__(wallet=wallet)
+        self.liveness = liveness
+        # Hotkeys of axons that exchange payloads as raw bytes
+        self.binary_hotkeys = set()
+
     async def call(
         self,
         target_axon: Union[bt.AxonInfo, bt.axon],
@@ -42,20 +79,48 @@ class timed_dendrite(bt.dendrite):
         # Preprocess synapse for making a request
         synapse = self.preprocess_synapse_for_request(target_axon, synapse, timeout)
 
+        cancelled = False
         try:
             # Log outgoing request
             self._log_outgoing_request(synapse)
 
+            headers = synapse.to_headers()
+            headers[PROTOCOL_HEADER] = str(PROTOCOL_VERSION)
+            request_kwargs = {"headers": headers, "json": synapse.dict()}
+            payload = synapse._payload if request_name in PAYLOAD_FIELDS else None
+            if payload is not None and target_axon.hotkey in self.binary_hotkeys:
+                # Send the payload as raw bytes after the synapse JSON
+                pieces = pack_payload(
+                    json.dumps(request_kwargs.pop("json")).encode(), payload
+                )
+                headers["Content-Type"] = BINARY_CONTENT_TYPE
+                headers["Content-Length"] = str(sum(len(piece) for piece in pieces))
+                request_kwargs["data"] = _iterate(pieces)
+            elif payload is not None:
+                # Older axons only read base64 encoded payloads from the JSON
+                encoded = await asyncio.to_thread(base64.b64encode, payload)
+                request_kwargs["json"][PAYLOAD_FIELDS[request_name]] = encoded.decode()
+
             # Make the HTTP POST request
             start_time = time.time()
             async with (await self.session).post(
                 url,
-                headers=synapse.to_headers(),
-                json=synapse.dict(),
                 timeout=timeout,
+                **request_kwargs,
             ) as response:
-                # Extract the JSON response from the server
-                json_response = await response.json()
+                # Extract the JSON response from the server, and the payload sent after it
+                response_payload = None
+                if response.content_type == BINARY_CONTENT_TYPE:
+                    header, response_payload = unpack_payload(await response.read())
+                    json_response = json.loads(header)
+                else:
+                    json_response = await response.json()
+
+                # Remember the axons that exchange payloads as raw bytes
+                if protocol_version(response.headers) >= BINARY_PAYLOAD_VERSION:
+                    self.binary_hotkeys.add(target_axon.hotkey)
+                else:
+                    self.binary_hotkeys.discard(target_axon.hotkey)
 
                 # Set process time and log the response
                 process_time = time.time() - start_time # type: ignore
@@ -63,6 +128,14 @@ class timed_dendrite(bt.dendrite):
                 # Process the server response and fill synapse
                 self.process_server_response(response, json_response, synapse)
                 synapse.dendrite.process_time = process_time
+                if request_name in PAYLOAD_FIELDS:
+                    synapse._payload = response_payload
+
+        except asyncio.CancelledError:
+            # Hedged requests are cancelled once another miner answered, which
+            # says nothing about whether this one is up
+            cancelled = True
+            raise
 
         except Exception as e:
             self._handle_request_errors(synapse, request_name, e)
@@ -70,13 +143,21 @@ class timed_dendrite(bt.dendrite):
         finally:
             self._log_incoming_response(synapse)
 
+            if self.liveness is not None and not cancelled:
+                self.liveness.record(
+                    target_axon.hotkey,
+                    success=synapse.dendrite.status_code == 200,
+                    rtt=synapse.dendrite.process_time,
+                )
+
             # Log synapse event history
             self.synapse_history.append(
                 bt.Synapse.from_headers(synapse.to_headers())
             )
 
-            # Return the updated synapse object after deserializing if requested
-            if deserialize:
-                return synapse.deserialize()
-            else:
-                return synapse
+        # Return the updated synapse object after deserializing if requested. This is done
+        # outside of `finally`, where returning would swallow a cancellation.
+        if deserialize:
+            return synapse.deserialize()
+        else:
+            return synapse
@@ -23,7 +23,7 @@ import bittensor as bt
 from pprint import pformat
 from Crypto.Random import random
 
-from storage.validator.database import get_ordered_metadata
+from storage.validator.database import get_ordered_metadata, get_all_full_hashes
 
 from .store import store_broadband
 from .retrieve import retrieve_broadband
@@ -40,12 +40,12 @@ async def distribute_data(self, k: int):
     - A report of the rebalancing process.
     """
 
-    full_hashes = [key async for key in self.database.scan_iter("file:*")]
+    full_hashes = await get_all_full_hashes(self.database)
     if full_hashes == []:
         bt.logging.warning("No full hashes found, skipping distribute step.")
         return
 
-    full_hash = random.choice(full_hashes).decode("utf-8").split(":")[1]
+    full_hash = random.choice(full_hashes)
     # TODO: review if this variable is needed
     encryption_payload = await self.database.get(f"payload:{full_hash}")
     ordered_metadata = await get_ordered_metadata(full_hash, self.database)
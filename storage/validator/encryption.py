@@ -20,16 +20,131 @@
 
 import os
 import json
+import time
+import atexit
 import typing
+import asyncio
+import hashlib
+import threading
 
 import bittensor as bt
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from Crypto.Cipher import AES
 from nacl import pwhash, secret
 from nacl.encoding import HexEncoder
 from nacl.utils import EncryptedMessage
 
+from storage.shared.utils import read_chunks
+
 NACL_SALT = b"\x13q\x83\xdf\xf1Z\t\xbc\x9c\x90\xb5Q\x879\xe9\xb1"
 
+# How long a key derived from a wallet is kept in memory (seconds).
+WALLET_KEY_CACHE_TTL = 60 * 60
+
+
+class WalletKeyCache:
+    """
+    In-process cache of the symmetric keys derived from wallet private keys. Deriving a key runs
+    Argon2i with the sensitive limits, which takes seconds and hundreds of MB of memory, so it is
+    done once per wallet and lifetime instead of on every encryption and decryption.
+
+    Entries are keyed by a SHA-256 digest of the password rather than the password itself, and the
+    cached keys are held in mutable buffers that are overwritten with zeros when they expire or the
+    cache is cleared (including at interpreter exit). The short-lived key copies handed to NaCl
+    cannot be wiped this way.
+    """
+
+    def __init__(self, ttl: float = WALLET_KEY_CACHE_TTL):
+        self.ttl = ttl
+        self._keys: typing.Dict[bytes, typing.Tuple[bytearray, float]] = {}
+        # Derivations in progress, so that concurrent requests for a wallet wait for a single one
+        self._derivations: typing.Dict[bytes, Future] = {}
+        # Keys are derived from worker threads too. The lock only guards the dictionaries, keys
+        # are derived outside of it so that other wallets are not held up.
+        self._lock = threading.Lock()
+
+    def get(self, password: bytes) -> bytes:
+        """
+        Returns the symmetric key derived from a wallet password, deriving it if it is not cached.
+        Expired keys of every wallet are zeroized on the way.
+        """
+        identity = hashlib.sha256(password).digest()
+        with self._lock:
+            self._purge(time.monotonic())
+            entry = self._keys.get(identity)
+            if entry is not None:
+                return bytes(entry[0])
+            derivation = self._derivations.get(identity)
+            if derivation is not None:
+                deriving = False
+            else:
+                deriving, derivation = True, Future()
+                self._derivations[identity] = derivation
+
+        if not deriving:
+            return derivation.result()
+
+        try:
+            key = derive_wallet_key(password)
+        except BaseException as e:
+            with self._lock:
+                del self._derivations[identity]
+            derivation.set_exception(e)
+            raise
+        with self._lock:
+            self._keys[identity] = (bytearray(key), time.monotonic())
+            del self._derivations[identity]
+        derivation.set_result(key)
+        return key
+
+    def clear(self):
+        """Zeroizes and drops every cached key."""
+        with self._lock:
+            for key, _ in self._keys.values():
+                self._wipe(key)
+            self._keys = {}
+
+    def purge(self):
+        """Zeroizes and drops the expired keys."""
+        with self._lock:
+            self._purge(time.monotonic())
+
+    def _purge(self, now: float):
+        # The lock must be held
+        for identity, (key, derived_at) in list(self._keys.items()):
+            if now - derived_at > self.ttl:
+                self._wipe(key)
+                del self._keys[identity]
+
+    @staticmethod
+    def _wipe(key: bytearray):
+        key[:] = bytes(len(key))
+
+
+def derive_wallet_key(password: bytes) -> bytes:
+    """
+    Derives the symmetric key used to encrypt data with a wallet from its password.
+
+    Args:
+        password (bytes): The hex encoded private key of the wallet's coldkey.
+
+    Returns:
+        bytes: A key for the NaCl secret box.
+    """
+    return pwhash.argon2i.kdf(
+        secret.SecretBox.KEY_SIZE,
+        password,
+        NACL_SALT,
+        opslimit=pwhash.argon2i.OPSLIMIT_SENSITIVE,
+        memlimit=pwhash.argon2i.MEMLIMIT_SENSITIVE,
+    )
+
+
+# Process-wide cache of wallet keys, wiped when the interpreter exits.
+wallet_key_cache = WalletKeyCache()
+atexit.register(wallet_key_cache.clear)
+
 
 def encrypt_aes(filename: typing.Union[bytes, str], key: bytes) -> bytes:
     """
@@ -106,14 +221,7 @@ def encrypt_data_with_wallet(data: bytes, wallet) -> bytes:
     # Derive symmetric key from wallet's coldkey
     password = wallet.coldkey.private_key.hex()
     password_bytes = bytes(password, "utf-8")
-    kdf = pwhash.argon2i.kdf
-    key = kdf(
-        secret.SecretBox.KEY_SIZE,
-        password_bytes,
-        NACL_SALT,
-        opslimit=pwhash.argon2i.OPSLIMIT_SENSITIVE,
-        memlimit=pwhash.argon2i.MEMLIMIT_SENSITIVE,
-    )
+    key = wallet_key_cache.get(password_bytes)
 
     # Encrypt the data
     box = secret.SecretBox(key)
@@ -142,14 +250,7 @@ def decrypt_data_with_coldkey_private_key(
         bytes(private_key, "utf-8") if isinstance(private_key, str) else private_key
     )
 
-    kdf = pwhash.argon2i.kdf
-    key = kdf(
-        secret.SecretBox.KEY_SIZE,
-        password_bytes,
-        NACL_SALT,
-        opslimit=pwhash.argon2i.OPSLIMIT_SENSITIVE,
-        memlimit=pwhash.argon2i.MEMLIMIT_SENSITIVE,
-    )
+    key = wallet_key_cache.get(password_bytes)
 
     box = secret.SecretBox(key)
     decrypted = box.decrypt(encrypted_data)
@@ -174,14 +275,7 @@ def decrypt_data_with_wallet(encrypted_data: bytes, wallet) -> bytes:
     # Derive symmetric key from wallet's coldkey
     password = wallet.coldkey.private_key.hex()
     password_bytes = bytes(password, "utf-8")
-    kdf = pwhash.argon2i.kdf
-    key = kdf(
-        secret.SecretBox.KEY_SIZE,
-        password_bytes,
-        NACL_SALT,
-        opslimit=pwhash.argon2i.OPSLIMIT_SENSITIVE,
-        memlimit=pwhash.argon2i.MEMLIMIT_SENSITIVE,
-    )
+    key = wallet_key_cache.get(password_bytes)
 
     # Decrypt the data
     box = secret.SecretBox(key)
@@ -193,18 +287,33 @@ def encrypt_data_with_aes_and_serialize(
     data: bytes, wallet: bt.wallet
 ) -> typing.Tuple[bytes, bytes]:
     """
-    Decrypts the given encrypted data using a symmetric key derived from the wallet's coldkey public key.
+    Encrypts the given data with a random AES key in the segmented format (see `SegmentedEncryptor`),
+    and encrypts the key with a symmetric key derived from the wallet's coldkey.
 
     Args:
-        encrypted_data (bytes): Data to be decrypted.
+        data (bytes): Data to be encrypted.
         wallet (bt.wallet): Bittensor wallet object containing the coldkey.
 
     Returns:
-        bytes: Decrypted data.
+        tuple: The encrypted data and the serialized encryption payload.
+    """
+    encryptor = SegmentedEncryptor(wallet)
+    return encryptor.encrypt(data), encryptor.payload()
 
-    Similar to the encryption function, this function derives a symmetric key from the wallet's coldkey public key.
-    It then uses this key to decrypt the given encrypted data. The function is primarily used for decrypting data
-    that was previously encrypted by the `encrypt_data_with_wallet` function.
+
+def encrypt_data_with_aes_single_shot(
+    data: bytes, wallet: bt.wallet
+) -> typing.Tuple[bytes, bytes]:
+    """
+    Encrypts the given data in a single AES-GCM call, the format used before segmented encryption.
+    Kept to produce data in the legacy format, which `decrypt_data` still decrypts.
+
+    Args:
+        data (bytes): Data to be encrypted.
+        wallet (bt.wallet): Bittensor wallet object containing the coldkey.
+
+    Returns:
+        tuple: The encrypted data and the serialized encryption payload.
     """
     # Generate a random AES key
     aes_key = os.urandom(32)  # AES key for 256-bit encryption
@@ -222,13 +331,244 @@ def encrypt_data_with_aes_and_serialize(
         "nonce": nonce.hex(),
         "tag": tag.hex(),
     }
+    return encrypted_data, serialize_aes_info(aes_info, wallet)
+
+
+def serialize_aes_info(aes_info: dict, wallet: bt.wallet) -> str:
+    """
+    Serializes the AES parameters of encrypted data and encrypts them with the wallet's coldkey.
+
+    Args:
+        aes_info (dict): The AES key and parameters, hex encoded.
+        wallet (bt.wallet): Bittensor wallet object containing the coldkey.
+
+    Returns:
+        str: The encryption payload expected by `decrypt_data_and_deserialize`.
+    """
     aes_info_str = json.dumps(aes_info)
 
     encrypted_msg: EncryptedMessage = encrypt_data_with_wallet(
         aes_info_str.encode(), wallet
     )  # Encrypt the serialized JSON string
 
-    return encrypted_data, serialize_nacl_encrypted_message(encrypted_msg)
+    return serialize_nacl_encrypted_message(encrypted_msg)
+
+
+# Segmented AES-GCM format. The plaintext is split into segments of `segment_size` bytes (the
+# last one may be shorter, or empty for empty data), each encrypted separately and followed by
+# its 16 byte tag. The nonce of a segment is a random 7 byte prefix, the big endian segment index
+# on 4 bytes, and a byte set to 1 for the final segment only, so segments cannot be reordered,
+# dropped, or truncated at a segment boundary without failing authentication.
+SEGMENTED_FORMAT_VERSION = 2
+SEGMENT_SIZE = 1024 * 1024
+SEGMENT_TAG_SIZE = 16
+SEGMENT_NONCE_PREFIX_SIZE = 7
+
+
+def segment_nonce(prefix: bytes, index: int, last: bool) -> bytes:
+    """Returns the nonce of a segment of the segmented format."""
+    return prefix + index.to_bytes(4, "big") + (b"\x01" if last else b"\x00")
+
+
+def encrypt_segment(
+    key: bytes, prefix: bytes, index: int, data: bytes, last: bool
+) -> bytes:
+    """Encrypts a single segment, returning the ciphertext followed by its tag."""
+    cipher = AES.new(key, AES.MODE_GCM, nonce=segment_nonce(prefix, index, last))
+    ciphertext, tag = cipher.encrypt_and_digest(data)
+    return ciphertext + tag
+
+
+def decrypt_segment(
+    key: bytes, prefix: bytes, index: int, segment: bytes, last: bool
+) -> bytes:
+    """
+    Decrypts and authenticates a single segment.
+
+    Raises:
+        ValueError: If the segment is not authentic, or not at this position of the data.
+    """
+    if len(segment) < SEGMENT_TAG_SIZE:
+        raise ValueError(f"Truncated segment {index}")
+    cipher = AES.new(key, AES.MODE_GCM, nonce=segment_nonce(prefix, index, last))
+    return cipher.decrypt_and_verify(
+        segment[:-SEGMENT_TAG_SIZE], segment[-SEGMENT_TAG_SIZE:]
+    )
+
+
+def _split_segments(data: bytes, segment_size: int) -> typing.List[memoryview]:
+    view = memoryview(data)
+    return [view[i : i + segment_size] for i in range(0, len(view), segment_size)] or [
+        view
+    ]
+
+
+def _process_segments(
+    process: typing.Callable, segments: typing.List[memoryview]
+) -> bytes:
+    """Applies `process(index, segment, last)` to every segment on a thread pool."""
+    last = len(segments) - 1
+    if last == 0:
+        return process(0, segments[0], True)
+    # AES-GCM releases the GIL, so segments are processed in parallel
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        return b"".join(
+            executor.map(
+                lambda item: process(item[0], item[1], item[0] == last),
+                enumerate(segments),
+            )
+        )
+
+
+async def _stream_segments(
+    process: typing.Callable,
+    segments: typing.AsyncIterator[bytes],
+    window: int,
+) -> typing.AsyncIterator[bytes]:
+    """
+    Applies `process(index, segment, last)` to consecutive segments on worker threads, at most
+    `window` at a time, and yields the results in order. A segment is only known not to be the
+    last once the next one arrived.
+    """
+    pending = deque()
+    index, previous = 0, None
+    try:
+        async for segment in segments:
+            if previous is not None:
+                pending.append(
+                    asyncio.ensure_future(
+                        asyncio.to_thread(process, index, previous, False)
+                    )
+                )
+                index += 1
+                if len(pending) >= window:
+                    yield await pending.popleft()
+            previous = segment
+        pending.append(
+            asyncio.ensure_future(
+                asyncio.to_thread(process, index, previous or b"", True)
+            )
+        )
+        while pending:
+            yield await pending.popleft()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+class SegmentedEncryptor:
+    """
+    Encrypts data in the segmented AES-GCM format, either at once or as a stream, in parallel.
+    Its payload does not depend on the data, so it can be stored before the data is encrypted.
+    """
+
+    def __init__(self, wallet: bt.wallet, segment_size: int = SEGMENT_SIZE):
+        self.wallet = wallet
+        self.segment_size = segment_size
+        self.aes_key = os.urandom(32)  # AES key for 256-bit encryption
+        self.nonce_prefix = os.urandom(SEGMENT_NONCE_PREFIX_SIZE)
+
+    def payload(self) -> str:
+        """Returns the serialized encryption payload, encrypted with the wallet's coldkey."""
+        aes_info = {
+            "version": SEGMENTED_FORMAT_VERSION,
+            "aes_key": self.aes_key.hex(),
+            "nonce_prefix": self.nonce_prefix.hex(),
+            "segment_size": self.segment_size,
+        }
+        return serialize_aes_info(aes_info, self.wallet)
+
+    def ciphertext_size(self, size: int) -> int:
+        """Returns the size of the encryption of `size` bytes of data."""
+        segments = max(1, -(-size // self.segment_size))
+        return size + segments * SEGMENT_TAG_SIZE
+
+    def _encrypt_segment(self, index: int, data: bytes, last: bool) -> bytes:
+        return encrypt_segment(self.aes_key, self.nonce_prefix, index, data, last)
+
+    def encrypt(self, data: bytes) -> bytes:
+        """Encrypts data that is in memory."""
+        return _process_segments(
+            self._encrypt_segment, _split_segments(data, self.segment_size)
+        )
+
+    def encrypt_stream(
+        self,
+        source: typing.Union[typing.AsyncIterable[bytes], typing.Iterable[bytes]],
+        window: int = None,
+    ) -> typing.AsyncIterator[bytes]:
+        """
+        Encrypts data arriving as pieces of any size, yielding the encrypted segments in order.
+
+        Args:
+            source (AsyncIterable[bytes] | Iterable[bytes]): The data, as consecutive pieces.
+            window (int, optional): Number of segments encrypted concurrently. Defaults to the CPU count.
+        """
+        return _stream_segments(
+            self._encrypt_segment,
+            read_chunks(source, self.segment_size),
+            window or os.cpu_count(),
+        )
+
+
+class SegmentedDecryptor:
+    """Decrypts data in the segmented AES-GCM format, either at once or as a stream, in parallel."""
+
+    def __init__(self, aes_info: dict):
+        self.aes_key = bytes.fromhex(aes_info["aes_key"])
+        self.nonce_prefix = bytes.fromhex(aes_info["nonce_prefix"])
+        self.segment_size = int(aes_info["segment_size"])
+
+    def _decrypt_segment(self, index: int, segment: bytes, last: bool) -> bytes:
+        return decrypt_segment(self.aes_key, self.nonce_prefix, index, segment, last)
+
+    def decrypt(self, encrypted_data: bytes) -> bytes:
+        """Decrypts data that is in memory."""
+        return _process_segments(
+            self._decrypt_segment,
+            _split_segments(encrypted_data, self.segment_size + SEGMENT_TAG_SIZE),
+        )
+
+    def decrypt_stream(
+        self,
+        source: typing.Union[typing.AsyncIterable[bytes], typing.Iterable[bytes]],
+        window: int = None,
+    ) -> typing.AsyncIterator[bytes]:
+        """
+        Decrypts data arriving as pieces of any size, yielding the plaintext segments in order as
+        soon as they are authenticated. A stream cut short fails on its final segment.
+
+        Args:
+            source (AsyncIterable[bytes] | Iterable[bytes]): The encrypted data, as consecutive pieces.
+            window (int, optional): Number of segments decrypted concurrently. Defaults to the CPU count.
+        """
+        return _stream_segments(
+            self._decrypt_segment,
+            read_chunks(source, self.segment_size + SEGMENT_TAG_SIZE),
+            window or os.cpu_count(),
+        )
+
+
+def is_segmented(aes_info: dict) -> bool:
+    """Returns whether AES parameters describe data in the segmented format."""
+    return aes_info.get("version") == SEGMENTED_FORMAT_VERSION
+
+
+def decrypt_with_aes_info(encrypted_data: bytes, aes_info: dict) -> bytes:
+    """
+    Decrypts data with its deserialized AES parameters, in either the segmented or the legacy
+    single shot format.
+    """
+    if is_segmented(aes_info):
+        return SegmentedDecryptor(aes_info).decrypt(encrypted_data)
+
+    aes_key = bytes.fromhex(aes_info["aes_key"])
+    nonce = bytes.fromhex(aes_info["nonce"])
+    tag = bytes.fromhex(aes_info["tag"])
+
+    # Decrypt data
+    cipher = AES.new(aes_key, AES.MODE_GCM, nonce=nonce)
+    return cipher.decrypt_and_verify(encrypted_data, tag)
 
 
 encrypt_data = encrypt_data_with_aes_and_serialize
@@ -238,22 +578,21 @@ def decrypt_data_and_deserialize(
     encrypted_data: bytes, encryption_payload: bytes, wallet: bt.wallet
 ) -> bytes:
     """
-    Decrypts and deserializes the encrypted payload to extract the AES key, nonce, and tag, which are then used to
+    Decrypts and deserializes the encrypted payload to extract the AES parameters, which are then used to
     decrypt the given encrypted data.
 
     Args:
         encrypted_data (bytes): AES encrypted data.
-        encryption_payload (bytes): Encrypted payload containing the AES key, nonce, and tag.
+        encryption_payload (bytes): Encrypted payload containing the AES key and parameters.
         wallet (bt.wallet): Bittensor wallet object containing the coldkey.
 
     Returns:
         bytes: Decrypted data.
 
-    This function reverses the process performed by `encrypt_data_with_aes_and_serialize`.
-    It first decrypts the payload to extract the AES key, nonce, and tag, and then uses them to decrypt the data.
+    This function reverses the process performed by `encrypt_data_with_aes_and_serialize`, and also
+    decrypts data in the legacy single shot format.
     """
-
-    # Deserialize the encrypted payload to get the AES key, nonce, and tag in nacl.utils.EncryptedMessage format
+    # Deserialize the encrypted payload to get the AES parameters in nacl.utils.EncryptedMessage format
     encrypted_msg: EncryptedMessage = deserialize_nacl_encrypted_message(
         encryption_payload
     )
@@ -261,41 +600,23 @@ def decrypt_data_and_deserialize(
     # Decrypt the payload to get the JSON string
     decrypted_aes_info_str = decrypt_data_with_wallet(encrypted_msg, wallet)
 
-    # Deserialize JSON string to get AES key, nonce, and tag
-    aes_info = json.loads(decrypted_aes_info_str)
-    aes_key = bytes.fromhex(aes_info["aes_key"])
-    nonce = bytes.fromhex(aes_info["nonce"])
-    tag = bytes.fromhex(aes_info["tag"])
-
-    # Decrypt data
-    cipher = AES.new(aes_key, AES.MODE_GCM, nonce=nonce)
-    decrypted_data = cipher.decrypt_and_verify(encrypted_data, tag)
-
-    return decrypted_data
+    return decrypt_with_aes_info(encrypted_data, json.loads(decrypted_aes_info_str))
 
 
-def decrypt_data_and_deserialize_with_coldkey_private_key(
-    encrypted_data: bytes,
-    encryption_payload: bytes,
-    private_key: typing.Union[str, bytes],
-) -> bytes:
+def deserialize_aes_info(
+    encryption_payload: bytes, private_key: typing.Union[str, bytes]
+) -> dict:
     """
-    Decrypts and deserializes the encrypted payload to extract the AES key, nonce, and tag, which are then used to
-    decrypt the given encrypted data.
+    Decrypts and deserializes the AES parameters of encrypted data from its encryption payload.
 
     Args:
-        encrypted_data (bytes): AES encrypted data.
-        encryption_payload (bytes): Encrypted payload containing the AES key, nonce, and tag.
+        encryption_payload (bytes): Encrypted payload containing the AES key and parameters.
         private_key (bytes): The bittensor wallet private key (password) to decrypt the AES payload.
 
     Returns:
-        bytes: Decrypted data.
-
-    This function reverses the process performed by `encrypt_data_with_aes_and_serialize`.
-    It first decrypts the payload to extract the AES key, nonce, and tag, and then uses them to decrypt the data.
+        dict: The AES key and parameters, hex encoded.
     """
-
-    # Deserialize the encrypted payload to get the AES key, nonce, and tag in nacl.utils.EncryptedMessage format
+    # Deserialize the encrypted payload to get the AES parameters in nacl.utils.EncryptedMessage format
     encrypted_msg: EncryptedMessage = deserialize_nacl_encrypted_message(
         encryption_payload
     )
@@ -304,18 +625,31 @@ def decrypt_data_and_deserialize_with_coldkey_private_key(
     decrypted_aes_info_str = decrypt_data_with_coldkey_private_key(
         encrypted_msg, private_key
     )
+    return json.loads(decrypted_aes_info_str)
 
-    # Deserialize JSON string to get AES key, nonce, and tag
-    aes_info = json.loads(decrypted_aes_info_str)
-    aes_key = bytes.fromhex(aes_info["aes_key"])
-    nonce = bytes.fromhex(aes_info["nonce"])
-    tag = bytes.fromhex(aes_info["tag"])
 
-    # Decrypt data
-    cipher = AES.new(aes_key, AES.MODE_GCM, nonce=nonce)
-    decrypted_data = cipher.decrypt_and_verify(encrypted_data, tag)
+def decrypt_data_and_deserialize_with_coldkey_private_key(
+    encrypted_data: bytes,
+    encryption_payload: bytes,
+    private_key: typing.Union[str, bytes],
+) -> bytes:
+    """
+    Decrypts and deserializes the encrypted payload to extract the AES parameters, which are then used to
+    decrypt the given encrypted data.
 
-    return decrypted_data
+    Args:
+        encrypted_data (bytes): AES encrypted data.
+        encryption_payload (bytes): Encrypted payload containing the AES key and parameters.
+        private_key (bytes): The bittensor wallet private key (password) to decrypt the AES payload.
+
+    Returns:
+        bytes: Decrypted data.
+
+    This function reverses the process performed by `encrypt_data_with_aes_and_serialize`, and also
+    decrypts data in the legacy single shot format.
+    """
+    aes_info = deserialize_aes_info(encryption_payload, private_key)
+    return decrypt_with_aes_info(encrypted_data, aes_info)
 
 
 decrypt_data = decrypt_data_and_deserialize
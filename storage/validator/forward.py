@@ -32,10 +32,11 @@ from storage.validator.database import (
     get_all_chunk_hashes,
     get_miner_statistics,
     purge_expired_ttl_keys,
+    count_expired_ttl_keys,
     purge_challenges_for_all_hotkeys,
 )
 from storage.validator.state import save_state
-from storage.validator.utils import get_current_epoch
+from storage.validator.utils import current_block, get_current_epoch
 
 from .challenge import challenge_data
 from .retrieve import retrieve_data
@@ -101,12 +102,16 @@ async def forward(self):
             self.last_purged_epoch = current_epoch
             save_state(self)
 
-    # Purge expired TTL keys
-    if self.step % 60 == 0:
-        bt.logging.info("initiating TTL purge for expired keys")
-        await purge_expired_ttl_keys(self.database)
+    # Purge a bounded batch of expired TTL keys every step
+    purged = await purge_expired_ttl_keys(
+        self.database, limit=self.config.neuron.ttl_purge_batch_size
+    )
+    if purged > 0:
+        bt.logging.info(
+            f"Purged {purged} expired keys | {await count_expired_ttl_keys(self.database)} remaining"
+        )
 
-    if self.subtensor.get_current_block() % 1080 == 0 and self.step > 0:
+    if current_block(self) % 1080 == 0 and self.step > 0:
         bt.logging.info("initiating compute stats")
         await compute_all_tiers(self.database)
 
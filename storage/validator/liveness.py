@@ -0,0 +1,110 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+# Copyright © 2023 philanthrope
+# Copyright © 2024 Synapse Labs Corp.
+
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import time
+import numpy as np
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+@dataclass
+class Liveness:
+    last_seen: Optional[float] = None  # monotonic time of the last successful response
+    last_failed: Optional[float] = None  # monotonic time of the last failed request
+    rtt: Optional[float] = None  # round trip time of the last successful response
+    failures: int = 0  # consecutive failed requests
+
+
+class LivenessTable:
+    """
+    Shared record of which miners answered recently, fed by every dendrite query
+    (including the pings sent by `monitor`), so that placement code only needs to
+    ping the miners it has no recent evidence about.
+
+    Entries are keyed by hotkey, so a uid that is re-registered starts out unknown.
+    """
+
+    def __init__(self, ttl: float = 120.0, failure_ttl: float = 60.0):
+        """
+        Args:
+            ttl (float): How long a successful response vouches for a miner (seconds).
+            failure_ttl (float): How long a failed request rules a miner out (seconds).
+        """
+        self.ttl = ttl
+        self.failure_ttl = failure_ttl
+        self.entries: Dict[str, Liveness] = {}
+
+    def record(self, hotkey: str, success: bool, rtt: Optional[float] = None):
+        """Records the outcome of a request to the miner with the given hotkey."""
+        entry = self.entries.setdefault(hotkey, Liveness())
+        now = time.monotonic()
+        if success:
+            entry.last_seen = now
+            entry.rtt = rtt
+            entry.failures = 0
+        else:
+            entry.last_failed = now
+            entry.failures += 1
+
+    def status(self, hotkey: str) -> Optional[bool]:
+        """
+        Returns True if the miner answered within `ttl` and has not failed since, False if
+        its latest request failed within `failure_ttl`, and None if it needs to be pinged.
+        """
+        entry = self.entries.get(hotkey)
+        if entry is None:
+            return None
+        now = time.monotonic()
+        if entry.failures > 0:
+            if now - entry.last_failed <= self.failure_ttl:
+                return False
+            return None
+        if entry.last_seen is not None and now - entry.last_seen <= self.ttl:
+            return True
+        return None
+
+    def rtt(self, hotkey: str) -> Optional[float]:
+        """Returns the round trip time of the miner's last successful response."""
+        entry = self.entries.get(hotkey)
+        return entry.rtt if entry is not None else None
+
+
+class LatencyTracker:
+    """Rolling window of request latencies, used to derive hedging thresholds."""
+
+    def __init__(self, window: int = 256, min_samples: int = 10):
+        """
+        Args:
+            window (int): Number of most recent latencies kept.
+            min_samples (int): Number of latencies needed before percentiles are trusted.
+        """
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def observe(self, latency: float):
+        """Records the latency of a request (seconds)."""
+        self.samples.append(latency)
+
+    def percentile(self, percentile: float, default: float) -> float:
+        """Returns the given percentile of the recorded latencies, or `default` without enough samples."""
+        if len(self.samples) < self.min_samples:
+            return default
+        return float(np.percentile(self.samples, percentile))
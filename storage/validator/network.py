@@ -23,15 +23,38 @@ import typing
 import bittensor as bt
 
 from storage.validator.utils import get_available_query_miners
-from storage.validator.bonding import update_statistics
+from storage.validator.bonding import update_statistics_batch
 from storage.constants import MONITOR_FAILURE_REWARD
 
 
-async def ping_uids(self, uids):
+async def ping_uids(self, uids, use_liveness: bool = True):
     """
     Ping a list of UIDs to check their availability.
     Returns a tuple with a list of successful UIDs and a list of failed UIDs.
+
+    UIDs whose miners answered or failed a request recently (see `LivenessTable`) are
+    resolved from the neuron's liveness table without being pinged again, unless
+    `use_liveness` is False.
     """
+    liveness = getattr(self, "liveness", None)
+    known_successful_uids, known_failed_uids = [], []
+    if liveness is not None and use_liveness:
+        stale_uids = []
+        for uid in uids:
+            status = liveness.status(self.metagraph.hotkeys[uid])
+            if status is None:
+                stale_uids.append(uid)
+            elif status:
+                known_successful_uids.append(uid)
+            else:
+                known_failed_uids.append(uid)
+        bt.logging.trace(
+            f"ping() live uids {known_successful_uids} | down uids {known_failed_uids} | pinging {stale_uids}"
+        )
+        uids = stale_uids
+        if not uids:
+            return known_successful_uids, known_failed_uids
+
     axons = [self.metagraph.axons[uid] for uid in uids]
     try:
         responses = await self.dendrite(
@@ -56,6 +79,8 @@ async def ping_uids(self, uids):
         failed_uids = uids
     bt.logging.debug("ping() successful uids:", successful_uids)
     bt.logging.debug("ping() failed uids    :", failed_uids)
+    successful_uids = known_successful_uids + successful_uids
+    failed_uids = known_failed_uids + list(failed_uids)
     return successful_uids, failed_uids
 
 
@@ -191,7 +216,8 @@ async def monitor(self):
     # Ping current subset of UIDs
     query_uids = await get_available_query_miners(self, k=40)
     bt.logging.debug(f"monitor() uids: {query_uids}")
-    _, failed_uids = await ping_uids(self, query_uids)
+    # Always ping, this is what keeps the liveness table fresh
+    _, failed_uids = await ping_uids(self, query_uids, use_liveness=False)
     bt.logging.debug(f"monitor() failed uids: {failed_uids}")
 
     down_uids = []
@@ -209,13 +235,13 @@ async def monitor(self):
         # Negatively reward
         rewards = torch.zeros(len(down_uids), dtype=torch.float32).to(self.device)
 
+        await update_statistics_batch(
+            ss58_addresses=[self.metagraph.hotkeys[uid] for uid in down_uids],
+            successes=[False] * len(down_uids),
+            task_type="monitor",
+            database=self.database,
+        )
         for i, uid in enumerate(down_uids):
-            await update_statistics(
-                ss58_address=self.metagraph.hotkeys[uid],
-                success=False,
-                task_type="monitor",
-                database=self.database,
-            )
             rewards[i] = MONITOR_FAILURE_REWARD
 
         bt.logging.debug(f"monitor() rewards: {rewards}")
@@ -28,6 +28,7 @@ from storage.validator.database import (
     retrieve_encryption_payload,
     remove_hotkey_from_chunk,
     purge_challenges_for_hotkey,
+    get_all_full_hashes,
 )
 from storage.validator.bonding import register_miner
 
@@ -76,9 +77,7 @@ async def rebalance_data_for_hotkey(
         # Update index for full and chunk hashes for retrieve
         # Iterate through ordered metadata for all full hashses this miner had
         bt.logging.debug(f"Removing all challenge metadata for hotkey {source_hotkey}")
-        async for file_key in self.database.scan_iter("file:*"):
-            file_key = file_key.decode("utf-8")
-            file_hash = file_key.split(":")[1]
+        for file_hash in await get_all_full_hashes(self.database):
             # Get all ordered metadata for this file
             ordered_metadata = await get_ordered_metadata(file_hash, self.database)
             bt.logging.debug(
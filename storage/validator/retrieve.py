@@ -18,23 +18,24 @@
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 
-import sys
 import time
 import torch
-import base64
+import binascii
 import typing
 import asyncio
 import bittensor as bt
 
 from pprint import pformat
+from collections import deque
 from Crypto.Random import get_random_bytes, random
 
 from storage import protocol
 from storage.constants import RETRIEVAL_FAILURE_REWARD
 from storage.shared.ecc import hash_data
+from storage.shared.transport import get_payload, payload_size
 from storage.validator.event import EventSchema
 from storage.validator.verify import verify_retrieve_with_seed
-from storage.validator.reward import apply_reward_scores
+from storage.validator.reward import apply_reward_scores, run_verification
 from storage.validator.database import (
     get_metadata_for_hotkey,
     get_metadata_for_hotkey_and_hash,
@@ -42,12 +43,23 @@ from storage.validator.database import (
     get_ordered_metadata,
     retrieve_encryption_payload,
 )
-from storage.validator.bonding import update_statistics, get_tier_factor
+from storage.validator.bonding import update_statistics_batch
+from storage.validator.utils import current_block
 
 from storage.validator.network import ping_uids, ping_and_retry_uids
 from storage.validator.reward import create_reward_vector
 
 
+# Keeps references to fire-and-forget tasks until they finish
+_background_tasks = set()
+
+
+def _discard_background_task(task: asyncio.Task):
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        bt.logging.error(f"Background task failed: {task.exception()}")
+
+
 async def handle_retrieve(self, uid):
     bt.logging.trace(f"handle_retrieve uid: {uid}")
     hotkey = self.metagraph.hotkeys[uid]
@@ -123,7 +135,7 @@ async def retrieve_data(
         completion_times=[],
         task_status_messages=[],
         task_status_codes=[],
-        block=self.subtensor.get_current_block(),
+        block=current_block(self),
         uids=[],
         step_length=0.0,
         best_uid=-1,
@@ -180,6 +192,8 @@ async def retrieve_data(
 
     decoded_data = b""
     data_sizes = []
+    retrieved_idxs = []
+    successes = []
     for idx, (uid, (response, data_hash, seed)) in enumerate(
         zip(uids, response_tuples)
     ):
@@ -190,40 +204,23 @@ async def retrieve_data(
             continue  # We don't have any data for this hotkey, skip it.
 
         # Collect data sizes from responses
-        data_sizes.append(sys.getsizeof(response.data))
+        data_sizes.append(payload_size(response))
+        retrieved_idxs.append(idx)
 
-        # Get the tier factor for this miner to determine the total reward
-        tier_factor = await get_tier_factor(hotkey, self.database, in_top_2=in_top_2_dict.get(uid, False))
         try:
-            decoded_data = base64.b64decode(response.data)
+            decoded_data = get_payload(response)
         except Exception as e:
             bt.logging.error(
                 f"retrieve() Failed to decode data from UID: {uids[idx]} with error {e}"
             )
-            rewards[idx] = RETRIEVAL_FAILURE_REWARD * tier_factor
-
-            # Update the retrieve statistics
-            await update_statistics(
-                ss58_address=hotkey,
-                success=False,
-                task_type="retrieve",
-                database=self.database,
-            )
+            successes.append(None)
             continue
 
         if str(hash_data(decoded_data)) != data_hash:
             bt.logging.error(
                 f"retrieve() Hash of received data does not match expected hash! {str(hash_data(decoded_data))} != {data_hash}"
             )
-            rewards[idx] = RETRIEVAL_FAILURE_REWARD * tier_factor
-
-            # Update the retrieve statistics
-            await update_statistics(
-                ss58_address=hotkey,
-                success=False,
-                task_type="retrieve",
-                database=self.database,
-            )
+            successes.append(None)
             continue
 
         success = verify_retrieve_with_seed(response, seed)
@@ -231,23 +228,33 @@ async def retrieve_data(
             bt.logging.error(
                 f"data verification failed! {pformat(response.axon.dict())}"
             )
-            rewards[idx] = (
-                RETRIEVAL_FAILURE_REWARD * tier_factor
-            )  # Losing use data is unacceptable, harsh punishment
+        bt.logging.trace(
+            f"retrieve() Updating retreival success=={success} for hotkey {hotkey}"
+        )
+        successes.append(success)
+
+    # Update the retrieve statistics of the whole round and fetch the tier factors
+    tier_factors = await update_statistics_batch(
+        ss58_addresses=[self.metagraph.hotkeys[uids[idx]] for idx in retrieved_idxs],
+        successes=[bool(success) for success in successes],
+        task_type="retrieve",
+        database=self.database,
+        in_top_2=[in_top_2_dict.get(uids[idx], False) for idx in retrieved_idxs],
+    )
+
+    for idx, success, tier_factor in zip(retrieved_idxs, successes, tier_factors):
+        uid = uids[idx]
+        response = response_tuples[idx][0]
+
+        if not success:
+            # Losing use data is unacceptable, harsh punishment
+            rewards[idx] = RETRIEVAL_FAILURE_REWARD * tier_factor
         else:
             # Success. Reward based on miner tier
-            bt.logging.trace("Getting tier factor for hotkey {}".format(hotkey))
             rewards[idx] = 1.0 * tier_factor
 
-        bt.logging.trace(
-            f"retrieve() Updating retreival success=={success} for hotkey {hotkey}"
-        )
-        await update_statistics(
-            ss58_address=hotkey,
-            success=success,
-            task_type="retrieve",
-            database=self.database,
-        )
+        if success is None:
+            continue  # The data could not be decoded or did not match its hash
 
         event.uids.append(uid)
         event.successful.append(success)
@@ -275,161 +282,278 @@ async def retrieve_data(
 
 
 # TODO: apply ping before retries to ensure that the miner is online and not wait around for a timeout
-async def retrieve_broadband(self, full_hash: str):
+def verify_chunk(response, seed: str, chunk_hash: str) -> typing.Optional[bytes]:
     """
-    Asynchronously retrieves and verifies data from the network based on a given hash, ensuring
-    the integrity and correctness of the data. This method orchestrates the retrieval process across
-    multiple miners, reconstructs the data from chunks, and verifies its integrity.
-
-    Parameters:
-        full_hash (str): The hash of the data to be retrieved, representing its unique identifier on the network.
+    Checks a Retrieve response against the request seed and the expected chunk hash.
 
     Returns:
-        tuple: A tuple containing the reconstructed data and its associated encryption payload.
+        bytes: The decoded chunk if the response is valid, otherwise None.
+    """
+    if response.dendrite.status_code != 200:
+        bt.logging.debug(f"failed response: {response.axon.dict()}")
+        return None
+    try:
+        data = get_payload(response)
+    except (binascii.Error, ValueError):
+        bt.logging.error(f"Undecodable chunk from hotkey: {response.axon.hotkey}")
+        return None
+    if data is None or not verify_retrieve_with_seed(response, seed):
+        bt.logging.error(
+            f"Failed to verify retrieve commitment from hotkey: {response.axon.hotkey}"
+        )
+        return None
+    if str(hash_data(data)) != str(chunk_hash):
+        bt.logging.error(f"Chunk hash mismatch from hotkey: {response.axon.hotkey}")
+        return None
+    return data
 
-    Raises:
-        Exception: If no metadata is found for the given hash or if there are issues during the retrieval process.
 
-    Note:
-        - This function is a critical component of data retrieval in a distributed storage system.
-        - It handles concurrent requests to multiple miners and assembles the data chunks based on
-        ordered metadata.
-        - In case of discrepancies in data size, the function logs a warning for potential data integrity issues.
+async def reward_chunk_group(self, synapse, chunk_size, queried, pending):
     """
-    semaphore = asyncio.Semaphore(self.config.neuron.semaphore_size)
-
-    async def retrieve_chunk_group(chunk_hash, chunk_size, uids):
-        event = EventSchema(
-            task_name="Store",
-            successful=[],
-            completion_times=[],
-            task_status_messages=[],
-            task_status_codes=[],
-            block=self.subtensor.get_current_block(),
-            uids=[],
-            step_length=0.0,
-            best_uid="",
-            best_hotkey="",
-            rewards=[],
-            moving_averaged_scores=[],
-        )
+    Scores the miners that answered a chunk retrieval, once the cancelled requests have settled.
+    Cancelled requests have no response to score, only completed ones are rewarded.
+    """
+    await asyncio.gather(*pending, return_exceptions=True)
+    if queried == []:
+        return
+
+    event = EventSchema(
+        task_name="Store",
+        successful=[],
+        completion_times=[],
+        task_status_messages=[],
+        task_status_codes=[],
+        block=current_block(self),
+        uids=[],
+        step_length=0.0,
+        best_uid="",
+        best_hotkey="",
+        rewards=[],
+        moving_averaged_scores=[],
+    )
+    uids, responses = map(list, zip(*queried))
+
+    # Compute the rewards for the responses given proc time.
+    rewards: torch.FloatTensor = torch.zeros(
+        len(responses), dtype=torch.float32
+    ).to(self.device)
+
+    async def success(hotkey, idx, uid, response):
+        bt.logging.debug(f"Stored data in database with key: {hotkey}")
+
+    failed_uids = []
+
+    def failure(uid):
+        failed_uids.append(uid)
+
+    await create_reward_vector(
+        self, synapse, rewards, uids, responses, event, success, failure
+    )
+    event.rewards.extend(rewards.tolist())
+    bt.logging.debug(f"Updated reward scores: {rewards.tolist()}")
+
+    apply_reward_scores(
+        self,
+        uids=uids,
+        responses=responses,
+        rewards=rewards,
+        data_sizes=[chunk_size * len(responses)],
+    )
+
+    # Determine the best UID based on rewards
+    if event.rewards:
+        best_index = max(range(len(event.rewards)), key=event.rewards.__getitem__)
+        event.best_uid = event.uids[best_index]
+        event.best_hotkey = self.metagraph.hotkeys[event.best_uid]
+
+
+async def retrieve_chunk_group(
+    self, chunk_hash: str, chunk_size: int, uids: typing.List[int]
+) -> typing.Optional[bytes]:
+    """
+    Hedged retrieval of a single chunk: the replica holder with the lowest known round trip
+    time is queried first, and the next one only once the request has taken longer than
+    the configured percentile of recent retrievals (or failed). The first response that
+    passes verification and the hash check wins, outstanding requests are cancelled.
+
+    Returns:
+        bytes: The verified chunk, or None if no replica holder returned it.
+    """
+    latency = getattr(self, "retrieve_latency", None)
+    liveness = getattr(self, "liveness", None)
 
-        synapse = protocol.Retrieve(
-            data_hash=chunk_hash,
-            seed=get_random_bytes(32).hex(),
+    synapse = protocol.Retrieve(
+        data_hash=chunk_hash,
+        seed=get_random_bytes(32).hex(),
+    )
+
+    hedge_delay = (
+        latency.percentile(
+            self.config.neuron.retrieve_hedge_percentile,
+            default=self.config.neuron.retrieve_hedge_delay,
         )
+        if latency is not None
+        else self.config.neuron.retrieve_hedge_delay
+    )
+
+    def known_rtt(uid):
+        rtt = liveness.rtt(self.metagraph.hotkeys[uid])
+        return (rtt is None, rtt or 0.0)
+
+    candidates = sorted(uids, key=known_rtt) if liveness is not None else list(uids)
 
-        axons = [self.metagraph.axons[uid] for uid in uids]
+    async def query(uid):
+        start = time.time()
         responses = await self.dendrite(
-            axons,
+            [self.metagraph.axons[uid]],
             synapse,
             deserialize=False,
             timeout=100,
         )
+        response = responses[0]
+        data = await run_verification(
+            self, verify_chunk, response, synapse.seed, chunk_hash
+        )
+        return uid, response, data, time.time() - start
 
-        # Compute the rewards for the responses given proc time.
-        rewards: torch.FloatTensor = torch.zeros(
-            len(responses), dtype=torch.float32
-        ).to(self.device)
+    chunk = None
+    queried = []
+    pending = set()
+    finished = False
+    try:
+        while chunk is None and (candidates or pending):
+            # Query the next replica holder when the previous one failed or is slower than usual
+            if candidates:
+                pending.add(asyncio.create_task(query(candidates.pop(0))))
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=hedge_delay if candidates else None,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            for task in done:
+                uid, response, data, elapsed = task.result()
+                queried.append((uid, response))
+                if data is not None and chunk is None:
+                    chunk = data
+                    if latency is not None:
+                        latency.observe(elapsed)
+        finished = True
+    finally:
+        # `asyncio.wait` does not cancel the requests it waits on
+        for task in pending:
+            task.cancel()
+        if not finished:
+            # This retrieval was cancelled or failed, no request may outlive it
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    # Scoring must not hold up the download
+    rewarding = asyncio.create_task(
+        reward_chunk_group(self, synapse, chunk_size, queried, pending)
+    )
+    _background_tasks.add(rewarding)
+    rewarding.add_done_callback(_discard_background_task)
 
-        async def success(hotkey, idx, uid, response):
-            bt.logging.debug(f"Stored data in database with key: {hotkey}")
+    return chunk
 
-        failed_uids = []
 
-        def failure(uid):
-            failed_uids.append(uid)
+async def retrieve_broadband_stream(
+    self, full_hash: str, window: int = None
+) -> typing.AsyncIterator[bytes]:
+    """
+    Retrieves the chunks of the data stored under a given hash and yields them in order, each
+    one as soon as it and all the chunks before it are verified.
 
-        await create_reward_vector(
-            self, synapse, rewards, uids, responses, event, success, failure
-        )
-        event.rewards.extend(rewards.tolist())
-        bt.logging.debug(f"Updated reward scores: {rewards.tolist()}")
-
-        apply_reward_scores(
-            self,
-            uids=uids,
-            responses=responses,
-            rewards=rewards,
-            data_sizes=[chunk_size * len(responses)],
-        )
+    Parameters:
+        full_hash (str): The hash of the data to be retrieved, representing its unique identifier on the network.
+        window (int, optional): Maximum number of chunks being retrieved or waiting to be yielded at
+            once, which bounds memory use. Defaults to the `neuron.retrieve_window` config.
 
-        # Determine the best UID based on rewards
-        if event.rewards:
-            best_index = max(range(len(event.rewards)), key=event.rewards.__getitem__)
-            event.best_uid = event.uids[best_index]
-            event.best_hotkey = self.metagraph.hotkeys[event.best_uid]
+    Yields:
+        bytes: The verified chunks, in order.
 
-        return responses, synapse.seed
+    Raises:
+        ValueError: If no metadata is found for the given hash or a chunk could not be retrieved.
+    """
+    window = window or self.config.neuron.retrieve_window
 
     # Get the chunks you need to reconstruct IN order
     ordered_metadata = await get_ordered_metadata(full_hash, self.database)
-    bt.logging.debug(f"ordered metadata: {ordered_metadata}")
+    bt.logging.debug(f"ordered metadata: {pformat(ordered_metadata)}")
     if ordered_metadata == [] or ordered_metadata is None:
         bt.logging.error(f"No metadata found for full hash: {full_hash}")
         raise ValueError(f"No metadata found for full hash: {full_hash}")
 
-    # Get the hotkeys/uids to query
-    tasks = []
-    total_size = 0
-    bt.logging.debug(f"ordered metadata: {pformat(ordered_metadata)}")
     # TODO: change this to use retrieve_mutually_exclusive_hotkeys_full_hash
     # to avoid possibly double querying miners for greater retrieval efficiency
+    async def retrieve_chunk(chunk_metadata):
+        bt.logging.debug(f"chunk metadata: {chunk_metadata}")
+
+        # Ensure still registered before trying to retrieve
+        uids = [
+            self.metagraph.hotkeys.index(hotkey)
+            for hotkey in chunk_metadata["hotkeys"]
+            if hotkey in self.metagraph.hotkeys
+        ]
+
+        # Don't waste time waiting on UIDs that are nonresponsive anyway
+        uids, _ = await ping_uids(self, uids=uids)
+        return await retrieve_chunk_group(
+            self, chunk_metadata["chunk_hash"], chunk_metadata["size"], uids
+        )
+
+    # Chunks in flight or retrieved out of order, oldest first
+    reorder_buffer = deque()
 
-    async with semaphore:
-        for chunk_metadata in ordered_metadata:
-            bt.logging.debug(f"chunk metadata: {chunk_metadata}")
-
-            # Ensure still registered before trying to retrieve
-            uids = [
-                self.metagraph.hotkeys.index(hotkey)
-                for hotkey in chunk_metadata["hotkeys"]
-                if hotkey in self.metagraph.hotkeys
-            ]
-
-            # Don't waste time waiting on UIDs that are nonresponsive anyway
-            uids, _ = await ping_uids(self, uids=uids)
-            total_size += chunk_metadata["size"]
-            tasks.append(
-                asyncio.create_task(
-                    retrieve_chunk_group(
-                        chunk_metadata["chunk_hash"], chunk_metadata["size"], uids
-                    )
-                )
+    async def next_chunk():
+        i, task = reorder_buffer.popleft()
+        chunk = await task
+        if chunk is None:
+            chunk_hash = ordered_metadata[i]["chunk_hash"]
+            bt.logging.error(f"No verified response for chunk {i}: {chunk_hash}")
+            raise ValueError(f"Failed to retrieve chunk {i} of {full_hash}")
+        bt.logging.debug(f"Yielding chunk {i}, size: {len(chunk)}")
+        return chunk
+
+    try:
+        for i, chunk_metadata in enumerate(ordered_metadata):
+            if len(reorder_buffer) >= window:
+                yield await next_chunk()
+            reorder_buffer.append(
+                (i, asyncio.create_task(retrieve_chunk(chunk_metadata)))
             )
-        responses = await asyncio.gather(*tasks)
-
-        chunks = {}
-        # TODO: make these asyncio tasks and use .to_thread() to avoid blocking
-        for i, (response_group, seed) in enumerate(responses):
-            for response in response_group:
-                if response.dendrite.status_code != 200:
-                    bt.logging.debug(f"failed response: {response.axon.dict()}")
-                    continue
-                verified = verify_retrieve_with_seed(response, seed)
-                if verified:
-                    # Add to final chunks dict
-                    if i not in list(chunks.keys()):
-                        bt.logging.debug(
-                            f"Adding chunk {i} to chunks, size: {sys.getsizeof(response.data)}"
-                        )
-                        chunks[i] = base64.b64decode(response.data)
-                        bt.logging.debug(f"chunk {i} | {chunks[i][:10]}")
-                else:
-                    uid = self.metagraph.hotkeys.index(response.axon.hotkey)
-                    bt.logging.error(
-                        f"Failed to verify store commitment from UID: {uid}"
-                    )
-
-    bt.logging.trace(f"chunks after: {[chunk[:12] for chunk in chunks.values()]}")
-    bt.logging.trace(f"len(chunks) after: {[len(chunk) for chunk in chunks.values()]}")
-
-    # Reconstruct the data
-    encrypted_data = b"".join(chunks.values())
+        while reorder_buffer:
+            yield await next_chunk()
+    finally:
+        # The consumer stopped early or a chunk is missing
+        for _, task in reorder_buffer:
+            task.cancel()
+        await asyncio.gather(
+            *(task for _, task in reorder_buffer), return_exceptions=True
+        )
+
+
+async def retrieve_broadband(self, full_hash: str):
+    """
+    Asynchronously retrieves and verifies data from the network based on a given hash, ensuring
+    the integrity and correctness of the data. Prefer `retrieve_broadband_stream` when the data
+    does not need to be held in memory at once.
+
+    Parameters:
+        full_hash (str): The hash of the data to be retrieved, representing its unique identifier on the network.
+
+    Returns:
+        tuple: A tuple containing the reconstructed data and its associated encryption payload.
+
+    Raises:
+        ValueError: If no metadata is found for the given hash or a chunk could not be retrieved.
+    """
+    encrypted_data = bytearray()
+    async for chunk in retrieve_broadband_stream(self, full_hash):
+        encrypted_data += chunk
     bt.logging.trace(f"retrieved data: {encrypted_data[:12]}")
 
     # Retrieve user encryption payload (if exists)
     encryption_payload = await retrieve_encryption_payload(full_hash, self.database)
     bt.logging.debug(f"retrieved encryption_payload: {encryption_payload}")
 
-    return encrypted_data, encryption_payload
+    return bytes(encrypted_data), encryption_payload
@@ -20,7 +20,9 @@
 
 
 import torch
+import asyncio
 import numpy as np
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 import bittensor as bt
 from bittensor import Synapse
 from typing import Union, List
@@ -28,11 +30,11 @@ from functools import partial
 from pprint import pformat
 
 from storage.validator.verify import (
-    verify_store_with_seed,
+    verify_store_with_seed_batch,
     verify_challenge_with_seed,
     verify_retrieve_with_seed,
 )
-from storage.validator.bonding import update_statistics, get_tier_factor
+from storage.validator.bonding import update_statistics_batch
 from storage.validator.event import EventSchema
 
 from storage.constants import (
@@ -41,6 +43,7 @@ from storage.constants import (
     CHALLENGE_FAILURE_REWARD,
 )
 from storage.protocol import Store, Retrieve, Challenge
+from storage.shared.transport import get_payload
 
 
 def adjusted_sigmoid(x, steepness=1, shift=0):
@@ -256,6 +259,38 @@ def apply_reward_scores(
     bt.logging.trace(f"Updated moving avg scores: {self.moving_averaged_scores}")
 
 
+def verify_executor_from_config(config) -> Executor:
+    """
+    Creates the worker pool that verifies miner responses off the event loop.
+
+    Threads keep the event loop responsive while a response is verified, processes
+    also verify several responses in parallel (the EC and Merkle checks hold the GIL)
+    at the cost of pickling each response.
+
+    Args:
+    - config (bt.config): The validator config, see --neuron.verify_pool and --neuron.verify_workers.
+
+    Returns:
+    - Executor: The thread or process pool executor.
+    """
+    if config.neuron.verify_pool == "process":
+        return ProcessPoolExecutor(max_workers=config.neuron.verify_workers)
+    return ThreadPoolExecutor(
+        max_workers=config.neuron.verify_workers, thread_name_prefix="verify"
+    )
+
+
+async def run_verification(self, verify_fn: callable, *args, **kwargs):
+    """
+    Runs a verification function on the validator's verification pool, or on the event
+    loop's default thread pool if the neuron has none (e.g. the API).
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        getattr(self, "verify_executor", None), partial(verify_fn, *args, **kwargs)
+    )
+
+
 async def create_reward_vector(
     self,
     synapse: Union[Store, Retrieve, Challenge],
@@ -268,10 +303,12 @@ async def create_reward_vector(
 ):
     # Determine if the commitment is valid
     success = False
+    batch_verify_fn = None
     if isinstance(synapse, Store):
-        verify_fn = partial(
-            verify_store_with_seed,
-            b64_encrypted_data=synapse.encrypted_data,
+        # All store responses answer the same request, verify them in one batch
+        batch_verify_fn = partial(
+            verify_store_with_seed_batch,
+            encrypted_data=get_payload(synapse),
             seed=synapse.seed,
         )
         task_type = "store"
@@ -301,12 +338,21 @@ async def create_reward_vector(
     }
     bt.logging.debug(f"Is Top 2 Dict: {pformat(in_top_2_dict)}")
 
+    # Verify every response of the round concurrently on the verification pool
+    if batch_verify_fn is not None:
+        verifications = await run_verification(self, batch_verify_fn, responses)
+    else:
+        verifications = await asyncio.gather(
+            *[run_verification(self, verify_fn, synapse=response) for response in responses]
+        )
+
+    successes = []
     for idx, (uid, response) in enumerate(zip(uids, responses)):
         # Verify the commitment
         hotkey = self.metagraph.hotkeys[uid]
 
         # Determine if the commitment is valid
-        success = verify_fn(synapse=response)
+        success = verifications[idx]
         if success:
             bt.logging.debug(
                 f"Successfully verified {synapse.__class__} commitment from UID: {uid} | hotkey: {hotkey}"
@@ -317,19 +363,21 @@ async def create_reward_vector(
                 f"Failed to verify {synapse.__class__} commitment from UID: {uid} | hotkey: {hotkey}"
             )
             fail_callback(uid)
+        successes.append(success)
+
+    # Update the storage statistics of the whole round and fetch the tier factors
+    tier_factors = await update_statistics_batch(
+        ss58_addresses=[self.metagraph.hotkeys[uid] for uid in uids],
+        successes=successes,
+        task_type=task_type,
+        database=self.database,
+        in_top_2=[in_top_2_dict.get(uid, False) for uid in uids],
+    )
 
-        # Update the storage statistics
-        await update_statistics(
-            ss58_address=hotkey,
-            success=success,
-            task_type=task_type,
-            database=self.database,
-        )
-
+    for idx, (uid, response) in enumerate(zip(uids, responses)):
         # Apply reward for this task
-        tier_factor = await get_tier_factor(
-            hotkey, self.database, in_top_2=in_top_2_dict.get(uid, False)
-        )
+        success = successes[idx]
+        tier_factor = tier_factors[idx]
         rewards[idx] = 1.0 * tier_factor if success else failure_reward * tier_factor
 
         event.successful.append(success)
@@ -18,17 +18,16 @@
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 
+import os
 import sys
-import copy
 import time
 import torch
-import base64
 import typing
 import asyncio
-import websocket
 import bittensor as bt
 
 from pprint import pformat
+from itertools import cycle
 from pyinstrument import Profiler
 from Crypto.Random import get_random_bytes
 
@@ -39,12 +38,18 @@ from storage.shared.ecc import (
     setup_CRS,
     ecc_point_to_hex,
 )
+from storage.shared.utils import read_chunks
+from storage.shared.transport import payload_size, set_payload
 from storage.validator.utils import (
+    MAX_CHUNK_SIZE,
+    adjust_uids_to_multiple,
+    current_block,
+    get_available_query_miners,
     make_random_file,
-    compute_chunk_distribution_mut_exclusive_numpy_reuse_uids,
+    optimal_chunk_size,
+    partition_uids,
 )
 from storage.validator.encryption import encrypt_data
-from storage.validator.verify import verify_store_with_seed
 from storage.validator.reward import apply_reward_scores
 from storage.validator.database import (
     add_metadata_to_hotkey,
@@ -53,11 +58,10 @@ from storage.validator.database import (
     get_ordered_metadata,
     hotkey_at_capacity,
 )
-from storage.validator.cid import generate_cid_string
-from storage.validator.bonding import update_statistics
+from storage.validator.cid import CIDHasher
 
 from .reward import create_reward_vector
-from .network import ping_and_retry_uids, compute_and_ping_chunks, reroll_distribution
+from .network import ping_uids, ping_and_retry_uids
 
 
 async def store_encrypted_data(
@@ -75,7 +79,7 @@ async def store_encrypted_data(
         completion_times=[],
         task_status_messages=[],
         task_status_codes=[],
-        block=self.subtensor.get_current_block(),
+        block=current_block(self),
         uids=[],
         step_length=0.0,
         best_uid="",
@@ -98,23 +102,20 @@ async def store_encrypted_data(
     # Hash the data
     data_hash = hash_data(encrypted_data)
 
-    # Convert to base64 for compactness
-    # TODO: Don't do this if it's already b64 encoded. (Check first)
-    b64_encrypted_data = base64.b64encode(encrypted_data).decode("utf-8")
-
     if self.config.neuron.verbose:
         bt.logging.debug(f"storing user data: {encrypted_data[:12]}...")
         bt.logging.debug(f"storing user hash: {data_hash}")
-        bt.logging.debug(f"b64 encrypted data: {b64_encrypted_data[:12]}...")
 
     synapse = protocol.Store(
-        encrypted_data=b64_encrypted_data,
+        encrypted_data="",
         curve=self.config.neuron.curve,
         g=ecc_point_to_hex(g),
         h=ecc_point_to_hex(h),
         seed=get_random_bytes(32).hex(),  # 256-bit seed
         ttl=ttl or self.config.neuron.data_ttl,
     )
+    # Sent as raw bytes to the miners that support it, base64 encoded to the others
+    set_payload(synapse, encrypted_data)
 
     # Select subset of miners to query (e.g. redunancy factor of N)
     uids, _ = await ping_and_retry_uids(
@@ -184,7 +185,7 @@ async def store_encrypted_data(
             ]
 
         bt.logging.trace(f"Applying store rewards for retry: {retries}")
-        data_size = sys.getsizeof(b64_encrypted_data)
+        data_size = payload_size(synapse)
         apply_reward_scores(
             self,
             uids=uids,
@@ -252,361 +253,297 @@ async def store_random_data(self):
     )
 
 
-async def store_broadband(
+async def store_chunk(
     self,
-    encrypted_data,
+    chunk: bytes,
+    chunk_hash: str,
+    uids: typing.List[int],
     encryption_payload,
-    R=3,
-    k=10,
-    data_hash=None,
-    exclude_uids=None,
-    ttl=None,
-):
+    ttl: int = None,
+    max_attempts: int = 3,
+) -> typing.List[str]:
     """
-    Asynchronously stores encrypted data across a distributed network by splitting it into chunks and
-    assigning these chunks to various miners for storage. This method ensures redundancy and efficient
-    data distribution while handling network requests concurrently.
-
-    The process includes chunking the data, selecting miners for storage, and verifying the integrity
-    of stored data through response validation.
+    Stores a single chunk with a group of miners, rerolling the miners that fail to verify until
+    the group has stored it or the attempts are exhausted, and records the chunk metadata.
 
     Parameters:
-        encrypted_data (bytes): The encrypted data to be stored across the network.
-        encryption_payload (dict): Additional payload information required for encryption.
-        R (int, optional): The redundancy factor, denoting how many times each chunk is replicated. Default is 3.
-        k (int, optional): The number of miners to query for each chunk. Default is 10.
-        data_hash (str, optional): The hash of the data to be stored. If not provided, compute it. Default is None.
-        exclude_uids: (list of int, optional): A list of UIDs to exclude from the storage process. Default is None.
+        chunk (bytes): The chunk of encrypted data to be stored.
+        chunk_hash (str): The hash of the chunk.
+        uids (list of int): The miners the chunk is assigned to, their number is the redundancy target.
+        encryption_payload (dict): Encryption payload of the file, kept with each stored chunk.
+        ttl (int, optional): Time to live of the chunk. Defaults to the `neuron.data_ttl` config.
+        max_attempts (int, optional): Number of rounds of requests for the chunk. Defaults to 3.
 
     Returns:
-        str: The hash of the full data, representing its unique identifier in the network.
-
-    Raises:
-        Exception: If the process of creating initial distributions fails after multiple retries.
-
-    Note:
-        - Uses a semaphore to limit the number of concurrent network requests.
-        - Employs a retry mechanism for handling network and miner availability issues.
-        - Logs various stages of the process for debugging and monitoring purposes.
+        list of str: The hotkeys of the miners that verifiably stored the chunk.
     """
-    if self.config.neuron.profile:
-        # Create a profiler instance
-        profiler = Profiler()
-        profiler.start()
+    target = len(uids)
+    tried_uids = set()
+    stored_hotkeys = []
 
-    semaphore = asyncio.Semaphore(self.config.neuron.semaphore_size)
-
-    async def store_chunk_group(chunk_hash, chunk, uids):
-        event = EventSchema(
-            task_name="Store",
-            successful=[],
-            completion_times=[],
-            task_status_messages=[],
-            task_status_codes=[],
-            block=self.subtensor.get_current_block(),
-            uids=[],
-            step_length=0.0,
-            best_uid="",
-            best_hotkey="",
-            rewards=[],
-            moving_averaged_scores=[],
-        )
-
-        g, h = setup_CRS(curve=self.config.neuron.curve)
-
-        bt.logging.debug(f"type(chunk): {type(chunk)}")
-        bt.logging.debug(f"chunk: {chunk[:100]}")
-        chunk = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
-        b64_encoded_chunk = await asyncio.to_thread(base64.b64encode, chunk)
-        b64_encoded_chunk = b64_encoded_chunk.decode("utf-8")
-        bt.logging.debug(f"b64_encoded_chunk: {b64_encoded_chunk[:100]}")
-        random_seed = get_random_bytes(32).hex()
-
-        synapse = protocol.Store(
-            encrypted_data=b64_encoded_chunk,
-            curve=self.config.neuron.curve,
-            g=ecc_point_to_hex(g),
-            h=ecc_point_to_hex(h),
-            seed=random_seed,
-            ttl=ttl or self.config.neuron.data_ttl,
-        )
+    chunk_size = sys.getsizeof(chunk)  # chunk size in bytes
 
+    for attempt in range(max_attempts):
+        uids, _ = await ping_uids(self, uids=uids)
         uids = [
             uid
             for uid in uids
             if not await hotkey_at_capacity(self.metagraph.hotkeys[uid], self.database)
         ]
+        tried_uids.update(uids)
+
+        if uids:
+            event = EventSchema(
+                task_name="Store",
+                successful=[],
+                completion_times=[],
+                task_status_messages=[],
+                task_status_codes=[],
+                block=current_block(self),
+                uids=[],
+                step_length=0.0,
+                best_uid="",
+                best_hotkey="",
+                rewards=[],
+                moving_averaged_scores=[],
+            )
 
-        axons = [self.metagraph.axons[uid] for uid in uids]
-        responses = await self.dendrite(
-            axons,
-            synapse,
-            deserialize=False,
-            timeout=100,
-        )
+            g, h = setup_CRS(curve=self.config.neuron.curve)
+            synapse = protocol.Store(
+                encrypted_data="",
+                curve=self.config.neuron.curve,
+                g=ecc_point_to_hex(g),
+                h=ecc_point_to_hex(h),
+                seed=get_random_bytes(32).hex(),
+                ttl=ttl or self.config.neuron.data_ttl,
+            )
+            set_payload(synapse, chunk)
 
-        # Compute the rewards for the responses given proc time.
-        rewards: torch.FloatTensor = torch.zeros(
-            len(responses), dtype=torch.float32
-        ).to(self.device)
+            axons = [self.metagraph.axons[uid] for uid in uids]
+            responses = await self.dendrite(
+                axons,
+                synapse,
+                deserialize=False,
+                timeout=100,
+            )
 
-        async def success(hotkey, idx, uid, response):
-            bt.logging.debug(f"Stored data in database with key: {hotkey}")
+            # Compute the rewards for the responses given proc time.
+            rewards: torch.FloatTensor = torch.zeros(
+                len(responses), dtype=torch.float32
+            ).to(self.device)
+
+            async def success(hotkey, idx, uid, response):
+                # Prepare storage for the data for particular miner
+                response_storage = {
+                    "prev_seed": response.seed,
+                    "size": chunk_size,
+                    "encryption_payload": encryption_payload,
+                }
+                # Store in the database according to the data hash and the miner hotkey
+                await add_metadata_to_hotkey(
+                    hotkey,
+                    chunk_hash,
+                    response_storage,  # seed + size + encryption keys
+                    self.database,
+                    ttl=ttl or self.config.neuron.data_ttl,
+                )
+                stored_hotkeys.append(hotkey)
+                bt.logging.debug(
+                    f"Stored data in database for uid: {uid} | {str(chunk_hash)}"
+                )
 
-        failed_uids = []
+            def failure(uid):
+                pass
 
-        def failure(uid):
-            failed_uids.append(uid)
+            # Verifies the responses, updates the statistics and computes the rewards
+            await create_reward_vector(
+                self, synapse, rewards, uids, responses, event, success, failure
+            )
+            event.rewards.extend(rewards.tolist())
+            bt.logging.debug(f"Updated reward scores: {rewards.tolist()}")
+
+            data_size = payload_size(synapse)
+            apply_reward_scores(
+                self,
+                uids=uids,
+                responses=responses,
+                rewards=rewards,
+                data_sizes=[data_size] * len(responses),
+            )
 
-        await create_reward_vector(
-            self, synapse, rewards, uids, responses, event, success, failure
-        )
-        event.rewards.extend(rewards.tolist())
+        missing = target - len(stored_hotkeys)
+        if missing <= 0 or attempt == max_attempts - 1:
+            break
 
-        data_size = sys.getsizeof(b64_encoded_chunk)
-        apply_reward_scores(
-            self,
-            uids=uids,
-            responses=responses,
-            rewards=rewards,
-            data_sizes=[data_size] * len(responses),
+        # Reroll the miners that failed, excluding every miner tried so far
+        bt.logging.trace(f"Rerolling {missing} miners for chunk {chunk_hash}")
+        uids = await get_available_query_miners(
+            self, k=missing, exclude=list(tried_uids)
         )
 
-        bt.logging.debug(f"Updated reward scores: {rewards.tolist()}")
-
-        # Determine the best UID based on rewards
-        if event.rewards:
-            best_index = max(range(len(event.rewards)), key=event.rewards.__getitem__)
-            event.best_uid = event.uids[best_index]
-            event.best_hotkey = self.metagraph.hotkeys[event.best_uid]
-
-        chunk_size = sys.getsizeof(chunk)  # chunk size in bytes
-        bt.logging.debug(f"chunk size: {chunk_size}")
-
-        await store_chunk_metadata(
-            full_hash,
-            chunk_hash,
-            [self.metagraph.hotkeys[uid] for uid in uids],
-            chunk_size,  # this should be len(chunk) but we need to fix the chunking
-            self.database,
+    if len(stored_hotkeys) < target:
+        bt.logging.warning(
+            f"Chunk {chunk_hash} stored by {len(stored_hotkeys)}/{target} miners"
         )
 
-        return responses, b64_encoded_chunk, random_seed
+    await store_chunk_metadata(
+        None,  # unused, the chunk is linked to its file by store_file_chunk_mapping_ordered
+        chunk_hash,
+        stored_hotkeys,
+        chunk_size,  # this should be len(chunk) but we need to fix the chunking
+        self.database,
+    )
+    return stored_hotkeys
 
-    async def handle_uid_operations(
-        uid, response, b64_encoded_chunk, random_seed, chunk_hash, chunk_size
-    ):
-        ss = time.time()
-        start = time.time()
 
-        # Offload the CPU-intensive verification to a separate thread
-        verified = await asyncio.to_thread(
-            verify_store_with_seed, response, b64_encoded_chunk, random_seed
-        )
+def hash_chunk(chunk: bytes, cid_hasher: CIDHasher = None) -> int:
+    """
+    Computes the hash of a chunk, and feeds it to the hasher of the full data's CID if given.
 
-        end = time.time()
-        bt.logging.debug(f"verify_store_with_seed time for uid {uid} : {end-start}")
-        if verified:
-            # Prepare storage for the data for particular miner
-            response_storage = {
-                "prev_seed": response.seed,
-                "size": chunk_size,
-                "encryption_payload": encryption_payload,
-            }
-            start = time.time()
-            # Store in the database according to the data hash and the miner hotkey
-            await add_metadata_to_hotkey(
-                self.metagraph.hotkeys[uid],
-                chunk_hash,
-                response_storage,  # seed + size + encryption keys
-                self.database,
-                ttl=ttl or self.config.neuron.data_ttl,
-            )
-            end = time.time()
-            bt.logging.debug(
-                f"Stored data in database for uid: {uid} | {str(chunk_hash)}"
-            )
-        else:
-            bt.logging.error(f"Failed to verify store commitment from UID: {uid}")
-
-        # Update the storage statistics
-        await update_statistics(
-            ss58_address=self.metagraph.hotkeys[uid],
-            success=verified,
-            task_type="store",
-            database=self.database,
-        )
-        bt.logging.debug(f"handle_uid_operations time for uid {uid} : {time.time()-ss}")
+    Parameters:
+        chunk (bytes): The chunk, in the order of the data.
+        cid_hasher (CIDHasher, optional): The CID hasher of the full data.
 
-        return {"chunk_hash": chunk_hash, "uid": uid, "verified": verified}
+    Returns:
+        int: The chunk hash, as `hash_data` computes it.
+    """
+    if cid_hasher is not None:
+        cid_hasher.update(chunk)
+    return hash_data(chunk)
 
-    async def semaphore_query_miners(distributions):
-        tasks = []
-        async with semaphore:
-            for i, dist in enumerate(distributions):
-                bt.logging.trace(
-                    f"Start index: {dist['start_idx']}, End index: {dist['end_idx']}"
-                )
-                chunk = encrypted_data[dist["start_idx"] : dist["end_idx"]]
-                bt.logging.trace(f"chunk: {chunk[:12]}")
-                dist["chunk_hash"] = hash_data(chunk)
-                bt.logging.debug(
-                    f"Chunk {i} | uid distribution: {dist['uids']} | size: {dist['chunk_size']}"
-                )
 
-                # Create an asyncio task for each chunk processing
-                task = asyncio.create_task(
-                    store_chunk_group(dist["chunk_hash"], chunk, dist["uids"])
-                )
-                tasks.append(task)
-
-        bt.logging.debug(f"gathering broadband tasks: {pformat(tasks)}")
-        results = await asyncio.gather(*tasks)
-        # Grab the responses and relevant data necessary for verify from the results
-        for i, result_group in enumerate(results):
-            responses, b64_encoded_chunk, random_seed = result_group
-            bt.logging.debug(f"-- responses_nested: {pformat(responses)}")
-            bt.logging.debug(f"-- b64_encoded_chunk: {b64_encoded_chunk[:100]}")
-            bt.logging.debug(f"-- random_seed: {random_seed}")
-
-            # Update the distributions with responses
-            distributions[i]["responses"] = responses
-            distributions[i]["b64_encoded_chunk"] = b64_encoded_chunk
-            distributions[i]["random_seed"] = random_seed
-
-        return distributions
-
-    async def semaphore_query_uid_operations(distributions):
-        tasks = []
-        for dist in distributions:
-            chunk_hash = dist["chunk_hash"]
-            chunk_size = dist["chunk_size"]
-            random_seed = dist["random_seed"]
-            b64_encoded_chunk = dist["b64_encoded_chunk"]
-            for uid, response in zip(dist["uids"], dist["responses"]):
-                task = asyncio.create_task(
-                    handle_uid_operations(
-                        uid,
-                        response,
-                        b64_encoded_chunk,
-                        random_seed,
-                        chunk_hash,
-                        chunk_size,
-                    )
-                )
-                tasks.append(task)
-        uid_verified_dict_list = await asyncio.gather(*tasks)
-        return uid_verified_dict_list
+async def store_broadband_stream(
+    self,
+    source: typing.Union[
+        str, os.PathLike, typing.AsyncIterable[bytes], typing.Iterable[bytes]
+    ],
+    encryption_payload,
+    data_size: int = None,
+    R=3,
+    k=10,
+    data_hash=None,
+    exclude_uids=None,
+    ttl=None,
+    window: int = None,
+):
+    """
+    Stores data read incrementally from a file or an iterator across the network. The data is split
+    into chunks as it is read, and only a bounded window of chunks is being
+    stored at any time, so memory use does not grow with the size of the data.
 
-    async def create_initial_distributions(encrypted_data, R, k):
-        dist_gen = compute_chunk_distribution_mut_exclusive_numpy_reuse_uids(
-            self,
-            data_size=sys.getsizeof(encrypted_data),
-            R=R,
-            k=k,
-            exclude=exclude_uids,
-        )
-        # Ping first to see if we need to reroll instead of waiting for the timeout
-        distributions = [dist async for dist in dist_gen]
-        distributions = await compute_and_ping_chunks(self, distributions)
-        return distributions
+    Parameters:
+        source (str | os.PathLike | AsyncIterable[bytes] | Iterable[bytes]): A file path or the data as
+            consecutive pieces of any size, e.g. the output of `SegmentedEncryptor.encrypt_stream`.
+        encryption_payload (dict): Additional payload information required for encryption.
+        data_size (int, optional): Total size of the data, used to choose the chunk size. Defaults to the
+            size of the file, or to the maximum chunk size for iterators.
+        R (int, optional): The redundancy factor, denoting how many times each chunk is replicated. Default is 3.
+        k (int, optional): The number of miners to query for each chunk. Default is 10.
+        data_hash (str, optional): The hash of the data to be stored. If not provided, compute it. Default is None.
+        exclude_uids: (list of int, optional): A list of UIDs to exclude from the storage process. Default is None.
+        ttl (int, optional): Time to live of the data. Defaults to the `neuron.data_ttl` config.
+        window (int, optional): Maximum number of chunks being stored at once. Defaults to the
+            `neuron.store_window` config.
 
-    bt.logging.debug(f"store_broadband() {encrypted_data[:100]}")
+    Returns:
+        str: The hash of the full data, representing its unique identifier in the network. Unless given,
+            it is the CID of the data as stored (i.e. encrypted).
 
-    full_hash = data_hash or generate_cid_string(encrypted_data)
-    bt.logging.debug(f"full hash: {full_hash}")
+    Raises:
+        ValueError: If the redundancy factor R is greater than the number of available UIDs.
+    """
+    if self.config.neuron.profile:
+        # Create a profiler instance
+        profiler = Profiler()
+        profiler.start()
+
+    window = window or self.config.neuron.store_window
 
     # Check and see if hash already exists, reject if so.
-    if await get_ordered_metadata(full_hash, self.database):
-        bt.logging.warning(f"Hash {full_hash} already exists on the network.")
-        return full_hash
+    if data_hash is not None and await get_ordered_metadata(data_hash, self.database):
+        bt.logging.warning(f"Hash {data_hash} already exists on the network.")
+        return data_hash
+
+    if data_size is None and isinstance(source, (str, os.PathLike)):
+        data_size = os.path.getsize(source)
 
-    exclude_uids = copy.deepcopy(exclude_uids)
+    exclude_uids = list(exclude_uids or [])
     bt.logging.debug(f"Original exclude_uids: {exclude_uids}")
 
     # Remove failed UIDs from consideration in chunk distributions
-    uids, failed_uids = await ping_and_retry_uids(
+    _, failed_uids = await ping_and_retry_uids(
         self,
         k=50,
         max_retries=1,
         exclude_uids=exclude_uids,
     )
     bt.logging.debug(f"ping_and_retry_uids() failed uids: {failed_uids}")
-    if exclude_uids is None:
-        exclude_uids = []
     exclude_uids = exclude_uids + list(failed_uids)
     bt.logging.debug(f"Updated exclude_uids: {exclude_uids}")
 
-    full_size = sys.getsizeof(encrypted_data)
-    bt.logging.debug(f"full size: {full_size}")
+    # Assign miner groups to the chunks, reusing groups when there are more chunks than groups
+    available_uids = await get_available_query_miners(self, k=k, exclude=exclude_uids)
+    chunk_size = (
+        optimal_chunk_size(data_size, len(available_uids), R)
+        if data_size
+        else MAX_CHUNK_SIZE
+    )
+    available_uids = adjust_uids_to_multiple(available_uids, R)
+    if R > len(available_uids):
+        raise ValueError(
+            "Redundancy factor cannot be greater than the number of available UIDs."
+        )
+    uid_groups = cycle(partition_uids(available_uids, R))
+    bt.logging.debug(f"data size: {data_size} | chunk size: {chunk_size}")
+
+    cid_hasher = CIDHasher() if data_hash is None else None
+    chunk_hashes = []
+    storing = set()
+    try:
+        async for chunk in read_chunks(source, chunk_size):
+            # Each chunk is hashed once, off the event loop, for both its own hash and the CID
+            chunk_hash = await asyncio.to_thread(hash_chunk, chunk, cid_hasher)
+            chunk_hashes.append(chunk_hash)
+
+            # Wait for a slot, which bounds the chunks held in memory
+            while len(storing) >= window:
+                done, storing = await asyncio.wait(
+                    storing, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    task.result()
 
-    # Sometimes this can fail, try/catch and retry for starters...
-    # Compute the chunk distribution
-    retries = 0
-    while retries < 3:
-        try:
-            distributions = await create_initial_distributions(encrypted_data, R, k)
-            break
-        except websocket._exceptions.WebSocketConnectionClosedException:
-            bt.logging.warning("Failed to create initial distributions, retrying...")
-            retries += 1
-        except Exception as e:
-            bt.logging.warning(
-                f"Failed to create initial distributions: {e}, retrying..."
+            uids = list(next(uid_groups))
+            bt.logging.debug(
+                f"Chunk {len(chunk_hashes) - 1} | uid distribution: {uids} | size: {len(chunk)}"
             )
-            retries += 1
+            storing.add(
+                asyncio.create_task(
+                    store_chunk(self, chunk, chunk_hash, uids, encryption_payload, ttl)
+                )
+            )
+            del chunk
 
-    bt.logging.trace(f"computed distributions: {pformat(distributions)}")
+        await asyncio.gather(*storing)
+    finally:
+        for task in storing:
+            task.cancel()
 
-    chunk_hashes = []
-    # TODO: review is variable is needed
-    retry_dists = [None]  # sentinel for first iteration
-    retries = 0
-    while len(distributions) > 0 and retries < 3:
-        async with semaphore:
-            # Store on the network: query miners for each chunk
-            # Updated distributions now contain responses from the network
-            updated_distributions = await semaphore_query_miners(distributions)
-            # Verify the responses and store the metadata for each verified response
-            verifications = await semaphore_query_uid_operations(updated_distributions)
-            if (
-                chunk_hashes == []
-            ):  # First time only. Grab all hashes in order after processed.
-                chunk_hashes.extend(
-                    [dist["chunk_hash"] for dist in updated_distributions]
-                )
+    full_hash = data_hash or cid_hasher.cid()
+    bt.logging.debug(f"full hash: {full_hash}")
 
-            # Process verification results and reroll failed distributions in a single loop
-            distributions = (
-                []
-            )  # reset original distributions to populate for next round
-            for i, dist in enumerate(updated_distributions):
-                # Get verification status for the current distribution
-                bt.logging.trace(f"verifications: {pformat(verifications)}")
-
-                # Check if any UID in the distribution failed verification
-                if any(not v["verified"] for v in verifications):
-                    # Extract failed UIDs
-                    failed_uids = [v["uid"] for v in verifications if not v["verified"]]
-                    bt.logging.trace(f"failed uids: {pformat(failed_uids)}")
-                    # Reroll distribution with failed UIDs
-                    rerolled_dist = await reroll_distribution(self, dist, failed_uids)
-                    bt.logging.trace(f"rerolled uids: {pformat(rerolled_dist['uids'])}")
-                    # Replace the original distribution with the rerolled one
-                    distributions.append(rerolled_dist)
-
-        retries += 1
-
-    # Update the chunk hash mapping for this entire file
-    # TODO: change this to store_file_chunk_mapping_ordered
-    # to append rather than overwrite
-    await store_file_chunk_mapping_ordered(
-        full_hash=full_hash,
-        chunk_hashes=chunk_hashes,
-        chunk_indices=list(range(len(chunk_hashes))),
-        encryption_payload=encryption_payload,
-        database=self.database,
-    )
+    if data_hash is None and await get_ordered_metadata(full_hash, self.database):
+        # Only known now that the data has been hashed, keep the existing mapping
+        bt.logging.warning(f"Hash {full_hash} already exists on the network.")
+    else:
+        # Update the chunk hash mapping for this entire file
+        await store_file_chunk_mapping_ordered(
+            full_hash=full_hash,
+            chunk_hashes=chunk_hashes,
+            chunk_indices=list(range(len(chunk_hashes))),
+            encryption_payload=encryption_payload,
+            database=self.database,
+        )
 
     if self.config.neuron.profile:
         # Stop the profiler
@@ -615,3 +552,51 @@ async def store_broadband(
         print(profiler.output_text(unicode=True, color=True))
 
     return full_hash
+
+
+async def store_broadband(
+    self,
+    encrypted_data,
+    encryption_payload,
+    R=3,
+    k=10,
+    data_hash=None,
+    exclude_uids=None,
+    ttl=None,
+):
+    """
+    Asynchronously stores encrypted data across a distributed network by splitting it into chunks and
+    assigning these chunks to various miners for storage. See `store_broadband_stream`, which this
+    wraps for data that is already in memory.
+
+    Parameters:
+        encrypted_data (bytes): The encrypted data to be stored across the network.
+        encryption_payload (dict): Additional payload information required for encryption.
+        R (int, optional): The redundancy factor, denoting how many times each chunk is replicated. Default is 3.
+        k (int, optional): The number of miners to query for each chunk. Default is 10.
+        data_hash (str, optional): The hash of the data to be stored. If not provided, compute it. Default is None.
+        exclude_uids: (list of int, optional): A list of UIDs to exclude from the storage process. Default is None.
+
+    Returns:
+        str: The hash of the full data, representing its unique identifier in the network.
+    """
+    bt.logging.debug(f"store_broadband() {encrypted_data[:100]}")
+    encrypted_data = (
+        encrypted_data.encode("utf-8")
+        if isinstance(encrypted_data, str)
+        else encrypted_data
+    )
+
+    return await store_broadband_stream(
+        self,
+        # Slices of a memoryview avoid copying the data up front
+        [memoryview(encrypted_data)],
+        encryption_payload,
+        data_size=len(encrypted_data),
+        R=R,
+        k=k,
+        # Unless given, the CID is computed while the chunks are hashed
+        data_hash=data_hash,
+        exclude_uids=exclude_uids,
+        ttl=ttl,
+    )
@@ -166,6 +166,19 @@ def ttl_cache(maxsize=128, ttl=10):
     return wrapper_cache
 
 
+def current_block(self) -> int:
+    """
+    Get the current block number, from the neuron's block cache when it has one.
+
+    Returns:
+        int: The current block number.
+    """
+    block_cache = getattr(self, "block_cache", None)
+    if block_cache is not None:
+        return block_cache.block
+    return self.subtensor.get_current_block()
+
+
 def current_block_hash(self):
     """
     Get the current block hash with caching.
@@ -177,7 +190,11 @@ def current_block_hash(self):
         str: The current block hash.
     """
     try:
-        block_hash: str = self.subtensor.get_block_hash(self.subtensor.get_current_block())
+        block_cache = getattr(self, "block_cache", None)
+        if block_cache is not None:
+            block_hash = block_cache.block_hash
+        else:
+            block_hash = self.subtensor.get_block_hash(self.subtensor.get_current_block())
         if block_hash is not None:
             return block_hash
     except Exception as e:
@@ -221,20 +238,73 @@ def get_pseudorandom_uids(self, uids, k):
     return sampled
 
 
+def compute_availability_mask(
+    metagraph: "bt.metagraph.Metagraph", vpermit_tao_limit: int
+) -> np.ndarray:
+    """Vectorized `check_uid_availability` over every uid of the metagraph.
+    Args:
+        metagraph (:obj: bt.metagraph.Metagraph): Metagraph object
+        vpermit_tao_limit (int): Validator permit tao limit
+    Returns:
+        np.ndarray: Boolean mask indexed by uid, True where the uid is available
+    """
+    n = int(metagraph.n)
+    serving = np.fromiter(
+        (axon.is_serving for axon in metagraph.axons[:n]), dtype=bool, count=n
+    )
+    validator_permit = np.asarray(metagraph.validator_permit, dtype=bool)[:n]
+    stake = np.asarray(metagraph.S, dtype=np.float64)[:n]
+    # Filter non serving axons and validator permit > vpermit_tao_limit stake.
+    return serving & ~(validator_permit & (stake > vpermit_tao_limit))
+
+
+def get_availability_mask(self) -> np.ndarray:
+    """Returns the availability mask of the neuron's metagraph, computed once per metagraph sync.
+
+    Returns:
+        np.ndarray: Boolean mask indexed by uid, True where the uid is available.
+    """
+    # A sync replaces the metagraph state and moves its block forward
+    key = (
+        id(self.metagraph),
+        int(self.metagraph.block),
+        int(self.metagraph.n),
+        self.config.neuron.vpermit_tao_limit,
+    )
+    cached = getattr(self, "_availability_mask", None)
+    if cached is None or cached[0] != key:
+        mask = compute_availability_mask(
+            self.metagraph, self.config.neuron.vpermit_tao_limit
+        )
+        cached = (key, mask)
+        self._availability_mask = cached
+    return cached[1]
+
+
+def get_available_uids_array(self, exclude: list = None) -> np.ndarray:
+    """Returns all available uids that are not excluded, in ascending order.
+
+    Args:
+        exclude (list): Uids to leave out.
+
+    Returns:
+        np.ndarray: The available uids.
+    """
+    mask = get_availability_mask(self)
+    if exclude:
+        mask = mask.copy()
+        excluded = np.fromiter(exclude, dtype=np.int64)
+        mask[excluded[(excluded >= 0) & (excluded < len(mask))]] = False
+    return np.flatnonzero(mask)
+
+
 def get_available_uids(self, exclude: list = None):
     """Returns all available uids from the metagraph.
 
     Returns:
         uids (torch.LongTensor): All available uids.
     """
-    avail_uids = []
-
-    for uid in range(self.metagraph.n.item()):
-        uid_is_available = check_uid_availability(
-            self.metagraph, uid, self.config.neuron.vpermit_tao_limit
-        )
-        if uid_is_available and (exclude is None or uid not in exclude):
-            avail_uids.append(uid)
+    avail_uids = get_available_uids_array(self, exclude=exclude).tolist()
     bt.logging.debug(f"returning available uids: {avail_uids}")
     return avail_uids
 
@@ -252,34 +322,16 @@ def get_random_uids(
     Notes:
         If `k` is larger than the number of available `uids`, set `k` to the number of available `uids`.
     """
-    candidate_uids = []
-    avail_uids = []
-
-    for uid in range(self.metagraph.n.item()):
-        uid_is_available = check_uid_availability(
-            self.metagraph, uid, self.config.neuron.vpermit_tao_limit
-        )
-        uid_is_not_excluded = exclude is None or uid not in exclude
-
-        if uid_is_available and uid_is_not_excluded:
-            candidate_uids.append(uid)
-        elif uid_is_available:
-            avail_uids.append(uid)
-
-    # If not enough candidate_uids, supplement from avail_uids, ensuring they're not in exclude list
-    if len(candidate_uids) < k:
-        additional_uids_needed = k - len(candidate_uids)
-        filtered_avail_uids = [uid for uid in avail_uids if uid not in exclude]
-        additional_uids = random.sample(
-            filtered_avail_uids, min(additional_uids_needed, len(filtered_avail_uids))
-        )
-        candidate_uids.extend(additional_uids)
+    candidate_uids = get_available_uids_array(self, exclude=exclude)
 
     # Safeguard against trying to sample more than what is available
     num_to_sample = min(k, len(candidate_uids))
     if seed:  # use block hash seed if provided
         random.seed(seed)
-    uids = random.sample(candidate_uids, num_to_sample)
+    uids = [
+        int(candidate_uids[idx])
+        for idx in random.sample(range(len(candidate_uids)), num_to_sample)
+    ]
     bt.logging.debug(f"returning available uids: {uids}")
     return uids
 
@@ -429,7 +481,7 @@ def get_current_validtor_uid_round_robin(self):
         int: The UID of the validator selected via round-robin.
     """
     vuids = get_all_validators(self)
-    vidx = self.subtensor.get_current_block() // 100 % len(vuids)
+    vidx = current_block(self) // 100 % len(vuids)
     return vuids[vidx]
 
 
@@ -34,6 +34,7 @@ from ..shared.merkle import (
 from ..shared.utils import (
     b64_decode,
 )
+from ..shared.transport import get_payload
 
 import bittensor as bt
 
@@ -99,7 +100,7 @@ def verify_challenge_with_seed(synapse, seed, verbose=False):
 
     if not committer.open(
         commitment,
-        hash_data(base64.b64decode(synapse.data_chunk) + str(seed).encode()),
+        hash_data(get_payload(synapse) + str(seed).encode()),
         synapse.randomness,
     ):
         if verbose:
@@ -172,6 +173,69 @@ def verify_store_with_seed(synapse, b64_encrypted_data, seed, verbose=False):
     return True
 
 
+def verify_store_with_seed_batch(synapses, encrypted_data, seed, verbose=False):
+    """
+    Verifies the store responses of several miners for the same chunk at once. The data is hashed
+    a single time, and the commitments of all responses sharing the same curve
+    parameters are checked together with a random linear combination (`ECCommitment.batch_open`).
+    Only when a batch fails are its responses opened one by one to identify the bad miner(s).
+    Args:
+        synapses (List[Synapse]): The store responses to verify, all for the same request.
+        encrypted_data (bytes): The data that was sent to the miners.
+        seed (str): The seed that was sent to the miners.
+        verbose (bool, optional): Enables verbose logging for debugging. Defaults to False.
+    Returns:
+        List[bool]: The verification result of each response, same semantics as `verify_store_with_seed`.
+    """
+    results = [False] * len(synapses)
+    m_val = hash_data(encrypted_data + str(seed).encode())
+    expected_hash = str(m_val)
+
+    # Group the well-formed responses by their curve parameters
+    groups = {}
+    for idx, synapse in enumerate(synapses):
+        if synapse.commitment_hash != expected_hash:
+            if verbose:
+                bt.logging.error("Initial commitment hash != hash(data + seed)")
+                bt.logging.error(f"commitment hash   : {synapse.commitment_hash}")
+                bt.logging.error(f"reconstructed hash: {expected_hash}")
+                bt.logging.error(f"synapse           : {synapse.axon.dict()}")
+            continue
+        try:
+            commitment = hex_to_ecc_point(synapse.commitment, synapse.curve)
+            randomness = int(synapse.randomness)
+        except Exception as e:
+            bt.logging.error(f"Malformed store commitment: {e}")
+            continue
+        key = (synapse.curve, synapse.g, synapse.h)
+        groups.setdefault(key, []).append((idx, commitment, randomness))
+
+    for (curve, g, h), members in groups.items():
+        try:
+            committer = ECCommitment(
+                hex_to_ecc_point(g, curve), hex_to_ecc_point(h, curve), curve=curve
+            )
+        except Exception as e:
+            bt.logging.error(f"Malformed store curve parameters: {e}")
+            continue
+        indices, commitments, rs = zip(*members)
+        m_vals = [m_val] * len(members)
+
+        if committer.batch_open(commitments, m_vals, rs):
+            opened = [True] * len(members)
+        else:
+            bt.logging.debug("Batch opening failed, opening commitments one by one.")
+            opened = committer.open_many(commitments, m_vals, rs)
+
+        for idx, ok in zip(indices, opened):
+            if not ok:
+                bt.logging.error("Opening commitment failed")
+                bt.logging.error(f"synapse: {synapses[idx].axon.dict()}")
+            results[idx] = ok
+
+    return results
+
+
 def verify_retrieve_with_seed(synapse, seed, verbose=False):
     """
     Verifies the retrieval process in a decentralized network using the provided synapse and seed.
@@ -0,0 +1,204 @@
+import os
+import time
+import asyncio
+import numpy as np
+from unittest import TestCase, skipUnless
+
+from redis import asyncio as aioredis
+from redis import Redis
+
+from storage.constants import STORAGE_LIMIT_BRONZE
+from storage.validator.bonding import (
+    compute_all_tiers,
+    compute_tier,
+    get_tier_factor,
+    migrate_legacy_statistics,
+    register_miner,
+    rollover_storage_stats,
+    tier_cache,
+    update_statistics_batch,
+)
+
+
+REDIS_HOST = os.environ.get("BENCHMARK_REDIS_HOST", "localhost")
+REDIS_PORT = int(os.environ.get("BENCHMARK_REDIS_PORT", 6379))
+REDIS_DB = int(os.environ.get("BENCHMARK_REDIS_DB", 15))
+
+N_RESPONSES = 30  # a large round of challenge or store responses
+N_ROUNDS = 20
+N_MINERS = 1000
+
+
+def redis_available() -> bool:
+    try:
+        client = Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB)
+        # Never benchmark against a database that is in use
+        return client.ping() and client.dbsize() == 0
+    except Exception:
+        return False
+
+
+async def legacy_update_statistics(ss58_address, success, task_type, database):
+    # The serial commands issued per response before statistics were scripted
+    stats_key = f"stats:{ss58_address}"
+    if not await database.exists(stats_key):
+        await register_miner(ss58_address, database)
+    await database.hincrby(stats_key, f"{task_type}_attempts", 1)
+    if success:
+        await database.hincrby(stats_key, f"{task_type}_successes", 1)
+    for legacy_field in ["retrieval_successes", "retrieval_attempts"]:
+        value = await database.hget(stats_key, legacy_field)
+        if value is not None:
+            await database.hset(
+                stats_key, legacy_field.replace("retrieval_", "retrieve_"), int(value)
+            )
+            await database.hdel(stats_key, legacy_field)
+    await database.hget(stats_key, "total_successes")
+    if success:
+        await database.hincrby(stats_key, "total_successes", 1)
+
+
+@skipUnless(redis_available(), "requires an empty local redis-server database")
+class BenchmarkBonding(TestCase):
+    def setUp(self):
+        # Tiers cached by other tests belong to a different database
+        tier_cache.invalidate()
+        self.database = aioredis.StrictRedis(
+            host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB
+        )
+        self.hotkeys = [f"hotkey{i}" for i in range(N_RESPONSES)]
+        self.successes = [i % 3 != 0 for i in range(N_RESPONSES)]
+
+    def tearDown(self):
+        Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB).flushdb()
+
+    def timed(self, coroutine):
+        async def run():
+            try:
+                start = time.perf_counter()
+                result = await coroutine
+                return result, time.perf_counter() - start
+            finally:
+                await self.database.connection_pool.disconnect()
+
+        return asyncio.run(run())
+
+    def stats(self):
+        client = Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB)
+        return {hotkey: client.hgetall(f"stats:{hotkey}") for hotkey in self.hotkeys}
+
+    def test_update_statistics_round(self):
+        async def legacy_rounds():
+            for _ in range(N_ROUNDS):
+                for hotkey, success in zip(self.hotkeys, self.successes):
+                    await legacy_update_statistics(
+                        hotkey, success, "challenge", self.database
+                    )
+                    await get_tier_factor(hotkey, self.database)
+
+        async def batched_rounds():
+            for _ in range(N_ROUNDS):
+                factors = await update_statistics_batch(
+                    self.hotkeys, self.successes, "challenge", self.database
+                )
+            return factors
+
+        _, legacy = self.timed(legacy_rounds())
+        expected = self.stats()
+        Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB).flushdb()
+
+        factors, batched = self.timed(batched_rounds())
+        print(
+            f"\nupdate_statistics ({N_ROUNDS} rounds of {N_RESPONSES} responses): "
+            f"legacy {legacy * 1000:.1f}ms, batched {batched * 1000:.1f}ms "
+            f"({legacy / batched:.0f}x)"
+        )
+        self.assertEqual(expected, self.stats())
+        self.assertEqual(
+            [
+                self.timed(get_tier_factor(hotkey, self.database))[0]
+                for hotkey in self.hotkeys
+            ],
+            factors,
+        )
+        self.assertLess(batched, legacy)
+
+    def test_migrate_legacy_statistics(self):
+        client = Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB)
+        client.hset(
+            "stats:legacy",
+            mapping={
+                "retrieval_successes": 3,
+                "retrieval_attempts": 4,
+                "storage_limit": STORAGE_LIMIT_BRONZE,
+            },
+        )
+        client.hset("stats:current", mapping={"retrieve_successes": 1})
+
+        migrated, _ = self.timed(migrate_legacy_statistics(self.database))
+
+        self.assertEqual(1, migrated)
+        self.assertEqual(
+            {
+                b"retrieve_successes": b"3",
+                b"retrieve_attempts": b"4",
+                b"storage_limit": str(STORAGE_LIMIT_BRONZE).encode(),
+            },
+            client.hgetall("stats:legacy"),
+        )
+        self.assertEqual({b"retrieve_successes": b"1"}, client.hgetall("stats:current"))
+
+    def test_compute_all_tiers(self):
+        rng = np.random.default_rng(0)
+        client = Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB)
+
+        def seed():
+            pipe = client.pipeline(transaction=False)
+            for i in range(N_MINERS):
+                attempts = rng.integers(0, 2000, size=3)
+                successes = [rng.integers(0, a + 1) for a in attempts]
+                pipe.hset(
+                    f"stats:miner{i}",
+                    mapping={
+                        "challenge_attempts": int(attempts[0]),
+                        "challenge_successes": int(successes[0]),
+                        "retrieve_attempts": int(attempts[1]),
+                        "retrieve_successes": int(successes[1]),
+                        "store_attempts": int(attempts[2]),
+                        "store_successes": int(successes[2]),
+                        "total_successes": int(rng.integers(0, 20000)),
+                        "tier": "Bronze",
+                        "storage_limit": STORAGE_LIMIT_BRONZE,
+                    },
+                )
+            pipe.execute()
+            return {key: client.hgetall(key) for key in client.keys("stats:*")}
+
+        async def legacy_compute_all_tiers():
+            keys = [key async for key in self.database.scan_iter("stats:*")]
+            await asyncio.gather(*[compute_tier(key, self.database) for key in keys])
+            await rollover_storage_stats(self.database)
+
+        seeded = seed()
+        _, legacy = self.timed(legacy_compute_all_tiers())
+        expected = {key: client.hgetall(key) for key in seeded}
+
+        client.flushdb()
+        pipe = client.pipeline(transaction=False)
+        for key, mapping in seeded.items():
+            pipe.hset(key, mapping=mapping)
+        pipe.execute()
+        tier_table, vectorized = self.timed(compute_all_tiers(self.database))
+        print(
+            f"\ncompute_all_tiers ({N_MINERS} miners): legacy {legacy * 1000:.1f}ms, "
+            f"vectorized {vectorized * 1000:.1f}ms ({legacy / vectorized:.0f}x)"
+        )
+        self.assertEqual(expected, {key: client.hgetall(key) for key in seeded})
+        self.assertEqual(
+            {
+                key.decode().split(":")[1]: fields[b"tier"]
+                for key, fields in expected.items()
+            },
+            tier_table,
+        )
+        self.assertLess(vectorized, legacy)
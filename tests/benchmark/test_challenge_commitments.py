@@ -0,0 +1,53 @@
+import os
+import time
+from unittest import TestCase
+
+from storage.shared.ecc import ECCommitment, setup_CRS
+from storage.shared.merkle import validate_merkle_proof
+from storage.shared.utils import chunk_data
+from storage.miner.utils import (
+    commit_data_with_seed,
+    commit_challenged_chunk_with_seed,
+)
+
+
+N_CHUNKS = 128
+CHUNK_SIZE = 4096
+INDEX = 77
+
+
+class BenchmarkChallengeCommitments(TestCase):
+    def test_lazy_commitments_speedup(self):
+        data = os.urandom(N_CHUNKS * CHUNK_SIZE)
+        committer = ECCommitment(*setup_CRS())
+
+        start = time.perf_counter()
+        randomness, chunks, points, eager_tree = commit_data_with_seed(
+            committer,
+            data_chunks=chunk_data(data, CHUNK_SIZE),
+            n_chunks=N_CHUNKS,
+            seed="seed",
+        )
+        eager = time.perf_counter() - start
+
+        start = time.perf_counter()
+        _, chunk, point, lazy_tree = commit_challenged_chunk_with_seed(
+            committer,
+            data_chunks=chunk_data(data, CHUNK_SIZE),
+            seed="seed",
+            index=INDEX,
+        )
+        lazy = time.perf_counter() - start
+
+        print(
+            f"\n{N_CHUNKS} chunks: eager {eager * 1000:.1f} ms, "
+            f"lazy {lazy * 1000:.1f} ms ({eager / lazy:.1f}x)"
+        )
+
+        self.assertEqual(chunks[INDEX], chunk)
+        self.assertTrue(
+            validate_merkle_proof(
+                lazy_tree.get_proof(INDEX), point, lazy_tree.get_merkle_root()
+            )
+        )
+        self.assertLess(lazy, eager)
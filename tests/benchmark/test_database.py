@@ -0,0 +1,239 @@
+import os
+import json
+import time
+import asyncio
+from unittest import TestCase, skipUnless
+
+from redis import asyncio as aioredis
+from redis import Redis
+
+from storage.validator.bonding import tier_cache
+from storage.validator.database import (
+    cache_hotkeys_capacity,
+    count_expired_ttl_keys,
+    get_all_full_hashes,
+    hotkey_at_capacity,
+    purge_expired_ttl_keys,
+    rebuild_database_indexes,
+    reconcile_hotkey_usage,
+    total_hotkey_storage,
+)
+
+
+REDIS_HOST = os.environ.get("BENCHMARK_REDIS_HOST", "localhost")
+REDIS_PORT = int(os.environ.get("BENCHMARK_REDIS_PORT", 6379))
+REDIS_DB = int(os.environ.get("BENCHMARK_REDIS_DB", 15))
+
+N_HOTKEYS = 100
+HASHES_PER_HOTKEY = 1000  # 100k hashes in total
+EXPIRED_PER_HOTKEY = 100
+N_FILES = 1000
+CHUNKS_PER_FILE = 100  # 100k chunk keys of keyspace to wade through
+
+
+def redis_available() -> bool:
+    try:
+        client = Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB)
+        # Never benchmark against a database that is in use
+        return client.ping() and client.dbsize() == 0
+    except Exception:
+        return False
+
+
+async def legacy_total_hotkey_storage(hotkey, database):
+    total_storage = 0
+    for data_hash in await database.hkeys(f"hotkey:{hotkey}"):
+        if data_hash.startswith(b"ttl:"):
+            continue
+        metadata = await database.hget(f"hotkey:{hotkey}", data_hash)
+        if metadata:
+            total_storage += json.loads(metadata)["size"]
+    return total_storage
+
+
+async def legacy_cache_hotkeys_capacity(hotkeys, database):
+    hotkeys_capacity = {}
+    for hotkey in hotkeys:
+        total_storage = await legacy_total_hotkey_storage(hotkey, database)
+        limit = await database.hget(f"stats:{hotkey}", "storage_limit")
+        hotkeys_capacity[hotkey] = (total_storage, int(limit))
+    return hotkeys_capacity
+
+
+async def legacy_get_all_full_hashes(database):
+    data_hashes = []
+    async for key in database.scan_iter("*"):
+        if not key.startswith(b"file:"):
+            continue
+        data_hashes.append(key.decode("utf-8").split(":")[1])
+    return data_hashes
+
+
+async def legacy_purge_expired_ttl_keys(database):
+    async for hotkey in database.scan_iter("*"):
+        if not hotkey.startswith(b"hotkey:"):
+            continue
+        for field in await database.hgetall(hotkey):
+            if not field.startswith(b"ttl:"):
+                continue
+            # Two HGETs per TTL field, as in is_ttl_expired_for_hash_and_hotkey
+            generated = json.loads(await database.hget(hotkey, field))["generated"]
+            ttl = json.loads(await database.hget(hotkey, field))["ttl"]
+            if time.time() - generated > ttl:
+                await database.hdel(hotkey, field[4:])
+                await database.hdel(hotkey, field)
+
+
+@skipUnless(redis_available(), "requires an empty local redis-server database")
+class BenchmarkDatabase(TestCase):
+    def setUp(self):
+        # Tiers cached by other tests belong to a different database
+        tier_cache.invalidate()
+        self.database = aioredis.StrictRedis(
+            host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB
+        )
+        self.hotkeys = [f"hotkey{i}" for i in range(N_HOTKEYS)]
+        asyncio.run(self.seed())
+
+    def tearDown(self):
+        Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB).flushdb()
+
+    async def seed(self):
+        now = time.time()
+        pipe = self.database.pipeline(transaction=False)
+        for hotkey in self.hotkeys:
+            mapping = {}
+            for i in range(HASHES_PER_HOTKEY):
+                data_hash = f"{hotkey}_hash{i}"
+                mapping[data_hash] = json.dumps(
+                    {"prev_seed": "seed", "size": i, "encryption_payload": "{}"}
+                )
+                generated = now - 3600 if i < EXPIRED_PER_HOTKEY else now
+                mapping[f"ttl:{data_hash}"] = json.dumps(
+                    {"generated": generated, "ttl": 60}
+                )
+            pipe.hset(f"hotkey:{hotkey}", mapping=mapping)
+            pipe.hset(f"stats:{hotkey}", "storage_limit", 1024**3)
+        await pipe.execute()
+        pipe = self.database.pipeline(transaction=False)
+        for f in range(N_FILES):
+            chunks = {f"file{f}_chunk{i}": i for i in range(CHUNKS_PER_FILE)}
+            pipe.zadd(f"file:file{f}", chunks)
+            for chunk_hash, size in chunks.items():
+                pipe.hset(
+                    f"chunk:{chunk_hash}", mapping={"hotkeys": "hotkey0", "size": size}
+                )
+        await pipe.execute()
+        await rebuild_database_indexes(self.database)
+        await self.database.connection_pool.disconnect()
+
+    def timed(self, coroutine):
+        async def run():
+            try:
+                start = time.perf_counter()
+                result = await coroutine
+                return result, time.perf_counter() - start
+            finally:
+                await self.database.connection_pool.disconnect()
+
+        return asyncio.run(run())
+
+    def test_cache_hotkeys_capacity(self):
+        expected, legacy = self.timed(
+            legacy_cache_hotkeys_capacity(self.hotkeys, self.database)
+        )
+        result, pipelined = self.timed(
+            cache_hotkeys_capacity(self.hotkeys, self.database)
+        )
+        print(
+            f"\ncache_hotkeys_capacity ({N_HOTKEYS * HASHES_PER_HOTKEY} hashes): "
+            f"legacy {legacy:.2f}s, pipelined {pipelined:.3f}s ({legacy / pipelined:.0f}x)"
+        )
+        self.assertEqual(expected, result)
+        self.assertLess(pipelined, legacy)
+
+    def test_total_hotkey_storage(self):
+        expected, legacy = self.timed(
+            legacy_total_hotkey_storage(self.hotkeys[0], self.database)
+        )
+        result, scripted = self.timed(
+            total_hotkey_storage(self.hotkeys[0], self.database)
+        )
+        print(
+            f"\ntotal_hotkey_storage ({HASHES_PER_HOTKEY} hashes): "
+            f"legacy {legacy * 1000:.1f}ms, scripted {scripted * 1000:.1f}ms"
+        )
+        self.assertEqual(expected, result)
+
+    def test_purge_expired_ttl_keys(self):
+        _, pipelined = self.timed(purge_expired_ttl_keys(self.database))
+        remaining = Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB).hlen(
+            f"hotkey:{self.hotkeys[0]}"
+        )
+        self.assertEqual(2 * (HASHES_PER_HOTKEY - EXPIRED_PER_HOTKEY), remaining)
+
+        # The purge must have kept the usage counters in sync
+        usage, _ = self.timed(reconcile_hotkey_usage(self.database))
+        for previous, current in usage.values():
+            self.assertEqual(previous, current)
+
+        # Re-seed so the legacy purge has the same amount of work to do
+        Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB).flushdb()
+        asyncio.run(self.seed())
+        _, legacy = self.timed(legacy_purge_expired_ttl_keys(self.database))
+        print(
+            f"\npurge_expired_ttl_keys ({N_HOTKEYS * HASHES_PER_HOTKEY} hashes): "
+            f"legacy {legacy:.2f}s, pipelined {pipelined:.3f}s ({legacy / pipelined:.0f}x)"
+        )
+        self.assertLess(pipelined, legacy)
+
+    def test_hotkey_at_capacity(self):
+        # Build the usage counters for a database that predates them
+        self.timed(reconcile_hotkey_usage(self.database))
+
+        async def capacity_checks():
+            return [
+                await hotkey_at_capacity(hotkey, self.database)
+                for hotkey in self.hotkeys
+            ]
+
+        _, legacy = self.timed(
+            legacy_cache_hotkeys_capacity(self.hotkeys, self.database)
+        )
+        at_capacity, counters = self.timed(capacity_checks())
+        print(
+            f"\n{N_HOTKEYS} capacity checks: legacy {legacy:.2f}s, "
+            f"counters {counters * 1000:.1f}ms ({legacy / counters:.0f}x)"
+        )
+        self.assertEqual([False] * N_HOTKEYS, at_capacity)
+        self.assertLess(counters, legacy)
+
+    def test_get_all_full_hashes(self):
+        expected, legacy = self.timed(legacy_get_all_full_hashes(self.database))
+        result, indexed = self.timed(get_all_full_hashes(self.database))
+        print(
+            f"\nget_all_full_hashes ({N_FILES} files): legacy {legacy * 1000:.1f}ms, "
+            f"indexed {indexed * 1000:.1f}ms ({legacy / indexed:.0f}x)"
+        )
+        self.assertEqual(sorted(expected), sorted(result))
+        self.assertLess(indexed, legacy)
+
+    def test_incremental_purge_expired_ttl_keys(self):
+        expired = N_HOTKEYS * EXPIRED_PER_HOTKEY
+        self.assertEqual(expired, self.timed(count_expired_ttl_keys(self.database))[0])
+
+        # Each bounded batch costs the same regardless of how much data is stored
+        timings = []
+        for _ in range(5):
+            purged, elapsed = self.timed(
+                purge_expired_ttl_keys(self.database, limit=100)
+            )
+            self.assertEqual(100, purged)
+            timings.append(elapsed)
+        print(
+            f"\nincremental purge ({N_HOTKEYS * HASHES_PER_HOTKEY} hashes, {expired} expired): "
+            f"{min(timings) * 1000:.1f}ms per batch of 100"
+        )
+        self.assertEqual(
+            expired - 500, self.timed(count_expired_ttl_keys(self.database))[0]
+        )
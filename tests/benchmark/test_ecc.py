@@ -0,0 +1,40 @@
+import time
+from unittest import TestCase
+
+from storage.shared.ecc import ECCommitment, setup_CRS
+
+
+N_COMMITMENTS = 128
+
+
+class BenchmarkECCommitment(TestCase):
+    def test_fixed_base_tables_speedup(self):
+        g, h = setup_CRS()
+        messages = [f"chunk {i}".encode() for i in range(N_COMMITMENTS)]
+
+        start = time.perf_counter()
+        reference = ECCommitment(g, h).commit_many(messages)
+        generic = time.perf_counter() - start
+
+        # Includes building the tables
+        start = time.perf_counter()
+        committer = ECCommitment(g, h, precompute=True)
+        committed = committer.commit_many(messages)
+        fixed_base = time.perf_counter() - start
+
+        start = time.perf_counter()
+        opened = committer.open_many(*zip(*reference))
+        open_time = time.perf_counter() - start
+
+        print(
+            f"\n{N_COMMITMENTS} commitments: generic {generic * 1000:.1f} ms, "
+            f"fixed-base {fixed_base * 1000:.1f} ms ({generic / fixed_base:.1f}x), "
+            f"open_many {open_time * 1000:.1f} ms"
+        )
+
+        self.assertEqual([True] * N_COMMITMENTS, opened)
+        self.assertEqual(
+            [True] * N_COMMITMENTS,
+            ECCommitment(g, h).open_many(*zip(*committed)),
+        )
+        self.assertLess(fixed_base, generic)
@@ -0,0 +1,82 @@
+import os
+import time
+from types import SimpleNamespace
+from unittest import TestCase
+
+from storage.validator.encryption import (
+    SegmentedEncryptor,
+    decrypt_data_with_private_key,
+    encrypt_data,
+    encrypt_data_with_aes_single_shot,
+    wallet_key_cache,
+)
+
+
+N_FILES = 5
+FILE_SIZE = 1024
+LARGE_FILE_SIZE = 256 * 1024 * 1024
+
+
+class BenchmarkWalletKeyCache(TestCase):
+    def setUp(self):
+        wallet_key_cache.clear()
+        private_key = os.urandom(32)
+        self.wallet = SimpleNamespace(coldkey=SimpleNamespace(private_key=private_key))
+        self.password = bytes(private_key.hex(), "utf-8")
+
+    def tearDown(self):
+        wallet_key_cache.clear()
+
+    def encrypt_files(self, cached: bool):
+        files = [os.urandom(FILE_SIZE) for _ in range(N_FILES)]
+        start = time.perf_counter()
+        encrypted = []
+        for data in files:
+            if not cached:
+                wallet_key_cache.clear()
+            encrypted.append(encrypt_data(data, self.wallet))
+        return files, encrypted, (time.perf_counter() - start) / N_FILES
+
+    def test_encrypt_small_files(self):
+        _, _, uncached = self.encrypt_files(cached=False)
+        files, encrypted, cached = self.encrypt_files(cached=True)
+
+        print(
+            f"\nencrypt {FILE_SIZE} B file: KDF per call {uncached * 1000:.0f} ms, "
+            f"cached key {cached * 1000:.1f} ms ({uncached / cached:.0f}x)"
+        )
+        for data, (encrypted_data, payload) in zip(files, encrypted):
+            self.assertEqual(
+                data,
+                decrypt_data_with_private_key(encrypted_data, payload, self.password),
+            )
+        self.assertLess(cached * 10, uncached)
+
+
+class BenchmarkSegmentedEncryption(TestCase):
+    def test_encrypt_large_file(self):
+        private_key = os.urandom(32)
+        wallet = SimpleNamespace(coldkey=SimpleNamespace(private_key=private_key))
+        data = os.urandom(LARGE_FILE_SIZE)
+        # Derive the wallet key once so that only AES is measured
+        SegmentedEncryptor(wallet).payload()
+
+        start = time.perf_counter()
+        encrypt_data_with_aes_single_shot(data, wallet)
+        single_shot = time.perf_counter() - start
+
+        start = time.perf_counter()
+        encrypted_data, payload = encrypt_data(data, wallet)
+        segmented = time.perf_counter() - start
+
+        mib = LARGE_FILE_SIZE / 1024 / 1024
+        print(
+            f"\nencrypt {mib:.0f} MiB on {os.cpu_count()} CPUs: single shot {mib / single_shot:.0f} MiB/s, "
+            f"segmented {mib / segmented:.0f} MiB/s"
+        )
+        self.assertEqual(
+            data,
+            decrypt_data_with_private_key(
+                encrypted_data, payload, bytes(private_key.hex(), "utf-8")
+            ),
+        )
@@ -0,0 +1,88 @@
+import os
+import json
+import time
+import tracemalloc
+from unittest import TestCase
+
+from storage.shared.merkle import (
+    MerkleTree,
+    validate_merkle_proof,
+    validate_merkle_proofs,
+)
+
+
+N_LEAVES = 10**5
+N_PROOFS = 1000
+
+
+class BenchmarkMerkleTree(TestCase):
+    def setUp(self):
+        self.leaves = [os.urandom(32).hex() for _ in range(N_LEAVES)]
+
+    def build(self):
+        tree = MerkleTree()
+        tree.add_leaf(self.leaves)
+        tree.make_tree()
+        return tree
+
+    def test_build_prove_serialize(self):
+        start = time.perf_counter()
+        tree = self.build()
+        build = time.perf_counter() - start
+
+        tracemalloc.start()
+        self.build()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        root = tree.get_merkle_root()
+        indices = range(0, N_LEAVES, N_LEAVES // N_PROOFS)
+        start = time.perf_counter()
+        proofs = [tree.get_proof(index) for index in indices]
+        prove = (time.perf_counter() - start) / len(indices)
+
+        start = time.perf_counter()
+        serialized = tree.serialize()
+        restored = MerkleTree.deserialize(serialized)
+        roundtrip = time.perf_counter() - start
+
+        # The hex JSON format of earlier versions, for comparison
+        legacy = json.dumps(
+            {
+                "leaves": [tree.get_leaf(index) for index in range(N_LEAVES)],
+                "levels": [[node.hex() for node in level] for level in tree.levels],
+                "is_ready": True,
+            }
+        )
+
+        print(
+            f"\n{N_LEAVES} leaves: build {build * 1000:.0f} ms (peak {peak / 2**20:.1f} MiB), "
+            f"proof {prove * 10**6:.1f} us, serialize + deserialize {roundtrip * 1000:.1f} ms, "
+            f"binary {len(serialized) / 2**20:.1f} MiB vs JSON {len(legacy) / 2**20:.1f} MiB"
+        )
+
+        for index, proof in zip(indices, proofs):
+            self.assertTrue(validate_merkle_proof(proof, self.leaves[index], root))
+        self.assertEqual(tree, restored)
+        self.assertLess(len(serialized) * 3, len(legacy))
+
+    def test_batch_proof_validation(self):
+        tree = self.build()
+        root = tree.get_merkle_root()
+        indices = range(0, N_LEAVES, N_LEAVES // N_PROOFS)
+        pairs = [(tree.get_proof(index), self.leaves[index]) for index in indices]
+
+        start = time.perf_counter()
+        single = [validate_merkle_proof(proof, leaf, root) for proof, leaf in pairs]
+        one_by_one = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch = validate_merkle_proofs(pairs, root)
+        batched = time.perf_counter() - start
+
+        print(
+            f"\n{len(pairs)} proofs of {N_LEAVES} leaves: one by one {one_by_one * 1000:.1f} ms, "
+            f"batch {batched * 1000:.1f} ms ({one_by_one / batched:.1f}x)"
+        )
+        self.assertEqual(single, batch)
+        self.assertTrue(all(batch))
@@ -0,0 +1,170 @@
+import os
+import time
+import base64
+import asyncio
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase, skipUnless
+
+import torch
+from redis import asyncio as aioredis
+from redis import Redis
+
+from storage import protocol
+from storage.shared.ecc import ECCommitment, ecc_point_to_hex, setup_CRS
+from storage.validator.bonding import get_tier_factor, tier_cache, update_statistics
+from storage.validator.reward import create_reward_vector
+from storage.validator.verify import verify_store_with_seed
+
+
+REDIS_HOST = os.environ.get("BENCHMARK_REDIS_HOST", "localhost")
+REDIS_PORT = int(os.environ.get("BENCHMARK_REDIS_PORT", 6379))
+REDIS_DB = int(os.environ.get("BENCHMARK_REDIS_DB", 15))
+
+N_RESPONSES = 30
+CHUNK_SIZE = 1024**2
+
+
+def redis_available() -> bool:
+    try:
+        client = Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB)
+        # Never benchmark against a database that is in use
+        return client.ping() and client.dbsize() == 0
+    except Exception:
+        return False
+
+
+async def legacy_create_reward_vector(self, synapse, rewards, uids, responses, event):
+    # Verification on the event loop and one UID at a time, as before the worker pool
+    for idx, (uid, response) in enumerate(zip(uids, responses)):
+        hotkey = self.metagraph.hotkeys[uid]
+        success = verify_store_with_seed(response, synapse.encrypted_data, synapse.seed)
+        await update_statistics(hotkey, success, "store", self.database)
+        tier_factor = await get_tier_factor(hotkey, self.database)
+        rewards[idx] = 1.0 * tier_factor if success else 0.0
+        event.successful.append(success)
+        event.uids.append(uid)
+
+
+async def event_loop_lag(coroutine, interval=0.005):
+    """Runs a coroutine and returns how long it took and how long it kept the event loop blocked."""
+    lags = []
+
+    async def ticker():
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            lags.append(time.perf_counter() - start - interval)
+
+    ticking = asyncio.create_task(ticker())
+    await asyncio.sleep(interval)
+    try:
+        start = time.perf_counter()
+        await coroutine
+        elapsed = time.perf_counter() - start
+    finally:
+        ticking.cancel()
+    return elapsed, sum(lags)
+
+
+@skipUnless(redis_available(), "requires an empty local redis-server database")
+class BenchmarkRewardVector(TestCase):
+    def setUp(self):
+        tier_cache.invalidate()
+        g, h = setup_CRS()
+        data = os.urandom(CHUNK_SIZE)
+        seed = "b1e2"
+        self.synapse = protocol.Store(
+            encrypted_data=base64.b64encode(data).decode(),
+            curve="P-256",
+            g=ecc_point_to_hex(g),
+            h=ecc_point_to_hex(h),
+            seed=seed,
+        )
+        self.responses = []
+        for _ in range(N_RESPONSES):
+            c, m_val, r = ECCommitment(g, h).commit(data + seed.encode())
+            self.responses.append(
+                protocol.Store(
+                    encrypted_data="",
+                    curve="P-256",
+                    g=ecc_point_to_hex(g),
+                    h=ecc_point_to_hex(h),
+                    seed=seed,
+                    randomness=r,
+                    commitment=ecc_point_to_hex(c),
+                    commitment_hash=str(m_val),
+                )
+            )
+        self.uids = list(range(N_RESPONSES))
+
+    def tearDown(self):
+        Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB).flushdb()
+
+    def neuron(self, database):
+        return SimpleNamespace(
+            metagraph=SimpleNamespace(hotkeys=[f"hotkey{uid}" for uid in self.uids]),
+            database=database,
+            verify_executor=ThreadPoolExecutor(max_workers=4),
+        )
+
+    def event(self):
+        return SimpleNamespace(
+            successful=[],
+            uids=[],
+            completion_times=[],
+            task_status_messages=[],
+            task_status_codes=[],
+        )
+
+    def round(self, legacy: bool):
+        async def run():
+            database = aioredis.StrictRedis(
+                host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB
+            )
+            neuron, event = self.neuron(database), self.event()
+            rewards = torch.zeros(N_RESPONSES)
+            if legacy:
+                coroutine = legacy_create_reward_vector(
+                    neuron, self.synapse, rewards, self.uids, self.responses, event
+                )
+            else:
+
+                async def success(hotkey, idx, uid, response):
+                    pass
+
+                coroutine = create_reward_vector(
+                    neuron,
+                    self.synapse,
+                    rewards,
+                    self.uids,
+                    self.responses,
+                    event,
+                    success,
+                    lambda uid: None,
+                )
+            try:
+                elapsed, lag = await event_loop_lag(coroutine)
+            finally:
+                neuron.verify_executor.shutdown()
+                await database.connection_pool.disconnect()
+            return rewards, event, elapsed, lag
+
+        return asyncio.run(run())
+
+    def test_store_round(self):
+        expected, expected_event, legacy, legacy_lag = self.round(legacy=True)
+        Redis(host=REDIS_HOST, port=REDIS_PORT, db=REDIS_DB).flushdb()
+        tier_cache.invalidate()
+        rewards, event, pooled, pooled_lag = self.round(legacy=False)
+
+        print(
+            f"\n{N_RESPONSES}-response store round: "
+            f"legacy {legacy * 1000:.0f}ms (event loop blocked {legacy_lag * 1000:.0f}ms), "
+            f"pooled {pooled * 1000:.0f}ms (blocked {pooled_lag * 1000:.0f}ms)"
+        )
+        self.assertEqual([True] * N_RESPONSES, event.successful)
+        self.assertEqual(expected_event.successful, event.successful)
+        self.assertTrue(torch.equal(expected, rewards))
+        self.assertLess(pooled, legacy)
+        self.assertLess(pooled_lag, legacy_lag)
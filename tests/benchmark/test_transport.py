@@ -0,0 +1,51 @@
+import os
+import json
+import time
+import base64
+from unittest import TestCase
+
+from storage import protocol
+from storage.shared.transport import pack_payload, unpack_payload
+
+
+CHUNK_SIZE = 64 * 1024**2
+ROUNDS = 5
+
+
+class BenchmarkPayloadTransport(TestCase):
+    def test_binary_payloads_against_base64(self):
+        chunk = os.urandom(CHUNK_SIZE)
+        synapse = protocol.Store(
+            encrypted_data="", curve="P-256", g="g" * 66, h="h" * 66, seed="s" * 64
+        )
+
+        # Encoding on the validator and decoding on the miner, the network excluded
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            body = synapse.dict()
+            body["encrypted_data"] = base64.b64encode(chunk).decode()
+            legacy_body = json.dumps(body).encode()
+            legacy_chunk = base64.b64decode(json.loads(legacy_body)["encrypted_data"])
+        legacy = (time.perf_counter() - start) / ROUNDS
+
+        start = time.perf_counter()
+        for _ in range(ROUNDS):
+            pieces = pack_payload(json.dumps(synapse.dict()).encode(), chunk)
+            # The miner receives the body into a single buffer
+            binary_body = b"".join(pieces)
+            header, binary_chunk = unpack_payload(binary_body)
+            json.loads(header)
+        binary = (time.perf_counter() - start) / ROUNDS
+
+        mib = CHUNK_SIZE / 2**20
+        print(
+            f"\n{mib:.0f} MiB chunk: base64 JSON {mib / legacy:.0f} MiB/s, "
+            f"{len(legacy_body) / CHUNK_SIZE:.3f}x on the wire; "
+            f"binary {mib / binary:.0f} MiB/s, "
+            f"{len(binary_body) / CHUNK_SIZE:.3f}x on the wire"
+        )
+
+        self.assertEqual(chunk, legacy_chunk)
+        self.assertEqual(chunk, binary_chunk)
+        self.assertLess(len(binary_body), len(legacy_body))
+        self.assertLess(binary, legacy)
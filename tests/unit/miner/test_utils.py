@@ -0,0 +1,98 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from parameterized import parameterized
+
+from storage.shared.ecc import ECCommitment, setup_CRS
+from storage.shared.merkle import validate_merkle_proof
+from storage.shared.utils import chunk_data
+from storage.miner.utils import (
+    challenge_from_filesystem,
+    compute_subsequent_commitment,
+    compute_subsequent_commitment_streaming,
+    mmap_from_filesystem,
+)
+
+
+class TestStreamingChallenge(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _write(self, data):
+        path = os.path.join(self.tmpdir.name, "blob")
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    @parameterized.expand([(0,), (1,), (4096,), (3 * 1024 * 1024 + 7,)])
+    def test_streaming_subsequent_commitment_matches(self, size):
+        data = os.urandom(size)
+        path = self._write(data)
+
+        with mmap_from_filesystem(path) as mapped:
+            streamed = compute_subsequent_commitment_streaming(mapped, b"prev", b"next")
+
+        self.assertEqual(
+            compute_subsequent_commitment(data, b"prev", b"next"), streamed
+        )
+
+    @parameterized.expand(
+        [(0, True), (3, True), (9, True), (0, False), (3, False), (9, False)]
+    )
+    def test_challenge_from_filesystem(self, index, lazy):
+        chunk_size = 100
+        data = os.urandom(chunk_size * 9 + 42)
+        path = self._write(data)
+        committer = ECCommitment(*setup_CRS())
+
+        (
+            next_commitment,
+            proof,
+            randomness,
+            chunk,
+            point,
+            merkle_tree,
+        ) = challenge_from_filesystem(
+            path,
+            committer,
+            chunk_size=chunk_size,
+            index=index,
+            previous_seed=b"prev",
+            new_seed=b"next",
+            seed="seed",
+            lazy=lazy,
+        )
+
+        self.assertEqual(merkle_tree.get_leaf(index), point)
+        self.assertEqual(
+            (next_commitment, proof),
+            compute_subsequent_commitment(data, b"prev", b"next"),
+        )
+        self.assertEqual(list(chunk_data(data, chunk_size))[index], chunk)
+        self.assertTrue(
+            validate_merkle_proof(
+                merkle_tree.get_proof(index), point, merkle_tree.get_merkle_root()
+            )
+        )
+
+    def test_challenge_index_out_of_range(self):
+        path = self._write(os.urandom(250))
+        committer = ECCommitment(*setup_CRS())
+
+        _, _, randomness, chunk, point, _ = challenge_from_filesystem(
+            path,
+            committer,
+            chunk_size=100,
+            index=3,
+            previous_seed=b"prev",
+            new_seed=b"next",
+            seed="seed",
+        )
+
+        self.assertIsNone(randomness)
+        self.assertIsNone(chunk)
+        self.assertIsNone(point)
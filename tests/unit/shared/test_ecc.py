@@ -0,0 +1,82 @@
+import hashlib
+from unittest import TestCase
+from parameterized import parameterized
+
+from Crypto.Random import random
+
+from storage.shared.ecc import (
+    DataHasher,
+    ECCommitment,
+    FIXED_BASE_CURVES,
+    hash_data,
+    ecc_point_to_hex,
+    setup_CRS,
+)
+
+
+ORDER = FIXED_BASE_CURVES["P-256"][1]
+
+
+class TestECCommitment(TestCase):
+    def setUp(self):
+        self.g, self.h = setup_CRS()
+        self.reference = ECCommitment(self.g, self.h)
+
+    @parameterized.expand([[2], [4], [5], [8]])
+    def test_precomputed_points_are_identical(self, window):
+        committer = ECCommitment(self.g, self.h, precompute=True, window=window)
+        for _ in range(20):
+            m_val = random.randint(1, 2**256)
+            r = random.randint(1, 2**256)
+            self.assertEqual(
+                ecc_point_to_hex(self.g * m_val + self.h * r),
+                ecc_point_to_hex(committer._compute(m_val, r)),
+            )
+
+    @parameterized.expand(
+        [
+            [0, 1],
+            [1, 0],
+            [ORDER, 7],
+            [ORDER - 1, ORDER + 1],
+            [2**256, 2**256],
+        ]
+    )
+    def test_precomputed_edge_scalars(self, m_val, r):
+        committer = ECCommitment(self.g, self.h, precompute=True)
+        self.assertEqual(
+            ecc_point_to_hex(self.reference._compute(m_val, r)),
+            ecc_point_to_hex(committer._compute(m_val, r)),
+        )
+
+    def test_precomputed_infinity_and_doubling(self):
+        committer = ECCommitment(self.g, self.g, precompute=True)
+        self.assertEqual(self.g * 10, committer._compute(5, 5))
+        self.assertTrue(committer._compute(5, ORDER - 5).is_point_at_infinity())
+
+    def test_commit_many_open_many(self):
+        messages = [f"chunk {i}".encode() for i in range(10)]
+        committer = ECCommitment(self.g, self.h, precompute=True)
+
+        commitments, m_vals, rs = zip(*committer.commit_many(messages))
+
+        self.assertEqual([True] * 10, committer.open_many(commitments, m_vals, rs))
+        self.assertEqual([True] * 10, self.reference.open_many(commitments, m_vals, rs))
+        rs = (rs[0] + 1,) + rs[1:]
+        self.assertEqual(
+            [False] + [True] * 9, committer.open_many(commitments, m_vals, rs)
+        )
+
+
+class TestHashData(TestCase):
+    def test_incremental_hash_matches(self):
+        data = bytes(range(256)) * 100
+        hasher = DataHasher()
+        for i in range(0, len(data), 999):
+            hasher.update(memoryview(data)[i : i + 999])
+
+        expected = int(hashlib.sha3_256(data).hexdigest(), 16)
+        self.assertEqual(expected, hash_data(data))
+        self.assertEqual(expected, hash_data(memoryview(data)))
+        self.assertEqual(expected, hasher.value())
+        self.assertEqual(hash_data("text"), hash_data(b"text"))
@@ -0,0 +1,100 @@
+import os
+import json
+import hashlib
+from unittest import TestCase
+from parameterized import parameterized
+
+from storage.shared.merkle import (
+    MerkleTree,
+    validate_merkle_proof,
+    validate_merkle_proofs,
+)
+
+
+def reference_root(leaves):
+    # Pairs the nodes of each level, promoting a node without a sibling unchanged
+    level = [bytes.fromhex(leaf) for leaf in leaves]
+    while len(level) > 1:
+        paired = [
+            hashlib.sha3_256(level[i] + level[i + 1]).digest()
+            for i in range(0, len(level) - 1, 2)
+        ]
+        level = paired + level[len(paired) * 2 :]
+    return level[0].hex()
+
+
+def random_leaves(n):
+    # Commitment points and hashes of different sizes can be mixed in a tree
+    return [os.urandom(32 if i % 3 else 33).hex() for i in range(n)]
+
+
+class TestMerkleTree(TestCase):
+    def make_tree(self, leaves):
+        tree = MerkleTree()
+        tree.add_leaf(leaves)
+        tree.make_tree()
+        return tree
+
+    @parameterized.expand([[1], [2], [3], [7], [8], [13], [64], [100]])
+    def test_root_and_proofs(self, n):
+        leaves = random_leaves(n)
+        tree = self.make_tree(leaves)
+
+        root = tree.get_merkle_root()
+        self.assertEqual(reference_root(leaves), root)
+        for index, leaf in enumerate(leaves):
+            self.assertEqual(leaf, tree.get_leaf(index))
+            self.assertTrue(validate_merkle_proof(tree.get_proof(index), leaf, root))
+        self.assertIsNone(tree.get_proof(n))
+
+    @parameterized.expand([[1], [5], [6], [33]])
+    def test_update_leaf_matches_rebuild(self, n):
+        leaves = [os.urandom(32).hex() for _ in range(n)]
+        tree = self.make_tree(leaves)
+        for index in {0, n // 2, n - 1}:
+            leaves[index] = os.urandom(65).hex()
+            tree.update_leaf(index, leaves[index])
+            self.assertEqual(self.make_tree(leaves), tree)
+            self.assertEqual(reference_root(leaves), tree.get_merkle_root())
+
+    def test_serialization(self):
+        for leaves in [[], [os.urandom(32).hex() for _ in range(9)], random_leaves(9)]:
+            tree = self.make_tree(leaves)
+            restored = MerkleTree.deserialize(tree.serialize())
+            self.assertEqual(tree, restored)
+            self.assertEqual(tree.get_merkle_root(), restored.get_merkle_root())
+            self.assertEqual(tree.get_proof(4), restored.get_proof(4))
+
+        # Trees serialized as JSON by earlier versions
+        leaves = random_leaves(5)
+        legacy = json.dumps({"leaves": leaves, "levels": None, "is_ready": True})
+        self.assertEqual(self.make_tree(leaves), MerkleTree.deserialize(legacy))
+
+    def test_empty_tree(self):
+        tree = self.make_tree([])
+        self.assertIsNone(tree.get_merkle_root())
+        self.assertIsNone(tree.get_proof(0))
+
+
+class TestValidateMerkleProofs(TestCase):
+    def test_batch_matches_single_validation(self):
+        leaves = random_leaves(37)
+        tree = MerkleTree()
+        tree.add_leaf(leaves)
+        tree.make_tree()
+        root = tree.get_merkle_root()
+
+        pairs = [(tree.get_proof(index), leaf) for index, leaf in enumerate(leaves)]
+        pairs.append((tree.get_proof(3), leaves[4]))  # another leaf
+        pairs.append((tree.get_proof(5)[::-1], leaves[5]))  # reordered proof
+        pairs.append(([{"middle": "00"}], leaves[0]))  # malformed proof
+        pairs.append(([], root))  # the root alone
+
+        expected = [True] * len(leaves) + [False, False, False, True]
+        self.assertEqual(expected, validate_merkle_proofs(pairs, root))
+        for (proof, leaf), valid in zip(pairs[:-2], expected):
+            self.assertEqual(valid, validate_merkle_proof(proof, leaf, root))
+        self.assertEqual(
+            [False] * len(leaves),
+            validate_merkle_proofs(pairs[: len(leaves)], leaves[0]),
+        )
@@ -0,0 +1,44 @@
+from unittest import TestCase
+
+from storage.shared.subtensor import BlockCache
+
+
+class CountingSubtensor:
+    def __init__(self):
+        self.block = 100
+        self.calls = 0
+
+    def get_current_block(self):
+        self.calls += 1
+        return self.block
+
+    def get_block_hash(self, block):
+        self.calls += 1
+        return f"0x{block:064x}"
+
+
+class TestBlockCache(TestCase):
+    def test_fetches_once_per_block(self):
+        subtensor = CountingSubtensor()
+        cache = BlockCache(subtensor)
+
+        for _ in range(10):
+            self.assertEqual(100, cache.block)
+            self.assertEqual(f"0x{100:064x}", cache.block_hash)
+        self.assertEqual(2, subtensor.calls)
+
+    def test_update_from_subscription(self):
+        subtensor = CountingSubtensor()
+        cache = BlockCache(subtensor)
+
+        cache.update(101, "0xabc")
+        self.assertEqual(101, cache.block)
+        self.assertEqual("0xabc", cache.block_hash)
+        self.assertEqual(0, subtensor.calls)
+
+    def test_refreshes_stale_values(self):
+        subtensor = CountingSubtensor()
+        cache = BlockCache(subtensor, max_age=-1)
+
+        cache.update(99, "0xabc")
+        self.assertEqual(100, cache.block)
@@ -0,0 +1,149 @@
+import sys
+import json
+import base64
+import asyncio
+from unittest import TestCase
+from parameterized import parameterized
+
+from storage import protocol
+from storage.shared.transport import (
+    BINARY_CONTENT_TYPE,
+    PROTOCOL_VERSION,
+    BinaryPayloadMiddleware,
+    get_payload,
+    pack_payload,
+    payload_size,
+    set_payload,
+    unpack_payload,
+)
+
+
+async def axon_app(scope, receive, send):
+    # Answers like the miner: stores the Store payload, and returns it on Retrieve
+    message = await receive()
+    name = scope["path"].strip("/")
+    synapse = getattr(protocol, name)(**json.loads(message["body"]))
+    if name == "Store":
+        axon_app.stored = get_payload(synapse)
+    else:
+        set_payload(synapse, axon_app.stored)
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"application/json")],
+        }
+    )
+    await send({"type": "http.response.body", "body": synapse.json().encode()})
+
+
+def call_axon(name, body, headers):
+    sent = []
+    received = [{"type": "http.request", "body": body, "more_body": False}]
+
+    async def receive():
+        return received.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "path": f"/{name}", "headers": headers}
+    asyncio.run(BinaryPayloadMiddleware(axon_app)(scope, receive, send))
+    headers = dict(sent[0]["headers"])
+    return sent[0]["status"], headers, b"".join(m.get("body", b"") for m in sent[1:])
+
+
+def store_synapse(**kwargs):
+    return protocol.Store(curve="P-256", g="g", h="h", seed="seed", **kwargs)
+
+
+class TestPayloads(TestCase):
+    def setUp(self):
+        self.data = bytes(range(256)) * 10
+
+    def test_pack_and_unpack(self):
+        header = b'{"data_hash": "abc"}'
+        body = b"".join(pack_payload(header, self.data))
+        self.assertEqual((header, self.data), unpack_payload(body))
+        self.assertEqual(
+            (header, b""), unpack_payload(b"".join(pack_payload(header, b"")))
+        )
+
+        for truncated in [body[:4], body[:20]]:
+            with self.assertRaises(ValueError):
+                unpack_payload(truncated)
+
+    def test_payload_of_synapse(self):
+        synapse = store_synapse(encrypted_data="")
+        set_payload(synapse, self.data)
+        self.assertEqual("", synapse.encrypted_data)
+        self.assertEqual(self.data, get_payload(synapse))
+        self.assertEqual(self.data, get_payload(synapse.copy()))
+        self.assertNotIn(self.data, synapse.json().encode())
+
+        legacy = protocol.Retrieve(
+            data_hash="abc", seed="seed", data=base64.b64encode(self.data)
+        )
+        self.assertEqual(self.data, get_payload(legacy))
+        self.assertEqual(sys.getsizeof(legacy.data), payload_size(legacy))
+        self.assertIsNone(get_payload(protocol.Retrieve(data_hash="abc", seed="seed")))
+
+
+class TestBinaryPayloadMiddleware(TestCase):
+    def setUp(self):
+        self.data = bytes(range(256)) * 10
+
+    def test_binary_exchange(self):
+        header = store_synapse(encrypted_data="").json().encode()
+        status, headers, body = call_axon(
+            "Store",
+            b"".join(pack_payload(header, self.data)),
+            [
+                (b"content-type", BINARY_CONTENT_TYPE.encode()),
+                (b"x-storage-protocol", str(PROTOCOL_VERSION).encode()),
+            ],
+        )
+        self.assertEqual(200, status)
+        self.assertEqual(self.data, axon_app.stored)
+        self.assertEqual(str(PROTOCOL_VERSION).encode(), headers[b"x-storage-protocol"])
+
+        retrieve = protocol.Retrieve(data_hash="abc", seed="seed").json().encode()
+        status, headers, body = call_axon(
+            "Retrieve",
+            retrieve,
+            [
+                (b"content-type", b"application/json"),
+                (b"x-storage-protocol", str(PROTOCOL_VERSION).encode()),
+            ],
+        )
+        self.assertEqual(BINARY_CONTENT_TYPE.encode(), headers[b"content-type"])
+        self.assertEqual(str(len(body)).encode(), headers[b"content-length"])
+        header, payload = unpack_payload(body)
+        self.assertEqual(self.data, payload)
+        self.assertIsNone(json.loads(header)["data"])
+
+    @parameterized.expand([["Store"], ["Retrieve"]])
+    def test_legacy_exchange(self, name):
+        axon_app.stored = self.data
+        if name == "Store":
+            synapse = store_synapse(encrypted_data=base64.b64encode(b"legacy"))
+        else:
+            synapse = protocol.Retrieve(data_hash="abc", seed="seed")
+        status, headers, body = call_axon(
+            name, synapse.json().encode(), [(b"content-type", b"application/json")]
+        )
+
+        # The axon still advertises its protocol version
+        self.assertEqual(str(PROTOCOL_VERSION).encode(), headers[b"x-storage-protocol"])
+        self.assertEqual(b"application/json", headers[b"content-type"])
+        response = getattr(protocol, name)(**json.loads(body))
+        if name == "Store":
+            self.assertEqual(b"legacy", axon_app.stored)
+        else:
+            self.assertEqual(self.data, get_payload(response))
+
+    def test_rejects_truncated_body(self):
+        status, headers, body = call_axon(
+            "Store", b"\x00" * 4, [(b"content-type", BINARY_CONTENT_TYPE.encode())]
+        )
+        self.assertEqual(400, status)
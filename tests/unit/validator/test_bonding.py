@@ -0,0 +1,66 @@
+import numpy as np
+from unittest import TestCase
+
+from storage.constants import (
+    GOLD_TIER_TOTAL_SUCCESSES,
+    GOLD_WILSON_SCORE,
+    SUPER_SAIYAN_TIER_TOTAL_SUCCESSES,
+    SUPER_SAIYAN_WILSON_SCORE,
+)
+from storage.validator.bonding import (
+    TIERS,
+    TierCache,
+    assign_tiers,
+    wilson_score_interval,
+    wilson_score_intervals,
+)
+
+
+class TestTierComputation(TestCase):
+    def test_wilson_score_intervals_match_scalar(self):
+        successes = np.array([0, 0, 5, 9, 100, 4000])
+        totals = np.array([0, 10, 10, 10, 100, 5000])
+        expected = [wilson_score_interval(s, t) for s, t in zip(successes, totals)]
+        np.testing.assert_allclose(wilson_score_intervals(successes, totals), expected)
+
+    def test_assign_tiers(self):
+        wilson_scores = np.array(
+            [
+                0.0,
+                SUPER_SAIYAN_WILSON_SCORE,
+                SUPER_SAIYAN_WILSON_SCORE,
+                GOLD_WILSON_SCORE,
+            ]
+        )
+        total_successes = np.array(
+            [
+                SUPER_SAIYAN_TIER_TOTAL_SUCCESSES,
+                SUPER_SAIYAN_TIER_TOTAL_SUCCESSES,
+                GOLD_TIER_TOTAL_SUCCESSES,
+                SUPER_SAIYAN_TIER_TOTAL_SUCCESSES,
+            ]
+        )
+        tiers = [TIERS[i][0] for i in assign_tiers(wilson_scores, total_successes)]
+        self.assertEqual([b"Bronze", b"Super Saiyan", b"Gold", b"Gold"], tiers)
+
+
+class TestTierCache(TestCase):
+    def test_get_set_invalidate(self):
+        cache = TierCache()
+        self.assertIsNone(cache.get("miner"))
+        cache.set("miner", b"Gold", b"1024")
+        self.assertEqual((b"Gold", 1024), cache.get("miner"))
+        cache.invalidate("miner")
+        self.assertIsNone(cache.get("miner"))
+
+    def test_update_replaces_entries(self):
+        cache = TierCache()
+        cache.set("stale", b"Gold", 1024)
+        cache.update({"miner": (b"Ruby", 2048)})
+        self.assertIsNone(cache.get("stale"))
+        self.assertEqual((b"Ruby", 2048), cache.get("miner"))
+
+    def test_entries_expire(self):
+        cache = TierCache(ttl=-1)
+        cache.set("miner", b"Gold", 1024)
+        self.assertIsNone(cache.get("miner"))
@@ -1,6 +1,12 @@
+import os
+import asyncio
 from unittest import TestCase
 
-from storage.validator.challenge import _filter_verified_responses
+from storage.validator.challenge import (
+    ChallengeWindow,
+    challenge_timeout,
+    _filter_verified_responses,
+)
 
 
 class TestChallenge(TestCase):
@@ -29,3 +35,44 @@ class TestChallenge(TestCase):
 
         self.assertEqual((19, 14, 9), uids)
         self.assertEqual((1, 4, 7), responses)
+
+
+class TestChallengeWindow(TestCase):
+    def test_challenge_timeout_scales_with_data_size(self):
+        self.assertEqual(10.0, challenge_timeout(0))
+        self.assertAlmostEqual(11.0, challenge_timeout(4 * 1024**2))
+        self.assertEqual(45.0, challenge_timeout(1024**4))
+
+    def test_capacity_is_bounded_by_inflight_bytes(self):
+        window = ChallengeWindow(min_k=10, max_concurrency=100, max_inflight_bytes=1000)
+        self.assertEqual(10, window.capacity())
+        window.record_response(400)
+        self.assertEqual(2, window.capacity())
+
+    def test_adapt_backs_off_when_cpu_is_saturated(self):
+        window = ChallengeWindow(min_k=2, max_concurrency=64, target_cpu=0.5)
+        window.k = 16
+        # Pretend every core was busy for the whole interval
+        window._cpu -= 10 * (os.cpu_count() or 1)
+        window._wall -= 10
+        window.adapt()
+        self.assertEqual(8, window.k)
+        # ...and an idle one
+        window._wall -= 10
+        window.adapt()
+        self.assertEqual(9, window.k)
+
+    def test_harvest_leaves_slow_challenges_in_flight(self):
+        async def run():
+            window = ChallengeWindow()
+            window.launch(1, asyncio.sleep(0, result="fast"))
+            window.launch(2, asyncio.sleep(10, result="slow"))
+            completed = await window.harvest(timeout=0.1)
+            in_flight = window.in_flight_uids
+            for task in window.tasks:
+                task.cancel()
+            return completed, in_flight
+
+        completed, in_flight = asyncio.run(run())
+        self.assertEqual([(1, "fast")], completed)
+        self.assertEqual([2], in_flight)
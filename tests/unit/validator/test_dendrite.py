@@ -0,0 +1,212 @@
+import json
+import base64
+import asyncio
+from unittest import TestCase
+from unittest.mock import patch
+from multidict import CIMultiDict
+
+import bittensor as bt
+
+from storage import protocol
+from storage.shared.transport import (
+    BINARY_CONTENT_TYPE,
+    BinaryPayloadMiddleware,
+    get_payload,
+    set_payload,
+)
+from storage.validator.dendrite import timed_dendrite
+from storage.validator.liveness import LivenessTable
+
+
+class StalledResponse:
+    async def __aenter__(self):
+        await asyncio.sleep(10)
+
+    async def __aexit__(self, *args):
+        return False
+
+
+class StalledSession:
+    def post(self, url, timeout, **kwargs):
+        return StalledResponse()
+
+    async def close(self):
+        pass
+
+
+class Miner:
+    """An ASGI app that answers pings, Store and Retrieve requests like the miner."""
+
+    def __init__(self, legacy=False):
+        self.legacy = legacy
+        self.stored = None
+
+    async def __call__(self, scope, receive, send):
+        message = await receive()
+        name = scope["path"].strip("/")
+        synapse = getattr(protocol, name, bt.Synapse)(**json.loads(message["body"]))
+        if name == "Store":
+            self.stored = get_payload(synapse)
+            synapse.encrypted_data = ""
+        elif name == "Retrieve" and self.legacy:
+            synapse.data = base64.b64encode(self.stored)
+        elif name == "Retrieve":
+            set_payload(synapse, self.stored)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"application/json")],
+            }
+        )
+        await send({"type": "http.response.body", "body": synapse.json().encode()})
+
+
+class AsgiResponse:
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = CIMultiDict(headers)
+        self.content_type = self.headers["content-type"].split(";")[0]
+        self.body = body
+
+    async def read(self):
+        return self.body
+
+    async def json(self):
+        return json.loads(self.body)
+
+
+class AsgiRequest:
+    def __init__(self, response):
+        self.response = response
+
+    async def __aenter__(self):
+        return await self.response
+
+    async def __aexit__(self, *args):
+        return False
+
+
+class AsgiSession:
+    """Sends the requests of a dendrite to an ASGI app instead of the network."""
+
+    def __init__(self, app):
+        self.app = app
+        self.content_types = []
+
+    def post(self, url, timeout, headers, json=None, data=None):
+        return AsgiRequest(self.request(url, headers, json, data))
+
+    async def request(self, url, headers, payload, data):
+        if data is None:
+            body = json.dumps(payload).encode()
+            headers = {**headers, "Content-Type": "application/json"}
+        else:
+            body = b"".join([piece async for piece in data])
+        self.content_types.append(headers["Content-Type"])
+        received = [{"type": "http.request", "body": body, "more_body": False}]
+        sent = []
+
+        async def receive():
+            return received.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {
+            "type": "http",
+            "path": "/" + url.rsplit("/", 1)[1],
+            "headers": [
+                (key.lower().encode(), str(value).encode())
+                for key, value in headers.items()
+            ],
+        }
+        await self.app(scope, receive, send)
+        return AsgiResponse(
+            sent[0]["status"],
+            [(key.decode(), value.decode()) for key, value in sent[0]["headers"]],
+            b"".join(message.get("body", b"") for message in sent[1:]),
+        )
+
+    async def close(self):
+        pass
+
+
+class TestTimedDendrite(TestCase):
+    def setUp(self):
+        keypair = bt.Keypair.create_from_mnemonic(bt.Keypair.generate_mnemonic())
+        self.liveness = LivenessTable()
+        # The dendrite looks its external IP up on the network
+        with patch(
+            "bittensor.utils.networking.get_external_ip", return_value="127.0.0.1"
+        ):
+            self.dendrite = timed_dendrite(wallet=keypair, liveness=self.liveness)
+        self.axon = bt.AxonInfo(
+            version=1,
+            ip="127.0.0.1",
+            port=8091,
+            ip_type=4,
+            hotkey="miner",
+            coldkey="coldkey",
+        )
+        self.data = bytes(range(256)) * 10
+
+    def store_and_retrieve(self, session):
+        store = protocol.Store(
+            encrypted_data="", curve="P-256", g="g", h="h", seed="seed"
+        )
+        set_payload(store, self.data)
+        retrieve = protocol.Retrieve(data_hash="abc", seed="seed")
+
+        async def exchange():
+            self.dendrite._session = session
+            await self.dendrite.call(self.axon, bt.Synapse(), deserialize=False)
+            await self.dendrite.call(self.axon, store, deserialize=False)
+            return await self.dendrite.call(self.axon, retrieve, deserialize=False)
+
+        return asyncio.run(exchange())
+
+    def test_payloads_are_sent_as_raw_bytes(self):
+        miner = Miner()
+        session = AsgiSession(BinaryPayloadMiddleware(miner))
+        response = self.store_and_retrieve(session)
+
+        # The ping taught the dendrite that the miner supports raw bytes
+        self.assertIn("miner", self.dendrite.binary_hotkeys)
+        self.assertEqual(
+            ["application/json", BINARY_CONTENT_TYPE, "application/json"],
+            session.content_types,
+        )
+        self.assertEqual(self.data, miner.stored)
+        self.assertIsNone(response.data)
+        self.assertEqual(self.data, get_payload(response))
+
+    def test_payloads_are_base64_encoded_for_older_miners(self):
+        miner = Miner(legacy=True)
+        session = AsgiSession(miner)
+        response = self.store_and_retrieve(session)
+
+        self.assertNotIn("miner", self.dendrite.binary_hotkeys)
+        self.assertEqual(["application/json"] * 3, session.content_types)
+        self.assertEqual(self.data, miner.stored)
+        self.assertEqual(self.data, get_payload(response))
+
+    def test_cancelled_call_is_cancelled_and_not_recorded(self):
+        dendrite = self.dendrite
+        dendrite._session = StalledSession()
+        axon = self.axon
+        liveness = self.liveness
+
+        async def cancel_call():
+            call = asyncio.create_task(
+                dendrite.call(axon, bt.Synapse(), timeout=10, deserialize=False)
+            )
+            await asyncio.sleep(0.05)
+            call.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await call
+            return call
+
+        call = asyncio.run(cancel_call())
+        self.assertTrue(call.cancelled())
+        self.assertIsNone(liveness.status("miner"))
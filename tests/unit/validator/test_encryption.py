@@ -1,9 +1,23 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
 from unittest import TestCase
+from unittest.mock import patch
 
 from nacl import pwhash, secret
 
 import os
 
+from storage.validator import encryption
+from storage.validator.encryption import (
+    SegmentedDecryptor,
+    SegmentedEncryptor,
+    WalletKeyCache,
+    decrypt_data_with_private_key,
+    encrypt_data_with_aes_single_shot,
+)
+
 
 TEST_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_DIR = os.path.abspath(os.path.join(TEST_DIR, os.pardir))
@@ -47,3 +61,144 @@ class TestStoreCommand(TestCase):
 
         self.assertEquals(raw_data, decrypted_data)
         """
+
+
+class TestSegmentedEncryption(TestCase):
+    def setUp(self):
+        self.private_key = os.urandom(32)
+        self.wallet = SimpleNamespace(
+            coldkey=SimpleNamespace(private_key=self.private_key)
+        )
+        self.data = os.urandom(10_000)
+
+    def decrypt(self, encrypted_data, payload):
+        return decrypt_data_with_private_key(
+            encrypted_data, payload, bytes(self.private_key.hex(), "utf-8")
+        )
+
+    def test_stream_decrypts_like_one_shot_encryption(self):
+        encryptor = SegmentedEncryptor(self.wallet, segment_size=1024)
+        pieces = [self.data[i : i + 3000] for i in range(0, len(self.data), 3000)]
+
+        async def encrypt():
+            return [
+                segment async for segment in encryptor.encrypt_stream(pieces, window=3)
+            ]
+
+        segments = asyncio.run(encrypt())
+        encrypted_data = b"".join(segments)
+        self.assertEqual(10, len(segments))
+        self.assertEqual(encryptor.ciphertext_size(len(self.data)), len(encrypted_data))
+        self.assertEqual(encryptor.encrypt(self.data), encrypted_data)
+        self.assertEqual(self.data, self.decrypt(encrypted_data, encryptor.payload()))
+
+    def test_stream_decryption(self):
+        encryptor = SegmentedEncryptor(self.wallet, segment_size=1024)
+        encrypted_data = encryptor.encrypt(self.data)
+        decryptor = SegmentedDecryptor(
+            {
+                "aes_key": encryptor.aes_key.hex(),
+                "nonce_prefix": encryptor.nonce_prefix.hex(),
+                "segment_size": 1024,
+            }
+        )
+
+        async def decrypt(pieces):
+            return b"".join(
+                [segment async for segment in decryptor.decrypt_stream(pieces)]
+            )
+
+        pieces = [
+            encrypted_data[i : i + 777] for i in range(0, len(encrypted_data), 777)
+        ]
+        self.assertEqual(self.data, asyncio.run(decrypt(pieces)))
+
+        # Cut at a segment boundary: the last segment is not marked as final
+        with self.assertRaises(ValueError):
+            asyncio.run(decrypt([encrypted_data[: 4 * (1024 + 16)]]))
+
+        # Reordered segments
+        segments = [
+            encrypted_data[i : i + 1040] for i in range(0, len(encrypted_data), 1040)
+        ]
+        segments[0], segments[1] = segments[1], segments[0]
+        with self.assertRaises(ValueError):
+            asyncio.run(decrypt(segments))
+
+    def test_empty_data(self):
+        encryptor = SegmentedEncryptor(self.wallet)
+        encrypted_data = encryptor.encrypt(b"")
+        self.assertEqual(encryptor.ciphertext_size(0), len(encrypted_data))
+        self.assertEqual(b"", self.decrypt(encrypted_data, encryptor.payload()))
+
+    def test_legacy_single_shot_format_still_decrypts(self):
+        encrypted_data, payload = encrypt_data_with_aes_single_shot(
+            self.data, self.wallet
+        )
+        self.assertEqual(self.data, self.decrypt(encrypted_data, payload))
+
+
+class TestWalletKeyCache(TestCase):
+    def test_keys_are_derived_once_and_wiped(self):
+        derivations = []
+
+        def derive(password):
+            derivations.append(password)
+            return bytes(reversed(password))
+
+        cache = WalletKeyCache()
+        with patch.object(encryption, "derive_wallet_key", derive):
+            self.assertEqual(b"321", cache.get(b"123"))
+            self.assertEqual(b"321", cache.get(b"123"))
+            self.assertEqual([b"123"], derivations)
+
+            ((key, _),) = cache._keys.values()
+            cache.clear()
+            self.assertEqual(bytearray(3), key)
+
+            cache.get(b"123")
+            self.assertEqual(2, len(derivations))
+
+    def test_expired_keys_are_derived_again(self):
+        cache = WalletKeyCache(ttl=-1)
+        with patch.object(encryption, "derive_wallet_key", lambda password: b"key"):
+            cache.get(b"123")
+            ((key, _),) = cache._keys.values()
+            cache.purge()
+            self.assertEqual({}, cache._keys)
+            self.assertEqual(bytearray(3), key)
+
+    def test_expired_keys_of_other_wallets_are_wiped(self):
+        cache = WalletKeyCache(ttl=-1)
+        with patch.object(encryption, "derive_wallet_key", lambda password: b"key"):
+            cache.get(b"123")
+            ((key, _),) = cache._keys.values()
+            cache.get(b"456")
+            self.assertEqual(bytearray(3), key)
+            self.assertEqual(1, len(cache._keys))
+
+    def test_derivations_do_not_block_other_wallets(self):
+        started, release = threading.Event(), threading.Event()
+        derivations = []
+
+        def derive(password):
+            derivations.append(password)
+            if password == b"slow":
+                started.set()
+                release.wait(10)
+            return bytes(reversed(password))
+
+        cache = WalletKeyCache()
+        with patch.object(encryption, "derive_wallet_key", derive):
+            cache.get(b"fast")
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                slow = [executor.submit(cache.get, b"slow") for _ in range(2)]
+                started.wait(10)
+                # A cached key and another derivation are not held up by the slow one
+                self.assertEqual(b"tsaf", cache.get(b"fast"))
+                self.assertEqual(b"rehto", cache.get(b"other"))
+                release.set()
+                self.assertEqual(
+                    [b"wols", b"wols"], [future.result() for future in slow]
+                )
+        self.assertEqual([b"fast", b"slow", b"other"], derivations)
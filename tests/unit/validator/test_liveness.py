@@ -0,0 +1,80 @@
+import asyncio
+from types import SimpleNamespace
+from unittest import TestCase
+
+from storage.validator.liveness import LivenessTable
+from storage.validator.network import ping_uids
+
+
+class FakeDendrite:
+    def __init__(self, liveness, down_hotkeys):
+        self.liveness = liveness
+        self.down_hotkeys = down_hotkeys
+        self.pinged = []
+
+    async def __call__(self, axons, synapse, deserialize, timeout):
+        responses = []
+        for axon in axons:
+            self.pinged.append(axon.hotkey)
+            status_code = 408 if axon.hotkey in self.down_hotkeys else 200
+            self.liveness.record(axon.hotkey, status_code == 200, rtt=0.1)
+            responses.append(
+                SimpleNamespace(dendrite=SimpleNamespace(status_code=status_code))
+            )
+        return responses
+
+
+class TestLivenessTable(TestCase):
+    def test_status(self):
+        table = LivenessTable(ttl=60, failure_ttl=60)
+        self.assertIsNone(table.status("miner"))
+
+        table.record("miner", success=True, rtt=0.5)
+        self.assertTrue(table.status("miner"))
+        self.assertEqual(0.5, table.rtt("miner"))
+
+        table.record("miner", success=False)
+        self.assertFalse(table.status("miner"))
+
+        table.record("miner", success=True, rtt=0.2)
+        self.assertTrue(table.status("miner"))
+
+    def test_stale_entries_need_a_ping(self):
+        table = LivenessTable(ttl=-1, failure_ttl=-1)
+        table.record("up", success=True)
+        table.record("down", success=False)
+        self.assertIsNone(table.status("up"))
+        self.assertIsNone(table.status("down"))
+
+    def test_ping_uids_only_pings_unknown_miners(self):
+        hotkeys = [f"hotkey{uid}" for uid in range(6)]
+        liveness = LivenessTable()
+        dendrite = FakeDendrite(liveness, down_hotkeys={"hotkey1", "hotkey4"})
+        neuron = SimpleNamespace(
+            metagraph=SimpleNamespace(
+                hotkeys=hotkeys,
+                axons=[SimpleNamespace(hotkey=hotkey) for hotkey in hotkeys],
+            ),
+            dendrite=dendrite,
+            liveness=liveness,
+        )
+        liveness.record("hotkey0", success=True)
+        liveness.record("hotkey1", success=False)
+
+        successful, failed = asyncio.run(ping_uids(neuron, list(range(6))))
+        self.assertEqual([0, 2, 3, 5], sorted(successful))
+        self.assertEqual([1, 4], sorted(failed))
+        self.assertEqual(["hotkey2", "hotkey3", "hotkey4", "hotkey5"], dendrite.pinged)
+
+        # Every miner is known now
+        self.assertEqual(
+            (sorted(successful), sorted(failed)),
+            tuple(
+                sorted(uids) for uids in asyncio.run(ping_uids(neuron, list(range(6))))
+            ),
+        )
+        self.assertEqual(4, len(dendrite.pinged))
+
+        # Unless the table is bypassed, as monitor() does
+        asyncio.run(ping_uids(neuron, [0], use_liveness=False))
+        self.assertEqual(5, len(dendrite.pinged))
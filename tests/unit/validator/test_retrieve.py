@@ -0,0 +1,242 @@
+import time
+import asyncio
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest.mock import patch
+
+import bittensor as bt
+
+from storage import protocol
+from storage.shared.ecc import hash_data
+from storage.shared.transport import set_payload
+from storage.validator import retrieve
+from storage.validator.liveness import LatencyTracker, LivenessTable
+
+
+CHUNK = b"encrypted chunk"
+
+
+class FakeDendrite:
+    def __init__(self, delays, chunks, corrupt=(), undecodable=()):
+        self.delays = delays
+        self.chunks = chunks
+        self.corrupt = corrupt
+        self.undecodable = undecodable
+        self.queried = []
+        self.cancelled = []
+        self.in_flight = 0
+
+    async def __call__(self, axons, synapse, deserialize, timeout):
+        hotkey = axons[0].hotkey
+        self.queried.append(hotkey)
+        self.in_flight += 1
+        try:
+            await asyncio.sleep(self.delays[hotkey])
+        except asyncio.CancelledError:
+            self.cancelled.append(hotkey)
+            raise
+        finally:
+            self.in_flight -= 1
+        data = (
+            b"corrupted" if hotkey in self.corrupt else self.chunks[synapse.data_hash]
+        )
+        response = protocol.Retrieve(
+            data_hash=synapse.data_hash,
+            seed=synapse.seed,
+            axon=bt.TerminalInfo(hotkey=hotkey),
+            dendrite=bt.TerminalInfo(status_code=200),
+        )
+        if hotkey in self.undecodable:
+            # Invalid base64 from a miner that does not send raw bytes
+            response.data = "abc"
+        else:
+            set_payload(response, data)
+        return [response]
+
+
+def make_neuron(dendrite, rtts, hedge_delay, window=4):
+    hotkeys = list(dendrite.delays)
+    liveness = LivenessTable()
+    for hotkey, rtt in zip(hotkeys, rtts):
+        liveness.record(hotkey, success=True, rtt=rtt)
+    return SimpleNamespace(
+        config=SimpleNamespace(
+            neuron=SimpleNamespace(
+                retrieve_window=window,
+                retrieve_hedge_percentile=90.0,
+                retrieve_hedge_delay=hedge_delay,
+            )
+        ),
+        metagraph=SimpleNamespace(
+            hotkeys=hotkeys,
+            axons=[SimpleNamespace(hotkey=hotkey) for hotkey in hotkeys],
+        ),
+        dendrite=dendrite,
+        liveness=liveness,
+        retrieve_latency=LatencyTracker(),
+        database=None,
+        device="cpu",
+    )
+
+
+def run_retrieval(neuron, metadata, coroutine):
+    async def ping_uids(self, uids):
+        return uids, []
+
+    async def create_reward_vector(
+        self, synapse, rewards, uids, responses, event, *callbacks
+    ):
+        event.uids.extend(uids)
+
+    async def run():
+        with patch.object(
+            retrieve, "get_ordered_metadata", return_value=metadata
+        ), patch.object(
+            retrieve, "retrieve_encryption_payload", return_value={}
+        ), patch.object(
+            retrieve, "ping_uids", ping_uids
+        ), patch.object(
+            retrieve, "verify_retrieve_with_seed", return_value=True
+        ), patch.object(
+            retrieve, "current_block", return_value=1
+        ), patch.object(
+            retrieve, "create_reward_vector", create_reward_vector
+        ), patch.object(
+            retrieve, "apply_reward_scores"
+        ):
+            try:
+                return await coroutine()
+            finally:
+                await asyncio.gather(*retrieve._background_tasks)
+
+    return asyncio.run(run())
+
+
+class TestHedgedRetrieval(TestCase):
+    def retrieve(self, delays, rtts, hedge_delay=0.05, corrupt=(), undecodable=()):
+        chunk_hash = str(hash_data(CHUNK))
+        dendrite = FakeDendrite(
+            delays, {chunk_hash: CHUNK}, corrupt=corrupt, undecodable=undecodable
+        )
+        neuron = make_neuron(dendrite, rtts, hedge_delay)
+        metadata = [
+            {"chunk_hash": chunk_hash, "size": len(CHUNK), "hotkeys": list(delays)}
+        ]
+
+        async def timed_retrieval():
+            start = time.perf_counter()
+            data, _ = await retrieve.retrieve_broadband(neuron, "full_hash")
+            return data, time.perf_counter() - start
+
+        data, elapsed = run_retrieval(neuron, metadata, timed_retrieval)
+        return dendrite, data, elapsed
+
+    def test_fastest_replica_is_queried_alone(self):
+        dendrite, data, _ = self.retrieve(
+            {"slow": 0.0, "fast": 0.0}, rtts=[1.0, 0.1], hedge_delay=1.0
+        )
+        self.assertEqual(CHUNK, data)
+        self.assertEqual(["fast"], dendrite.queried)
+
+    def test_slow_replica_is_hedged_and_cancelled(self):
+        dendrite, data, elapsed = self.retrieve(
+            {"stalled": 10.0, "healthy": 0.01}, rtts=[0.1, 0.2]
+        )
+        self.assertEqual(CHUNK, data)
+        self.assertEqual(["stalled", "healthy"], dendrite.queried)
+        self.assertEqual(["stalled"], dendrite.cancelled)
+        self.assertLess(elapsed, 1.0)
+
+    def test_corrupted_chunk_is_rejected(self):
+        dendrite, data, _ = self.retrieve(
+            {"liar": 0.0, "honest": 0.0},
+            rtts=[0.1, 0.2],
+            hedge_delay=10.0,
+            corrupt={"liar"},
+        )
+        self.assertEqual(CHUNK, data)
+        self.assertEqual(["liar", "honest"], dendrite.queried)
+
+    def test_undecodable_chunk_is_rejected(self):
+        dendrite, data, _ = self.retrieve(
+            {"liar": 0.0, "honest": 0.0},
+            rtts=[0.1, 0.2],
+            hedge_delay=10.0,
+            undecodable={"liar"},
+        )
+        self.assertEqual(CHUNK, data)
+        self.assertEqual(["liar", "honest"], dendrite.queried)
+
+
+class TestRetrievalStream(TestCase):
+    def setUp(self):
+        # Earlier chunks are slower, so they complete in reverse order
+        self.chunks = [f"chunk {i}".encode() for i in range(6)]
+        self.hashes = [str(hash_data(chunk)) for chunk in self.chunks]
+        delays = {f"hotkey{i}": 0.01 * (6 - i) for i in range(6)}
+        self.dendrite = FakeDendrite(delays, dict(zip(self.hashes, self.chunks)))
+        self.metadata = [
+            {"chunk_hash": chunk_hash, "size": 7, "hotkeys": [f"hotkey{i}"]}
+            for i, chunk_hash in enumerate(self.hashes)
+        ]
+
+    def test_chunks_are_yielded_in_order(self):
+        neuron = make_neuron(self.dendrite, rtts=[], hedge_delay=1.0, window=3)
+
+        async def stream():
+            return [
+                chunk
+                async for chunk in retrieve.retrieve_broadband_stream(
+                    neuron, "full_hash"
+                )
+            ]
+
+        self.assertEqual(self.chunks, run_retrieval(neuron, self.metadata, stream))
+
+    def test_missing_chunk_stops_the_stream(self):
+        neuron = make_neuron(self.dendrite, rtts=[], hedge_delay=1.0)
+        self.metadata[1]["hotkeys"] = []
+
+        async def stream():
+            received = []
+            with self.assertRaises(ValueError):
+                async for chunk in retrieve.retrieve_broadband_stream(
+                    neuron, "full_hash"
+                ):
+                    received.append(chunk)
+            return received
+
+        self.assertEqual(self.chunks[:1], run_retrieval(neuron, self.metadata, stream))
+
+    def test_closing_the_stream_cancels_every_request(self):
+        # Every chunk but the first has a stalled replica holder and a hedge
+        for i, metadata in enumerate(self.metadata[1:], 1):
+            metadata["hotkeys"] = ["stalled", f"hotkey{i}"]
+        self.dendrite.delays.update(
+            {f"hotkey{i}": 10.0 for i in range(1, 6)}, stalled=10.0
+        )
+        self.dendrite.delays["hotkey0"] = 0.0
+        neuron = make_neuron(self.dendrite, rtts=[], hedge_delay=0.01, window=3)
+
+        async def stream():
+            chunks = retrieve.retrieve_broadband_stream(neuron, "full_hash")
+            first = await chunks.__anext__()
+            await asyncio.sleep(0.05)
+            in_flight = self.dendrite.in_flight
+            await chunks.aclose()
+            return first, in_flight
+
+        first, in_flight = run_retrieval(neuron, self.metadata, stream)
+        self.assertEqual(self.chunks[0], first)
+        self.assertGreater(in_flight, 0)
+        self.assertEqual(0, self.dendrite.in_flight)
+        self.assertEqual(len(self.dendrite.queried) - 1, len(self.dendrite.cancelled))
+
+
+class TestLatencyTracker(TestCase):
+    def test_percentile(self):
+        tracker = LatencyTracker(window=100, min_samples=10)
+        self.assertEqual(5.0, tracker.percentile(90, default=5.0))
+        for latency in range(1, 101):
+            tracker.observe(latency / 100)
+        self.assertAlmostEqual(0.901, tracker.percentile(90, default=5.0))
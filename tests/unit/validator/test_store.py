@@ -0,0 +1,187 @@
+import asyncio
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest.mock import patch
+
+from storage.shared.ecc import hash_data
+from storage.shared.utils import read_chunks
+from storage.validator import store
+from storage.validator.cid import CIDHasher, generate_cid_string
+
+
+N_UIDS = 12
+CHUNK_SIZE = 1000
+
+
+class FakeDendrite:
+    def __init__(self, failing=()):
+        self.failing = failing
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.stored = {}
+
+    async def __call__(self, axons, synapse, deserialize, timeout):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        responses = []
+        for axon in axons:
+            if axon.hotkey not in self.failing:
+                self.stored.setdefault(axon.hotkey, []).append(synapse.encrypted_data)
+            responses.append(SimpleNamespace(hotkey=axon.hotkey, seed=synapse.seed))
+        return responses
+
+
+class TestStoreBroadbandStream(TestCase):
+    def store(self, source, dendrite, data_size=None, data_hash=None, existing=()):
+        hotkeys = [f"hotkey{uid}" for uid in range(N_UIDS)]
+        neuron = SimpleNamespace(
+            config=SimpleNamespace(
+                neuron=SimpleNamespace(
+                    profile=False,
+                    store_window=2,
+                    curve="P-256",
+                    data_ttl=60,
+                )
+            ),
+            metagraph=SimpleNamespace(
+                hotkeys=hotkeys,
+                axons=[SimpleNamespace(hotkey=hotkey) for hotkey in hotkeys],
+            ),
+            dendrite=dendrite,
+            database=None,
+            device="cpu",
+        )
+        stored_chunks, file_mapping = {}, {}
+
+        async def ping_uids(self, uids):
+            return list(uids), []
+
+        async def ping_and_retry_uids(self, k, max_retries, exclude_uids):
+            return list(range(N_UIDS)), []
+
+        async def get_available_query_miners(self, k, exclude=None):
+            return [uid for uid in range(N_UIDS) if uid not in (exclude or [])][:k]
+
+        async def create_reward_vector(
+            self, synapse, rewards, uids, responses, event, success, failure
+        ):
+            for idx, (uid, response) in enumerate(zip(uids, responses)):
+                if response.hotkey in dendrite.failing:
+                    failure(uid)
+                else:
+                    await success(response.hotkey, idx, uid, response)
+
+        async def store_chunk_metadata(
+            full_hash, chunk_hash, hotkeys, chunk_size, database
+        ):
+            stored_chunks[chunk_hash] = hotkeys
+
+        async def store_file_chunk_mapping_ordered(full_hash, chunk_hashes, **kwargs):
+            file_mapping[full_hash] = chunk_hashes
+
+        async def nothing(*args, **kwargs):
+            return False
+
+        async def get_ordered_metadata(full_hash, database):
+            return [{"chunk_hash": "existing"}] if full_hash in existing else None
+
+        async def run():
+            with patch.object(store, "ping_uids", ping_uids), patch.object(
+                store, "ping_and_retry_uids", ping_and_retry_uids
+            ), patch.object(
+                store, "get_available_query_miners", get_available_query_miners
+            ), patch.object(
+                store, "optimal_chunk_size", return_value=CHUNK_SIZE
+            ), patch.object(
+                store, "create_reward_vector", create_reward_vector
+            ), patch.object(
+                store, "apply_reward_scores"
+            ), patch.object(
+                store, "current_block", return_value=1
+            ), patch.object(
+                store, "hotkey_at_capacity", nothing
+            ), patch.object(
+                store, "add_metadata_to_hotkey", nothing
+            ), patch.object(
+                store, "get_ordered_metadata", get_ordered_metadata
+            ), patch.object(
+                store, "store_chunk_metadata", store_chunk_metadata
+            ), patch.object(
+                store,
+                "store_file_chunk_mapping_ordered",
+                store_file_chunk_mapping_ordered,
+            ):
+                return await store.store_broadband_stream(
+                    neuron,
+                    source,
+                    {},
+                    data_size=data_size,
+                    data_hash=data_hash,
+                    R=3,
+                    k=N_UIDS,
+                )
+
+        full_hash = asyncio.run(run())
+        return full_hash, stored_chunks, file_mapping
+
+    def test_chunks_are_stored_in_order_within_the_window(self):
+        data = bytes(range(256)) * 40
+        pieces = (data[i : i + 777] for i in range(0, len(data), 777))
+        dendrite = FakeDendrite()
+
+        full_hash, stored_chunks, file_mapping = self.store(
+            pieces, dendrite, data_size=len(data)
+        )
+
+        expected_hashes = [
+            hash_data(data[i : i + CHUNK_SIZE]) for i in range(0, len(data), CHUNK_SIZE)
+        ]
+        self.assertEqual(generate_cid_string(data), full_hash)
+        self.assertEqual({full_hash: expected_hashes}, file_mapping)
+        self.assertTrue(all(len(hotkeys) == 3 for hotkeys in stored_chunks.values()))
+        self.assertLessEqual(dendrite.max_in_flight, 2)
+
+    def test_failed_miners_are_rerolled_per_chunk(self):
+        data = b"x" * CHUNK_SIZE
+        dendrite = FakeDendrite(failing={"hotkey1"})
+
+        full_hash, stored_chunks, _ = self.store(
+            [data], dendrite, data_size=len(data), data_hash="cid"
+        )
+
+        self.assertEqual("cid", full_hash)
+        (hotkeys,) = stored_chunks.values()
+        self.assertEqual(3, len(hotkeys))
+        self.assertNotIn("hotkey1", hotkeys)
+
+    def test_existing_data_keeps_its_mapping(self):
+        data = b"x" * CHUNK_SIZE
+        cid = generate_cid_string(data)
+
+        full_hash, _, file_mapping = self.store([data], FakeDendrite(), existing={cid})
+
+        self.assertEqual(cid, full_hash)
+        self.assertEqual({}, file_mapping)
+
+
+class TestReadChunks(TestCase):
+    def test_rechunks_pieces(self):
+        pieces = [b"abc", b"defghij", b"", b"klmnopqrstu", b"v"]
+
+        async def read():
+            return [chunk async for chunk in read_chunks(pieces, 4)]
+
+        chunks = asyncio.run(read())
+        self.assertEqual([b"abcd", b"efgh", b"ijkl", b"mnop", b"qrst", b"uv"], chunks)
+
+
+class TestCIDHasher(TestCase):
+    def test_matches_one_shot_cid(self):
+        data = bytes(range(256)) * 40
+        hasher = CIDHasher()
+        for i in range(0, len(data), 777):
+            hasher.update(memoryview(data)[i : i + 777])
+        self.assertEqual(generate_cid_string(data), hasher.cid())
+        self.assertEqual(generate_cid_string(b""), CIDHasher().cid())
@@ -0,0 +1,60 @@
+import torch
+from types import SimpleNamespace
+from unittest import TestCase
+
+from storage.validator.utils import (
+    check_uid_availability,
+    get_available_uids,
+    get_random_uids,
+)
+
+
+N_UIDS = 64
+VPERMIT_TAO_LIMIT = 1024
+
+
+def make_neuron():
+    metagraph = SimpleNamespace(
+        n=torch.tensor(N_UIDS),
+        block=torch.tensor(100),
+        axons=[SimpleNamespace(is_serving=uid % 5 != 0) for uid in range(N_UIDS)],
+        validator_permit=torch.tensor([uid % 3 == 0 for uid in range(N_UIDS)]),
+        S=torch.tensor([float(uid * 100) for uid in range(N_UIDS)]),
+    )
+    config = SimpleNamespace(
+        neuron=SimpleNamespace(vpermit_tao_limit=VPERMIT_TAO_LIMIT)
+    )
+    return SimpleNamespace(metagraph=metagraph, config=config)
+
+
+class TestAvailableUids(TestCase):
+    def test_matches_check_uid_availability(self):
+        neuron = make_neuron()
+        exclude = [1, 2, 3, N_UIDS + 10]
+        expected = [
+            uid
+            for uid in range(N_UIDS)
+            if check_uid_availability(neuron.metagraph, uid, VPERMIT_TAO_LIMIT)
+            and uid not in exclude
+        ]
+        self.assertEqual(expected, get_available_uids(neuron, exclude=exclude))
+
+    def test_mask_is_recomputed_after_sync(self):
+        neuron = make_neuron()
+        self.assertIn(1, get_available_uids(neuron))
+
+        neuron.metagraph.axons[1].is_serving = False
+        self.assertIn(1, get_available_uids(neuron))  # cached until the next sync
+
+        neuron.metagraph.block = torch.tensor(101)
+        self.assertNotIn(1, get_available_uids(neuron))
+
+    def test_random_uids_are_available_and_unique(self):
+        neuron = make_neuron()
+        available = set(get_available_uids(neuron, exclude=[4]))
+        uids = get_random_uids(neuron, k=10, exclude=[4])
+        self.assertEqual(10, len(set(uids)))
+        self.assertTrue(set(uids) <= available)
+        self.assertEqual(
+            len(available), len(get_random_uids(neuron, k=N_UIDS, exclude=[4]))
+        )
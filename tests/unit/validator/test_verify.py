@@ -0,0 +1,88 @@
+import base64
+from unittest import TestCase
+from parameterized import parameterized
+
+from storage import protocol
+from storage.shared.ecc import ECCommitment, ecc_point_to_hex, hash_data, setup_CRS
+from storage.validator.verify import (
+    verify_store_with_seed,
+    verify_store_with_seed_batch,
+)
+
+
+def _store_response(data, seed, g, h, tamper=None):
+    committer = ECCommitment(g, h)
+    c, m_val, r = committer.commit(data + str(seed).encode())
+    response = protocol.Store(
+        encrypted_data=base64.b64encode(b"").decode(),
+        curve="P-256",
+        g=ecc_point_to_hex(g),
+        h=ecc_point_to_hex(h),
+        seed=seed,
+        randomness=r,
+        commitment=ecc_point_to_hex(c),
+        commitment_hash=str(m_val),
+    )
+    if tamper == "randomness":
+        response.randomness = r + 1
+    elif tamper == "commitment_hash":
+        response.commitment_hash = str(hash_data(b"other data"))
+    elif tamper == "commitment":
+        response.commitment = None
+    return response
+
+
+class TestVerifyStoreBatch(TestCase):
+    def setUp(self):
+        self.data = b"some encrypted chunk" * 100
+        self.b64_data = base64.b64encode(self.data).decode()
+        self.seed = "b1e2"
+        self.g, self.h = setup_CRS()
+
+    @parameterized.expand(
+        [
+            [[None, None, None]],
+            [[None, "randomness", None]],
+            [["commitment_hash", None]],
+            [["randomness", "randomness"]],
+            [[None]],
+            [[]],
+        ]
+    )
+    def test_batch_matches_individual(self, tampered):
+        responses = [
+            _store_response(self.data, self.seed, self.g, self.h, tamper=t)
+            for t in tampered
+        ]
+
+        batch = verify_store_with_seed_batch(responses, self.data, self.seed)
+
+        self.assertEqual(
+            [verify_store_with_seed(r, self.b64_data, self.seed) for r in responses],
+            batch,
+        )
+        self.assertEqual([t is None for t in tampered], batch)
+
+    def test_batch_rejects_malformed_response(self):
+        responses = [
+            _store_response(self.data, self.seed, self.g, self.h),
+            _store_response(self.data, self.seed, self.g, self.h, "commitment"),
+        ]
+
+        self.assertEqual(
+            [True, False],
+            verify_store_with_seed_batch(responses, self.data, self.seed),
+        )
+
+    def test_batch_groups_by_curve_parameters(self):
+        other_g, other_h = setup_CRS()
+        responses = [
+            _store_response(self.data, self.seed, self.g, self.h),
+            _store_response(self.data, self.seed, other_g, other_h, "randomness"),
+            _store_response(self.data, self.seed, other_g, other_h),
+        ]
+
+        self.assertEqual(
+            [True, False, True],
+            verify_store_with_seed_batch(responses, self.data, self.seed),
+        )
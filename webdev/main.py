@@ -1,5 +1,4 @@
 import os
-import sys
 import json
 import base64
 import bittensor as bt
@@ -14,7 +13,7 @@ from passlib.context import CryptContext
 from pydantic import BaseModel
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict
-from storage.validator.cid import generate_cid_string
+from storage.validator.cid import CIDHasher
 from storage.validator.encryption import encrypt_data, decrypt_data_with_private_key
 from storage.api import StoreUserAPI, RetrieveUserAPI, get_query_api_axons, store, retrieve, delete
 from webdev.database import startup, get_database, get_user, create_user, get_server_wallet, get_metagraph
@@ -61,6 +60,9 @@ store_handler = StoreUserAPI(server_wallet)
 # Singleton retriever handler
 retrieve_handler = RetrieveUserAPI(server_wallet)
 
+# Size of the pieces uploaded files are read and hashed in
+UPLOAD_READ_SIZE = 8 * 1024 * 1024
+
 # OAuth2 and JWT Token Management
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
@@ -153,6 +155,18 @@ async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(
 async def read_users_me(current_user: User = Depends(get_current_user)):
     return current_user
 
+async def read_upload(file: UploadFile):
+    """
+    Reads an uploaded file, computing its CID as it is read rather than in a second pass. The data
+    is returned in the buffer it was read into, which is not copied again.
+    """
+    hasher = CIDHasher()
+    data = bytearray()
+    while piece := await file.read(UPLOAD_READ_SIZE):
+        hasher.update(piece)
+        data += piece
+    return data, hasher.cid()
+
 # File Upload Endpoint
 @app.post("/uploadfile/")
 async def create_upload_file(file: UploadFile = File(...), current_user: User = Depends(get_current_user)):
@@ -181,11 +195,10 @@ async def create_upload_file(file: UploadFile = File(...), current_user: User =
     splt = file.filename.split(os.path.extsep)
     filename_no_ext = splt[0]
 
-    raw_data = await file.read()
+    raw_data, _cid = await read_upload(file)
 
     # If exists, don't attempt to overwrite on the network.
     incr = True
-    _cid = generate_cid_string(raw_data)
     if file_cid_exists(current_user.username, cid=_cid):
         # Just overwrite the metadata and return (e.g. rename the file, but don't change data on network)
         rename_file(
@@ -225,7 +238,7 @@ async def create_upload_file(file: UploadFile = File(...), current_user: User =
         hotkeys=hotkeys,
         payload=encryption_payload,
         ext=ext,
-        size=sys.getsizeof(encrypted_data),
+        size=len(encrypted_data),
         incr=incr,
     )
 
@@ -251,10 +264,9 @@ async def create_upload_files(files: List[UploadFile] = File(...), current_user:
         splt = file.filename.split(os.path.extsep)
         filename_no_ext = splt[0]
 
-        raw_data = await file.read()
+        raw_data, _cid = await read_upload(file)
 
         # If cid exists, don't attempt to overwrite on the network but update the metadata.
-        _cid = generate_cid_string(raw_data)
         incr = True
         if file_cid_exists(current_user.username, cid=_cid):
             # Just overwrite the metadata and return (e.g. rename the file, but don't change data on network)